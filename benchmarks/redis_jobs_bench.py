@@ -0,0 +1,133 @@
+"""
+Microbenchmark for RedisJobManager job operations.
+
+Compares the previous multi-round-trip implementation (GET + HSET + EXPIRE +
+SETEX on create, EXISTS + HSET + EXPIRE on update) with the scripted
+single-round-trip operations, and checks that concurrent creates with the
+same idempotency key resolve to a single job.
+
+Usage:
+    python -m benchmarks.redis_jobs_bench [--ops 2000] [--threads 16]
+
+Requires a reachable Redis configured through the usual settings.
+"""
+import argparse
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from services.redis_jobs import redis_job_manager
+
+
+def legacy_create_job(manager, idea_id, service_type, idempotency_key):
+    client = manager.redis_client
+    job_id = str(uuid.uuid4())
+    dedupe_key = f"prompt_job_dedupe:{idea_id}:{service_type}:{idempotency_key}"
+    existing_job_id = client.get(dedupe_key)
+    if existing_job_id:
+        return existing_job_id
+
+    job_key = f"prompt_job:{job_id}"
+    client.hset(job_key, mapping={
+        "status": "queued",
+        "progress": "0.0",
+        "error": "",
+        "idea_id": idea_id,
+        "service_type": service_type,
+        "idempotency_key": idempotency_key,
+        "prompt_id": "",
+        "idea_result_id": "",
+        "created_at": datetime.utcnow().isoformat()
+    })
+    client.expire(job_key, manager.job_ttl)
+    client.setex(dedupe_key, manager.job_ttl, job_id)
+    return job_id
+
+
+def legacy_update_job(manager, job_id, **updates):
+    client = manager.redis_client
+    job_key = f"prompt_job:{job_id}"
+    if not client.exists(job_key):
+        return False
+    client.hset(job_key, mapping={k: str(v) for k, v in updates.items()})
+    client.expire(job_key, manager.job_ttl)
+    return True
+
+
+def run(label, fn, ops):
+    start = time.perf_counter()
+    results = [fn(i) for i in range(ops)]
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {ops / elapsed:>10.0f} ops/sec")
+    return results
+
+
+def race(create, threads):
+    key = f"bench-race-{uuid.uuid4()}"
+    barrier = threading.Barrier(threads)
+    job_ids = []
+
+    def worker():
+        barrier.wait()
+        job_ids.append(create(key))
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    return len(set(job_ids))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    manager = redis_job_manager
+    run_id = uuid.uuid4().hex[:8]
+
+    legacy_ids = run(
+        "create (legacy)",
+        lambda i: legacy_create_job(
+            manager, "bench", "legacy", f"{run_id}-{i}"),
+        args.ops)
+    scripted_ids = run(
+        "create (scripted)",
+        lambda i: manager.create_job("bench", "scripted", f"{run_id}-{i}"),
+        args.ops)
+
+    run("update (legacy)",
+        lambda i: legacy_update_job(
+            manager, legacy_ids[i], status="running", progress=0.5),
+        args.ops)
+    run("update (scripted)",
+        lambda i: manager.update_job(
+            scripted_ids[i], status="running", progress=0.5),
+        args.ops)
+    run("complete (scripted)",
+        lambda i: manager.complete_job(scripted_ids[i]), args.ops)
+    run("fail (scripted)",
+        lambda i: manager.fail_job(scripted_ids[i], "bench"), args.ops)
+
+    legacy_jobs = race(
+        lambda key: legacy_create_job(manager, "bench", "race", key),
+        args.threads)
+    scripted_jobs = race(
+        lambda key: manager.create_job("bench", "race", key),
+        args.threads)
+    print(f"jobs created by {args.threads} concurrent duplicate POSTs: "
+          f"legacy={legacy_jobs} scripted={scripted_jobs}")
+
+    client = manager.redis_client
+    for pattern in ("prompt_job_dedupe:bench:*", ):
+        keys = list(client.scan_iter(pattern, count=1000))
+        job_keys = [f"prompt_job:{job_id}" for job_id in client.mget(keys) if job_id]
+        if keys:
+            client.delete(*keys, *job_keys)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Per-task overhead of Celery worker clients: building SupabaseDB, the LLM
+and AgentService for every task (previous behaviour) versus reusing the
+per-process WorkerRuntime.
+
+Each simulated task performs one cheap database read and, for the OpenAI
+backend, one cheap API call, so connection setup and TLS handshakes are
+included in the measurement.
+
+Usage:
+    python -m benchmarks.worker_setup_bench [--tasks 20] [--no-network]
+
+Requires the usual settings (.env); with --no-network only client
+construction is measured.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from config.settings import settings
+from services.agent.agent_service import AgentService
+from services.database.cached_db import InvalidatingDatabase
+from services.database.supabase_db import SupabaseDB
+from services.llm.factory import create_llm
+from services.llm.openai_llm import OpenAILLM
+from services.workers.runtime import get_runtime, close_worker_runtime
+
+
+async def llm_probe(llm):
+    if isinstance(llm, OpenAILLM):
+        await llm.client.models.retrieve(settings.DEFAULT_MODEL)
+
+
+def fresh_task(network: bool):
+    db = InvalidatingDatabase(
+        SupabaseDB(settings.SUPABASE_URL, settings.SUPABASE_KEY))
+    llm = create_llm()
+    AgentService(llm=llm, db=db)
+    if network:
+        db.get_ideas_page(limit=1)
+        asyncio.run(llm_probe(llm))
+
+
+def reused_task(network: bool):
+    runtime = get_runtime()
+    if network:
+        runtime.db.get_ideas_page(limit=1)
+        runtime.run(llm_probe(runtime.llm))
+
+
+def measure(label, fn, tasks, network):
+    durations = []
+    for _ in range(tasks):
+        start = time.perf_counter()
+        fn(network)
+        durations.append((time.perf_counter() - start) * 1000)
+    print(f"{label:<10} mean={statistics.mean(durations):8.1f} ms  "
+          f"median={statistics.median(durations):8.1f} ms  "
+          f"max={max(durations):8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--no-network", action="store_true")
+    args = parser.parse_args()
+    network = not args.no_network
+
+    measure("fresh", fresh_task, args.tasks, network)
+    # Warm up the runtime once, as worker_process_init does
+    get_runtime()
+    measure("reused", reused_task, args.tasks, network)
+    close_worker_runtime()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Dict, Optional
 
 
 class Settings(BaseSettings):
@@ -8,10 +9,127 @@ class Settings(BaseSettings):
     DEFAULT_TEMPERATURE: float
     TRANSCRIBE_MODEL: str
 
+    # LLM / transcriber backends: openai, record, replay or synthetic
+    LLM_BACKEND: str = "openai"
+    TRANSCRIBER_BACKEND: str = "openai"
+    # Long Ogg Opus voice notes are transcribed as overlapping segments in parallel
+    TRANSCRIBE_SEGMENT_SECONDS: float = 120.0
+    TRANSCRIBE_SEGMENT_OVERLAP_SECONDS: float = 2.0
+    TRANSCRIBE_MAX_CONCURRENCY: int = 4
+    RECORDINGS_DIR: str = "recordings"
+    REPLAY_LATENCY: bool = False
+
+    # Latency model for synthetic backends
+    SYNTHETIC_LATENCY_MS: float = 2000
+    SYNTHETIC_WEB_SEARCH_LATENCY_MS: float = 8000
+    SYNTHETIC_LATENCY_SIGMA: float = 0.4
+    SYNTHETIC_ERROR_RATE: float = 0.0
+    SYNTHETIC_SEED: Optional[int] = None
+
+    # Children of one /ideas/generate/batch request queued or running at once.
+    # A child lost by a crashed worker frees its slot when its fair-queue
+    # lease (FAIR_QUEUE_LEASE_SECONDS) expires
+    IDEA_BATCH_MAX_IN_FLIGHT: int = 8
+
+    # Job ETA: stage durations are kept in hourly Redis histograms merged
+    # over JOB_ETA_WINDOWS hours; status polls are told to come back when the
+    # next stage is likely done, within the poll bounds
+    JOB_ETA_WINDOW_SECONDS: int = 3600
+    JOB_ETA_WINDOWS: int = 24
+    JOB_ETA_MIN_SAMPLES: int = 5
+    JOB_POLL_MIN_SECONDS: int = 1
+    JOB_POLL_MAX_SECONDS: int = 30
+
+    # Admission control: new idea and prompt jobs get a 429 while the
+    # predicted wait (queue depth over throughput) exceeds the queue's SLO.
+    # WORKER_CONCURRENCY must match the worker's --concurrency
+    ADMISSION_CONTROL_ENABLED: bool = True
+    ADMISSION_WAIT_SLO_SECONDS: Dict[str, float] = {
+        "idea_generation": 180.0, "prompt_generation": 120.0}
+    ADMISSION_THROUGHPUT_WINDOW_SECONDS: int = 300
+    ADMISSION_MAX_RETRY_AFTER_SECONDS: int = 300
+    WORKER_CONCURRENCY: int = 2
+
+    # Fair queuing: jobs wait in per-tenant Redis sub-queues and reach
+    # Celery by weighted round robin, WORKER_CONCURRENCY at a time. Tenant
+    # classes set the turns per round and the jobs in flight per tenant;
+    # batch tenants default to IDEA_BATCH_MAX_IN_FLIGHT in flight
+    FAIR_QUEUE_ENABLED: bool = True
+    FAIR_QUEUE_LEASE_SECONDS: int = 1800
+    FAIR_QUEUE_CLASSES: Dict[str, Dict[str, int]] = {
+        "telegram": {"weight": 2, "max_in_flight": 1},
+        "web": {"weight": 1, "max_in_flight": 2},
+        "batch": {"weight": 1},
+    }
+
+    # Tail-latency control for LLM calls. Deadlines cover all attempts of a
+    # call and are looked up by pipeline stage; hedging duplicates a request
+    # that runs past the stage's recent latency percentile
+    LLM_REQUEST_TIMEOUT: float = 120.0
+    LLM_MAX_ATTEMPTS: int = 3
+    LLM_RETRY_BASE_DELAY: float = 0.5
+    LLM_RETRY_MAX_DELAY: float = 8.0
+    LLM_DEFAULT_DEADLINE: float = 240.0
+    LLM_STAGE_DEADLINES: Dict[str, float] = {
+        "idea": 90.0, "icp": 90.0, "reddit": 240.0, "script": 180.0}
+    LLM_HEDGE_ENABLED: bool = False
+    LLM_HEDGE_PERCENTILE: float = 95.0
+    LLM_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    LLM_CIRCUIT_RESET_SECONDS: float = 30.0
+
+    # Tracing: spans feed the Prometheus latency histograms; slow or failed
+    # spans are logged with their trace ID. Workers serve /metrics on
+    # WORKER_METRICS_PORT (0 disables)
+    TRACING_ENABLED: bool = True
+    TRACE_SLOW_SPAN_SECONDS: float = 5.0
+    TRACE_LOG_SPANS: bool = False
+    WORKER_METRICS_PORT: int = 9101
+
+    # Token and prompt cache usage counters per system prompt version
+    LLM_USAGE_TRACKING_ENABLED: bool = True
+
+    # Opt-in cache for structured LLM responses
+    LLM_CACHE_ENABLED: bool = False
+    LLM_CACHE_TTL_SECONDS: int = 86400
+    LLM_CACHE_MAX_ENTRIES: int = 10000
+
+    # Near-duplicate detection of submitted ideas ("openai" or "hashing"
+    # embedder). Only workers use the index: put IDEA_INDEX_DIR on a
+    # persistent disk, otherwise it is rebuilt from the database whenever a
+    # worker starts with an empty index
+    EMBEDDING_BACKEND: str = "openai"
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_DIMENSIONS: int = 1536
+    IDEA_DEDUPE_ENABLED: bool = False
+    IDEA_DEDUPE_THRESHOLD: float = 0.92
+    IDEA_INDEX_DIR: str = "data/idea_index"
+
     TELEGRAM_API_TOKEN: str
+    # How long a delivered update_id is remembered; Telegram keeps undelivered
+    # updates for up to 24 hours
+    TELEGRAM_UPDATE_DEDUPE_TTL_SECONDS: int = 86400
+    # Outbound Bot API limits, per process: split the global ~30/s across
+    # the API and worker processes that send messages
+    TELEGRAM_GLOBAL_SENDS_PER_SECOND: float = 30.0
+    TELEGRAM_CHAT_SENDS_PER_SECOND: float = 1.0
+    TELEGRAM_CHAT_SEND_BURST: float = 3.0
+    # Bots cannot download files over 20 MB
+    TELEGRAM_VOICE_MAX_BYTES: int = 20 * 1024 * 1024
+
+    # Transcripts cached by Telegram file_unique_id and audio hash
+    TRANSCRIPT_CACHE_ENABLED: bool = True
+    TRANSCRIPT_CACHE_TTL_SECONDS: int = 604800
 
     SUPABASE_URL: str
     SUPABASE_KEY: str
+    DB_MAX_CONNECTIONS: int = 20
+    DB_TIMEOUT: float = 10.0
+
+    # Read-through cache for idea and prompt reads
+    DB_CACHE_ENABLED: bool = True
+    DB_CACHE_TTL_SECONDS: int = 300
+    DB_CACHE_LOCAL_TTL_SECONDS: float = 30.0
+    DB_CACHE_LOCAL_MAX_ENTRIES: int = 1000
 
     # Render Managed Redis (primary) - Optional for local development
     REDIS_URL: str = ""
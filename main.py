@@ -1,20 +1,49 @@
-from fastapi import FastAPI, Request, HTTPException, Header, Body
+from fastapi import FastAPI, Request, HTTPException, Header, Body, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response, StreamingResponse
 from config.settings import settings
 from services.messenger.telegram import TelegramMessenger
-from services.llm.openai_llm import OpenAILLM
-from services.database.supabase_db import SupabaseDB
-from services.agent.agent_service import AgentService
-from services.voice.openai_transcriber import OpenAITranscriber
-from schemas.update import IdeaUpdateRequest, UpdateListRequest
+from services.llm.factory import create_llm
+from services.llm.cached_llm import CachedLLM
+from services.llm.usage import UsageRecorder
+from services.agent.prompt_registry import prompt_registry
+from services.database.async_supabase_db import AsyncSupabaseDB
+from services.database.cached_db import CachedDatabase
+from services.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from services.database.mappers import SERVICE_TYPES
+from schemas.update import IdeaPatchRequest, UpdateListRequest
 from schemas.prompts import PromptGenerateResponse, JobStatusResponse, PromptResponse
-from schemas.idea_generation import IdeaGenerateResponse, IdeaJobStatusResponse
+from schemas.idea_generation import (
+    IdeaGenerateResponse, IdeaJobStatusResponse, IdeaBatchGenerateRequest, IdeaBatchResponse,
+    IdeaBatchChild, IdeaBatchStatusResponse)
 from services.redis_jobs import redis_job_manager
-from services.workers.prompt_worker import generate_prompt_task
-from services.workers.idea_worker import generate_idea_task
+from services.job_progress import job_progress
+from services.admission import QueueFullError, queue_admission
+from services.fair_queue import fair_scheduler
+from dataclasses import asdict
+from services.celery_app import celery_app
+from services.observability.http_tracing import TracingMiddleware
+from services.observability.metrics import render_metrics, set_queue_depths
+from services.job_events import job_event_stream
+from services.workers.idea_worker import dispatch_batch_children
+from contextlib import asynccontextmanager
+import asyncio
+from typing import List, Optional
 import json
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if isinstance(db, CachedDatabase):
+        await db.start()
+    yield
+    await db.aclose()
+    await llm.aclose()
+    await job_event_stream.close()
+    await messenger.close()
+
+
+app = FastAPI(lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -22,87 +51,111 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TracingMiddleware)
 
-processing_messages = set()
+CELERY_QUEUES = sorted({route["queue"]
+                       for route in celery_app.conf.task_routes.values()})
 
 messenger = TelegramMessenger(token=settings.TELEGRAM_API_TOKEN)
-llm = OpenAILLM(api_key=settings.OPENAI_API_KEY)
-db = SupabaseDB(url=settings.SUPABASE_URL, key=settings.SUPABASE_KEY)
-transcriber = OpenAITranscriber(
-    api_key=settings.OPENAI_API_KEY, default_model=settings.TRANSCRIBE_MODEL)
-agent_service = AgentService(llm=llm, db=db)
+llm = create_llm()
+db = AsyncSupabaseDB(
+    url=settings.SUPABASE_URL,
+    key=settings.SUPABASE_KEY,
+    max_connections=settings.DB_MAX_CONNECTIONS,
+    timeout=settings.DB_TIMEOUT
+)
+if settings.DB_CACHE_ENABLED:
+    db = CachedDatabase(
+        db,
+        ttl=settings.DB_CACHE_TTL_SECONDS,
+        local_ttl=settings.DB_CACHE_LOCAL_TTL_SECONDS,
+        local_max_entries=settings.DB_CACHE_LOCAL_MAX_ENTRIES
+    )
 
 
 @app.post("/telegram/webhook")
-async def telegram_webhook(request: Request):
+async def telegram_webhook(request: Request, background_tasks: BackgroundTasks):
+    """
+    Acknowledge a Telegram update right away and hand it to the
+    telegram_updates queue, where a worker transcribes, generates and replies
+    """
     payload = await request.json()
 
     message_id = (payload.get("message") or payload.get(
         "callback_query", {}).get("message", {})).get("message_id")
 
-    if message_id:
-        if message_id in processing_messages:
-            return {"ok": True}
-        processing_messages.add(message_id)
-
     chat_id = str(payload.get("message", payload.get(
         "callback_query", {})).get("chat", {}).get("id"))
 
+    # Telegram redelivers an update with the same update_id; claim it once
+    # across every replica so duplicates cost a single Redis round trip
+    update_key = str(payload.get("update_id") or f"{chat_id}:{message_id}")
+    claim_key = f"telegram_update:{update_key}"
+    if not redis_job_manager.claim_once(claim_key, settings.TELEGRAM_UPDATE_DEDUPE_TTL_SECONDS):
+        return {"ok": True}
+
     try:
         msg = payload.get("message", {})
 
-        if msg.get("text", {}):
-            incoming_text = messenger.receive_message(payload)
-        elif msg.get("voice", {}):
-            audio_bytes = await messenger.download_voice(payload)
-            incoming_text = await transcriber.transcribe(
-                audio_bytes,
-                language="en"
-            )
-        else:
-            incoming_text = ""
-
-        if not incoming_text:
-            await messenger.send_message(chat_id, "Unsupported or empty message.")
+        if not msg.get("text", {}) and not msg.get("voice", {}):
+            # Reply after the response is sent so the webhook stays fast
+            background_tasks.add_task(
+                messenger.send_message, chat_id, "Unsupported or empty message.")
             return {"ok": False}
 
-        llm_options = {
-            "model": settings.DEFAULT_MODEL,
-            "temperature": settings.DEFAULT_TEMPERATURE,
-            "max_tokens": settings.MAX_TOKENS
-        }
-
-        reply = await agent_service.handle_user_message(
-            user_input=incoming_text,
-            options=llm_options,
-            user_id=chat_id
+        job_id = redis_job_manager.create_job(
+            f"telegram_{chat_id}",
+            "telegram",
+            update_key,
+            additional_data={
+                "chat_id": chat_id,
+                "payload": json.dumps(payload)
+            }
         )
 
-        if reply:
-            await messenger.send_message(chat_id, reply.model_dump_json())
-        else:
-            await messenger.send_message(chat_id, "Sorry, something went wrong.")
+        fair_scheduler.submit("telegram_updates", job_id, "telegram", chat_id)
 
-        return {"ok": True}
+        return {"ok": True, "job_id": job_id}
 
     except Exception as e:
-        print(f"Error processing message: {str(e)}")
-        await messenger.send_message(chat_id, "Sorry, an error occurred.")
-        return {"ok": False}
-    finally:
-        if message_id and message_id in processing_messages:
-            processing_messages.remove(message_id)
-            print(
-                f"Finished processing message {message_id}, removed from processing set")
+        print(f"Error queuing Telegram update: {str(e)}")
+        # Telegram only redelivers updates answered with an error; release
+        # the claim so that redelivery is processed
+        redis_job_manager.release_claim(claim_key)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to queue Telegram update"
+        )
+
+
+async def admit_job(queue: str, jobs: int = 1) -> None:
+    """Turn new work away with 429 and a Retry-After while the queue is over its wait SLO"""
+    try:
+        await asyncio.to_thread(queue_admission.admit, queue, jobs)
+    except QueueFullError as e:
+        print(f"Rejecting new {queue} job: {str(e)}")
+        raise HTTPException(
+            status_code=429,
+            detail={
+                "message": "Too many jobs queued, retry later",
+                "queue_depth": e.snapshot.depth,
+                "predicted_wait_seconds": e.snapshot.predicted_wait
+            },
+            headers={"Retry-After": str(e.snapshot.retry_after)}
+        )
 
 
 @app.post("/ideas/generate", response_model=IdeaGenerateResponse)
 async def generate_idea(
     user_input: str = Body(..., embed=True),
+    force: bool = Body(False, embed=True),
     idempotency_key: str = Header(..., alias="Idempotency-Key")
 ):
     """
-    Start async idea generation for web frontend
+    Start async idea generation for web frontend. The worker first looks for
+    a near-identical stored idea; if there is one, the job succeeds with
+    duplicate_of set instead of generating. Pass force=true to generate
+    anyway.
     """
     try:
         if not user_input or not user_input.strip():
@@ -122,9 +175,12 @@ async def generate_idea(
                 return IdeaGenerateResponse(
                     job_id=existing_job_id,
                     status=job_data["status"],
-                    poll_url=f"/idea-jobs/{existing_job_id}"
+                    poll_url=f"/idea-jobs/{existing_job_id}",
+                    stream_url=f"/jobs/stream?job_ids={existing_job_id}"
                 )
 
+        await admit_job("idea_generation")
+
         # Create new job
         job_id = redis_job_manager.create_job(
             f"idea_generation_{user_id}",
@@ -132,17 +188,19 @@ async def generate_idea(
             idempotency_key,
             additional_data={
                 "user_input": user_input.strip(),
-                "user_id": user_id
+                "user_id": user_id,
+                "check_duplicate": "" if force else "1"
             }
         )
 
-        # Enqueue Celery task
-        generate_idea_task.delay(job_id)
+        # Queue behind the user's other jobs; dispatched to Celery in turn
+        fair_scheduler.submit("idea_generation", job_id, "web", user_id)
 
         return IdeaGenerateResponse(
             job_id=job_id,
             status="queued",
-            poll_url=f"/idea-jobs/{job_id}"
+            poll_url=f"/idea-jobs/{job_id}",
+            stream_url=f"/jobs/stream?job_ids={job_id}"
         )
 
     except HTTPException:
@@ -155,27 +213,180 @@ async def generate_idea(
         )
 
 
+@app.post("/ideas/generate/batch", response_model=IdeaBatchResponse)
+async def generate_idea_batch(
+    request: IdeaBatchGenerateRequest,
+    idempotency_key: str = Header(..., alias="Idempotency-Key")
+):
+    """
+    Start idea generation for many inputs at once. One batch job is created
+    with a child idea job per input; children are fed to the idea_generation
+    queue at most IDEA_BATCH_MAX_IN_FLIGHT at a time, each finished child
+    dispatching the next.
+    """
+    try:
+        user_inputs = [text.strip()
+                       for text in request.user_inputs if text and text.strip()]
+        if not user_inputs:
+            raise HTTPException(
+                status_code=400,
+                detail="At least one non-empty user input is required"
+            )
+
+        user_id = "web_user"
+
+        # Retries of an accepted batch are answered even when the queue is full
+        if not redis_job_manager.get_dedupe_job_id(f"idea_batch_{user_id}", "idea_batch", idempotency_key):
+            await admit_job("idea_generation", len(user_inputs))
+
+        batch_id = redis_job_manager.create_job(
+            f"idea_batch_{user_id}",
+            "idea_batch",
+            idempotency_key,
+            additional_data={
+                "user_id": user_id,
+                "total": str(len(user_inputs))
+            }
+        )
+
+        # Retries with the same Idempotency-Key resolve to the same batch;
+        # only the first one creates and dispatches the children
+        if redis_job_manager.claim_once(f"idea_batch:{batch_id}:created", redis_job_manager.job_ttl):
+            redis_job_manager.create_batch_children(
+                batch_id, user_id, user_inputs)
+            dispatch_batch_children(
+                batch_id, settings.IDEA_BATCH_MAX_IN_FLIGHT)
+
+        batch = redis_job_manager.get_job(batch_id) or {}
+
+        return IdeaBatchResponse(
+            batch_id=batch_id,
+            status=batch.get("status", "queued"),
+            total=int(batch.get("total", len(user_inputs))),
+            poll_url=f"/idea-batches/{batch_id}"
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error starting idea batch: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to start idea batch"
+        )
+
+
+@app.get("/idea-batches/{batch_id}", response_model=IdeaBatchStatusResponse)
+async def get_idea_batch_status(batch_id: str):
+    """
+    Get the aggregate status of a batch of idea generations
+    """
+    try:
+        batch = redis_job_manager.get_job(batch_id)
+        if not batch or batch.get("service_type") != "idea_batch":
+            raise HTTPException(
+                status_code=410,
+                detail="Batch has expired or does not exist"
+            )
+
+        # Polls also reclaim expired fair-queue leases, so children lost by a
+        # crashed worker are failed and the batch moves on even when no other
+        # job is submitted or completes
+        if settings.FAIR_QUEUE_ENABLED:
+            await asyncio.to_thread(fair_scheduler.dispatch)
+
+        child_ids = redis_job_manager.get_batch_children(batch_id)
+        rows = redis_job_manager.get_jobs_fields(
+            child_ids,
+            ["status", "error", "idea_result_id", "created_at", "completed_stages", "step_started_at"])
+
+        children = []
+        counts = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0}
+        for child_id, row in zip(child_ids, rows):
+            status = row["status"] or "expired"
+            counts[status] = counts.get(status, 0) + 1
+            children.append(IdeaBatchChild(
+                job_id=child_id,
+                status=status,
+                error=row["error"] or None,
+                idea_url=f"/ideas/{row['idea_result_id']}/summary" if row["idea_result_id"] else None
+            ))
+
+        total = len(child_ids)
+        finished = total - counts["queued"] - counts["running"]
+        if total and finished == total:
+            if counts["succeeded"] == total:
+                status = "succeeded"
+            elif counts["succeeded"] == 0:
+                status = "failed"
+            else:
+                status = "partial"
+        elif finished or counts["running"]:
+            status = "running"
+        else:
+            status = "queued"
+
+        # Poll again when the first active child is expected to move on;
+        # running children change first, queued ones wait for a slot
+        active = [row for row in rows if row["status"] == "running"] or \
+            [row for row in rows if row["status"] == "queued"]
+        estimates = await asyncio.to_thread(
+            lambda: [job_progress.estimate(row, "idea") for row in active])
+        retry_after = min((e.retry_after for e in estimates if e.retry_after is not None), default=None)
+
+        return IdeaBatchStatusResponse(
+            batch_id=batch_id,
+            status=status,
+            total=total,
+            counts=counts,
+            progress=round(finished / total, 4) if total else 0.0,
+            retry_after=retry_after if status in ["queued", "running"] else None,
+            children=children
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error getting idea batch status: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to get batch status"
+        )
+
+
 @app.get("/ideas")
-async def get_all_ideas():
+async def get_all_ideas(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
     """
-    Retrieve all ideas from the database, sorted from newest to oldest.
+    Retrieve ideas from the database, sorted from newest to oldest, one page at a time.
+    Args:
+        limit: Maximum number of ideas to return
+        cursor: Opaque cursor from a previous page's next_cursor
     Returns:
-        List of ideas with details required for displaying on the home page.
+        Page of ideas with details required for displaying on the home page,
+        and next_cursor to fetch the following page (None on the last page).
     """
     try:
-        ideas = db.get_all_ideas()
+        page = await db.get_ideas_page(limit=limit, cursor=cursor)
+        ideas = page["ideas"]
         return {
             "success": True,
             "data": ideas,
-            "count": len(ideas)
+            "count": len(ideas),
+            "next_cursor": page["next_cursor"]
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         print(f"Error retrieving ideas: {str(e)}")
         return {
             "success": False,
             "error": "Failed to retrieve ideas",
             "data": [],
-            "count": 0
+            "count": 0,
+            "next_cursor": None
         }
 
 
@@ -189,7 +400,7 @@ async def get_idea_summary(idea_id: str):
         Idea summary with basic information (title, description, counts, etc.)
     """
     try:
-        idea_summary = db.get_idea_summary_by_id(idea_id)
+        idea_summary = await db.get_idea_summary_by_id(idea_id)
 
         if idea_summary is None:
             raise HTTPException(
@@ -220,7 +431,7 @@ async def get_idea_by_id(idea_id: str):
         ICP data, Reddit analysis, and prompts history.
     """
     try:
-        idea = db.get_idea_by_id(idea_id)
+        idea = await db.get_idea_details(idea_id, "lovable")
 
         if idea is None:
             raise HTTPException(
@@ -228,23 +439,6 @@ async def get_idea_by_id(idea_id: str):
                 detail=f"Idea with ID '{idea_id}' not found"
             )
 
-        try:
-            prompts_history = db.get_prompts_metadata_by_idea_id(idea_id)
-            idea["prompts_history"] = prompts_history
-        except Exception as e:
-            print(
-                f"Error retrieving prompts history for idea {idea_id}: {str(e)}")
-            idea["prompts_history"] = []
-
-        try:
-            latest_prompt = db.get_latest_prompt_for_idea_details(
-                idea_id, "lovable")
-            idea["latest_prompt"] = latest_prompt
-        except Exception as e:
-            print(
-                f"Error retrieving latest prompt for idea {idea_id}: {str(e)}")
-            idea["latest_prompt"] = None
-
         return idea
 
     except HTTPException:
@@ -257,41 +451,49 @@ async def get_idea_by_id(idea_id: str):
         )
 
 
+def _patch_error(error: str) -> HTTPException:
+    error_lower = error.lower()
+    if "not found" in error_lower:
+        return HTTPException(status_code=404, detail=error)
+    if any(keyword in error_lower for keyword in ["not allowed", "invalid", "required", "maximum", "minimum", "at least", "type"]):
+        return HTTPException(status_code=400, detail=error)
+    return HTTPException(status_code=500, detail=error)
+
+
 @app.patch("/ideas/{idea_id}")
-async def update_idea_field(idea_id: str, update_request: IdeaUpdateRequest):
+async def update_idea_field(idea_id: str, update_request: IdeaPatchRequest):
     """
-    Update a specific field of an idea.
-    Only one field can be updated per request.
+    Update one or more fields and lists of an idea in a single write.
     Args:
         idea_id: The unique identifier of the idea to update
-        update_request: Object containing the field to update (only one field should be provided)
+        update_request: Object containing the fields and/or lists to update
     Returns:
         Success status and message
     """
     try:
         update_data = update_request.model_dump(exclude_none=True)
 
-        if len(update_data) != 1:
+        if not update_data:
             raise HTTPException(
                 status_code=400,
-                detail="Exactly one field must be provided for update"
+                detail="At least one field must be provided for update"
             )
 
-        field_name, field_value = next(iter(update_data.items()))
-        result = db.update_idea_field(idea_id, field_name, field_value)
+        list_fields = UpdateListRequest.model_fields
+        fields = {name: value for name, value in update_data.items()
+                  if name not in list_fields}
+        lists = {name: value for name, value in update_data.items()
+                 if name in list_fields}
+
+        result = await db.patch_idea(idea_id, fields=fields, lists=lists)
 
         if result["success"]:
             return {
                 "success": True,
-                "message": f"Successfully updated {field_name}"
+                "message": f"Successfully updated {', '.join(update_data.keys())}"
             }
         else:
-            if "not found" in result["error"].lower():
-                raise HTTPException(status_code=404, detail=result["error"])
-            elif "not allowed" in result["error"].lower() or "invalid" in result["error"].lower():
-                raise HTTPException(status_code=400, detail=result["error"])
-            else:
-                raise HTTPException(status_code=500, detail=result["error"])
+            raise _patch_error(result["error"])
 
     except HTTPException:
         raise
@@ -311,39 +513,34 @@ async def update_idea_field(idea_id: str, update_request: IdeaUpdateRequest):
 @app.patch("/ideas/{idea_id}/lists")
 async def update_list(idea_id: str, update_request: UpdateListRequest):
     """
-    Update a specific list type of an idea.
-    Only one list type can be updated per request.
+    Update one or more list types of an idea in a single write.
     Args:
         idea_id: The unique identifier of the idea to update
-        update_request: Object containing the list to update (only one list field should be provided)
+        update_request: Object containing the lists to update
     Returns:
         Success status and message
     """
     try:
         update_data = update_request.model_dump(exclude_none=True)
 
-        if len(update_data) != 1:
+        if not update_data:
             raise HTTPException(
                 status_code=400,
-                detail="Exactly one list field must be provided for update"
+                detail="At least one list field must be provided for update"
             )
 
-        list_type, items = next(iter(update_data.items()))
-
-        result = db.update_idea_list(idea_id, list_type, items)
+        result = await db.patch_idea(idea_id, lists=update_data)
 
         if result["success"]:
+            updated = ", ".join(
+                f"{list_type.replace('_', ' ')} ({len(items)} items)"
+                for list_type, items in update_data.items())
             return {
                 "success": True,
-                "message": f"Successfully updated {list_type.replace('-', ' ')} ({len(items)} items)"
+                "message": f"Successfully updated {updated}"
             }
         else:
-            if "not found" in result["error"].lower():
-                raise HTTPException(status_code=404, detail=result["error"])
-            elif any(keyword in result["error"].lower() for keyword in ["invalid", "required", "maximum", "minimum", "at least", "type"]):
-                raise HTTPException(status_code=400, detail=result["error"])
-            else:
-                raise HTTPException(status_code=500, detail=result["error"])
+            raise _patch_error(result["error"])
 
     except HTTPException:
         raise
@@ -373,15 +570,19 @@ async def get_idea_job_status(job_id: str):
         if job_data.get("idea_result_id"):
             idea_url = f"/ideas/{job_data['idea_result_id']}/summary"
 
+        estimate = await asyncio.to_thread(job_progress.estimate, job_data, "idea")
+
         return IdeaJobStatusResponse(
             job_id=job_id,
             status=job_data["status"],
             progress=job_data["progress"],
             error=job_data.get("error"),
             user_id=job_data.get("user_id", "web_user"),
-            retry_after=5 if job_data["status"] in [
-                "queued", "running"] else None,
-            idea_url=idea_url
+            retry_after=estimate.retry_after,
+            eta_seconds=estimate.eta_seconds,
+            idea_url=idea_url,
+            duplicate_of=job_data.get("duplicate_of") or None,
+            similarity=float(job_data["similarity"]) if job_data.get("similarity") else None
         )
 
     except HTTPException:
@@ -394,6 +595,36 @@ async def get_idea_job_status(job_id: str):
         )
 
 
+@app.get("/jobs/stream")
+async def stream_jobs(job_ids: List[str] = Query(..., max_length=50)):
+    """
+    Stream status updates for one or more idea/prompt jobs as Server-Sent Events.
+    Args:
+        job_ids: Job IDs to watch, e.g. /jobs/stream?job_ids=a&job_ids=b
+    Returns:
+        An event stream with the current state of every job followed by each
+        transition. The stream closes once all jobs have finished or expired.
+    """
+    job_ids = list(dict.fromkeys(job_ids))
+
+    async def event_source():
+        async for event in job_event_stream.watch(job_ids):
+            if event is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"event: job\ndata: {json.dumps(event)}\n\n"
+        yield "event: end\ndata: {}\n\n"
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
 @app.post("/ideas/{idea_id}/prompts", response_model=PromptGenerateResponse)
 async def generate_prompt(
     idea_id: str,
@@ -401,23 +632,25 @@ async def generate_prompt(
     idempotency_key: str = Header(..., alias="Idempotency-Key")
 ):
     try:
-        valid_services = ["lovable"]
-        if service_type not in valid_services:
+        if service_type not in SERVICE_TYPES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid service type '{service_type}'. Valid options: {', '.join(valid_services)}"
+                detail=f"Invalid service type '{service_type}'. Valid options: {', '.join(SERVICE_TYPES)}"
             )
 
-        idea_data = db.get_idea_by_id(idea_id)
+        # Idea lookup and idempotency lookup are independent; run them together
+        idea_data, existing_job_id = await asyncio.gather(
+            db.get_idea_by_id(idea_id),
+            asyncio.to_thread(
+                redis_job_manager.get_dedupe_job_id,
+                idea_id, service_type, idempotency_key)
+        )
         if not idea_data:
             raise HTTPException(
                 status_code=404,
                 detail=f"Idea with ID '{idea_id}' not found"
             )
 
-        existing_job_id = redis_job_manager.get_dedupe_job_id(
-            idea_id, service_type, idempotency_key)
-
         if existing_job_id:
             job_data = redis_job_manager.get_job(existing_job_id)
             if job_data:
@@ -429,21 +662,25 @@ async def generate_prompt(
                     job_id=existing_job_id,
                     status=job_data["status"],
                     poll_url=f"/prompt-jobs/{existing_job_id}",
+                    stream_url=f"/jobs/stream?job_ids={existing_job_id}",
                     result_url=f"/ideas/{idea_id}/prompts/{service_type}",
                     by_id_url=by_id_url
                 )
 
+        await admit_job("prompt_generation")
+
         # Create new job
         job_id = redis_job_manager.create_job(
             idea_id, service_type, idempotency_key)
 
-        # Enqueue Celery task
-        generate_prompt_task.delay(job_id)
+        # Queue behind the user's other jobs; dispatched to Celery in turn
+        fair_scheduler.submit("prompt_generation", job_id, "web", "web_user")
 
         return PromptGenerateResponse(
             job_id=job_id,
             status="queued",
             poll_url=f"/prompt-jobs/{job_id}",
+            stream_url=f"/jobs/stream?job_ids={job_id}",
             result_url=f"/ideas/{idea_id}/prompts/{service_type}",
             by_id_url=None
         )
@@ -473,6 +710,8 @@ async def get_job_status(job_id: str):
         if job_data.get("prompt_id"):
             by_id_url = f"/prompts/{job_data['prompt_id']}"
 
+        estimate = await asyncio.to_thread(job_progress.estimate, job_data, "prompt")
+
         return JobStatusResponse(
             job_id=job_id,
             status=job_data["status"],
@@ -482,8 +721,8 @@ async def get_job_status(job_id: str):
             service_type=job_data["service_type"],
             result_url=f"/ideas/{job_data['idea_id']}/prompts/{job_data['service_type']}",
             by_id_url=by_id_url,
-            retry_after=5 if job_data["status"] in [
-                "queued", "running"] else None
+            retry_after=estimate.retry_after,
+            eta_seconds=estimate.eta_seconds
         )
 
     except Exception as e:
@@ -497,14 +736,13 @@ async def get_job_status(job_id: str):
 @app.get("/ideas/{idea_id}/prompts/{service_type}", response_model=PromptResponse)
 async def get_latest_prompt(idea_id: str, service_type: str):
     try:
-        valid_services = ["lovable"]
-        if service_type not in valid_services:
+        if service_type not in SERVICE_TYPES:
             raise HTTPException(
                 status_code=400,
-                detail=f"Invalid service type '{service_type}'. Valid options: {', '.join(valid_services)}"
+                detail=f"Invalid service type '{service_type}'. Valid options: {', '.join(SERVICE_TYPES)}"
             )
 
-        prompt_data = db.get_latest_prompt(idea_id, service_type)
+        prompt_data = await db.get_latest_prompt(idea_id, service_type)
 
         if not prompt_data:
             raise HTTPException(
@@ -531,7 +769,7 @@ async def get_latest_prompt(idea_id: str, service_type: str):
 @app.get("/prompts/{prompt_id}", response_model=PromptResponse)
 async def get_prompt_by_id(prompt_id: str):
     try:
-        prompt_data = db.get_prompt_by_id(prompt_id)
+        prompt_data = await db.get_prompt_by_id(prompt_id)
 
         if not prompt_data:
             raise HTTPException(
@@ -553,3 +791,116 @@ async def get_prompt_by_id(prompt_id: str):
             status_code=500,
             detail="Failed to retrieve prompt"
         )
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus metrics of this API process: latency histograms and error
+    counts per traced operation, Celery and Telegram queue depths, and the
+    admission backlog, throughput and predicted wait of the job queues.
+    """
+    depths = {}
+    try:
+        depths = await asyncio.to_thread(redis_job_manager.get_queue_depths, CELERY_QUEUES)
+        await asyncio.to_thread(queue_admission.snapshots)
+    except Exception as e:
+        print(f"Error reading queue depths: {str(e)}")
+    depths["telegram_send"] = messenger.scheduler.stats()["queued"]
+    set_queue_depths(depths)
+
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
+@app.get("/queues")
+async def get_queues():
+    """
+    Depth, throughput and predicted wait of the admission-controlled queues,
+    and whether each is currently accepting new jobs.
+    """
+    try:
+        snapshots = await asyncio.to_thread(queue_admission.snapshots)
+        return {
+            queue: {**asdict(snapshot), "admitting": snapshot.admitting}
+            for queue, snapshot in snapshots.items()
+        }
+    except Exception as e:
+        print(f"Error retrieving queue stats: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve queue stats"
+        )
+
+
+@app.get("/fair-queue/stats")
+async def get_fair_queue_stats():
+    """
+    Tenants waiting in the fair scheduler, their queued and in-flight jobs,
+    and pending jobs per queue (all processes).
+    """
+    try:
+        return await asyncio.to_thread(fair_scheduler.stats)
+    except Exception as e:
+        print(f"Error retrieving fair queue stats: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve fair queue stats"
+        )
+
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Hit/miss counters of the idea and prompt read cache for this process.
+    """
+    if not isinstance(db, CachedDatabase):
+        return {"enabled": False}
+    return {"enabled": True, **db.stats()}
+
+
+@app.get("/telegram/send-stats")
+async def get_telegram_send_stats():
+    """
+    Outbound Telegram queue depth and send counters for this API process.
+    """
+    return messenger.scheduler.stats()
+
+
+@app.get("/llm-cache/stats")
+async def get_llm_cache_stats():
+    """
+    Hit rate and size of the structured LLM response cache (all processes).
+    """
+    if not isinstance(llm, CachedLLM):
+        return {"enabled": False}
+    try:
+        return {"enabled": True, **(await llm.stats())}
+    except Exception as e:
+        print(f"Error retrieving LLM cache stats: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve LLM cache stats"
+        )
+
+
+@app.get("/llm/usage")
+async def get_llm_usage():
+    """
+    Token usage and prompt cache hit ratio per system prompt version
+    (all processes), with the versions currently loaded.
+    """
+    recorder = UsageRecorder()
+    try:
+        return {
+            "prompts": prompt_registry.versions(),
+            "usage": await recorder.stats()
+        }
+    except Exception as e:
+        print(f"Error retrieving LLM usage: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to retrieve LLM usage"
+        )
+    finally:
+        await recorder.aclose()
@@ -1,12 +1,16 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Dict, List, Optional
 
 
 class IdeaGenerateResponse(BaseModel):
     """Response schema for starting idea generation"""
-    job_id: str = Field(description="Job ID for tracking generation progress")
+    job_id: Optional[str] = Field(
+        None, description="Job ID for tracking generation progress")
     status: str = Field(description="Current job status")
-    poll_url: str = Field(description="URL to poll for job status updates")
+    poll_url: Optional[str] = Field(
+        None, description="URL to poll for job status updates")
+    stream_url: Optional[str] = Field(
+        None, description="URL to stream job status updates (Server-Sent Events)")
 
 
 class IdeaJobStatusResponse(BaseModel):
@@ -19,5 +23,47 @@ class IdeaJobStatusResponse(BaseModel):
     user_id: str = Field(description="User ID who initiated the job")
     retry_after: Optional[int] = Field(
         description="Seconds to wait before next poll")
+    eta_seconds: Optional[float] = Field(
+        None, description="Estimated seconds until the job finishes, from recent stage durations")
     idea_url: Optional[str] = Field(
         description="URL to retrieve the generated idea (available after success)")
+    duplicate_of: Optional[str] = Field(
+        None, description="ID of the existing near-identical idea returned instead of generating")
+    similarity: Optional[float] = Field(
+        None, description="Cosine similarity to the existing idea")
+
+
+class IdeaBatchGenerateRequest(BaseModel):
+    """Request schema for generating many ideas in one batch"""
+    user_inputs: List[str] = Field(
+        min_length=1, max_length=200, description="Idea descriptions to analyse")
+
+
+class IdeaBatchResponse(BaseModel):
+    """Response schema for starting a batch of idea generations"""
+    batch_id: str = Field(description="Batch job ID")
+    status: str = Field(description="Current batch status")
+    total: int = Field(description="Number of ideas in the batch")
+    poll_url: str = Field(description="URL to poll for the aggregate status")
+
+
+class IdeaBatchChild(BaseModel):
+    """Status of one idea within a batch"""
+    job_id: str = Field(description="Child job ID")
+    status: str = Field(description="Job status: queued, running, succeeded, failed")
+    error: Optional[str] = Field(None, description="Error message if job failed")
+    idea_url: Optional[str] = Field(
+        None, description="URL to retrieve the generated idea (available after success)")
+
+
+class IdeaBatchStatusResponse(BaseModel):
+    """Aggregate status of a batch of idea generations"""
+    batch_id: str = Field(description="Batch job ID")
+    status: str = Field(
+        description="Batch status: queued, running, succeeded, partial (some failed), failed")
+    total: int = Field(description="Number of ideas in the batch")
+    counts: Dict[str, int] = Field(description="Number of children per status")
+    progress: float = Field(description="Fraction of children finished (0.0 to 1.0)")
+    retry_after: Optional[int] = Field(
+        None, description="Seconds to wait before next poll")
+    children: List[IdeaBatchChild] = Field(description="Per-idea status, in input order")
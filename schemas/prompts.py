@@ -8,6 +8,8 @@ class PromptGenerateResponse(BaseModel):
     job_id: str = Field(description="Job ID for tracking generation progress")
     status: str = Field(description="Current job status")
     poll_url: str = Field(description="URL to poll job status")
+    stream_url: Optional[str] = Field(
+        None, description="URL to stream job status updates (Server-Sent Events)")
     result_url: str = Field(
         description="URL to get latest prompt for this service")
     by_id_url: Optional[str] = Field(
@@ -29,6 +31,8 @@ class JobStatusResponse(BaseModel):
         None, description="URL to get prompt by ID (available after success)")
     retry_after: Optional[int] = Field(
         None, description="Recommended polling interval in seconds")
+    eta_seconds: Optional[float] = Field(
+        None, description="Estimated seconds until the job finishes, from recent stage durations")
 
 
 class PromptData(BaseModel):
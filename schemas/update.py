@@ -50,3 +50,7 @@ class UpdateListRequest(BaseModel):
         min_length=1,
         max_length=12
     )
+
+
+class IdeaPatchRequest(IdeaUpdateRequest, UpdateListRequest):
+    """Any combination of text fields and lists, applied as one update"""
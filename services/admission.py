@@ -0,0 +1,206 @@
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict
+
+import redis
+
+from config.settings import settings
+from services.fair_queue import PENDING_KEY
+from services.job_progress import JobProgressTracker, job_progress
+from services.observability.metrics import (
+    ADMISSION_REJECTIONS, QUEUE_BACKLOG, QUEUE_PREDICTED_WAIT, QUEUE_THROUGHPUT)
+from services.redis_jobs import redis_job_manager
+
+# Celery queues under admission control and the job pipeline each one runs
+QUEUE_PIPELINES = {
+    "idea_generation": "idea",
+    "prompt_generation": "prompt",
+}
+
+# Queue that undispatched batch children will be submitted to
+BATCH_QUEUE = "idea_generation"
+
+# Every queue served by the shared worker slots, with the pipeline its jobs
+# take about as long as (a Telegram update runs the idea pipeline)
+POOL_QUEUE_PIPELINES = {
+    **QUEUE_PIPELINES,
+    "telegram_updates": "idea",
+}
+
+
+@dataclass(frozen=True)
+class QueueSnapshot:
+    queue: str
+    depth: int
+    measured_throughput: float
+    throughput: float
+    predicted_wait: float
+    wait_slo: float
+
+    @property
+    def admitting(self) -> bool:
+        # An empty queue takes even a batch too large to fit the SLO
+        return self.predicted_wait <= self.wait_slo or self.depth == 0
+
+    @property
+    def retry_after(self) -> int:
+        """
+        Seconds until enough of the backlog drains for the predicted wait to
+        be back within the SLO, or for the queue to be empty
+        """
+        excess = self.predicted_wait - self.wait_slo
+        if self.throughput > 0:
+            excess = min(excess, self.depth / self.throughput)
+        return min(settings.ADMISSION_MAX_RETRY_AFTER_SECONDS, max(1, math.ceil(excess)))
+
+
+class QueueFullError(Exception):
+    """Raised when a queue's predicted wait is over its SLO"""
+
+    def __init__(self, snapshot: QueueSnapshot):
+        super().__init__(
+            f"Queue '{snapshot.queue}' predicted wait {snapshot.predicted_wait:.0f}s "
+            f"exceeds {snapshot.wait_slo:.0f}s")
+        self.snapshot = snapshot
+
+
+class AdmissionController:
+    """
+    Admits new jobs only while the predicted queue wait stays within a
+    per-queue SLO, so a burst is turned away with a useful Retry-After
+    instead of building a backlog that times out anyway.
+
+    Predicted wait is queue depth divided by throughput. Throughput is the
+    larger of the completion rate measured over a sliding window and the
+    modelled capacity; the model keeps an idle system, which completes
+    little, from looking slow. All queues share the same worker slots (and
+    the fair scheduler's dispatch limit), so a queue is modelled with the
+    share of the slots matching its part of the queued work: worker slots
+    times that share over the expected job duration from the stage
+    histograms. A loaded queue therefore slows the others' predictions.
+    Args:
+        redis_client: Sync Redis client holding the queues and counters
+        progress: Source of expected job durations
+        worker_slots: Tasks the workers run at the same time
+        window_seconds: Completion rate window
+        slot_seconds: Granularity of the completion counters
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        progress: JobProgressTracker,
+        worker_slots: int = 2,
+        window_seconds: int = 300,
+        slot_seconds: int = 10
+    ):
+        self.redis_client = redis_client
+        self.progress = progress
+        self.worker_slots = worker_slots
+        self.window_seconds = window_seconds
+        self.slot_seconds = slot_seconds
+
+    def _slot_key(self, queue: str, slot: int) -> str:
+        return f"queue_completions:{queue}:{slot}"
+
+    def record_completion(self, queue: str) -> None:
+        """Count a finished job (succeeded or failed) towards the queue's throughput"""
+        slot = int(time.time() // self.slot_seconds)
+        key = self._slot_key(queue, slot)
+        try:
+            with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.incr(key)
+                pipe.expire(key, self.window_seconds + self.slot_seconds)
+                pipe.execute()
+        except redis.RedisError as e:
+            print(f"Failed to record completion on {queue}: {str(e)}")
+
+    def snapshot(self, queue: str, incoming: int = 0) -> QueueSnapshot:
+        """
+        Current depth (jobs in the Celery queue, those still waiting in the
+        fair scheduler and undispatched batch children), throughput and
+        predicted wait of a queue.
+        Args:
+            queue: Queue to inspect
+            incoming: Jobs about to be added ahead of the one whose wait is
+                predicted, e.g. the rest of a new batch
+        """
+        current = int(time.time() // self.slot_seconds)
+        # The current slot is still filling; measure over complete slots
+        slots = range(current - self.window_seconds // self.slot_seconds, current)
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for pool_queue in POOL_QUEUE_PIPELINES:
+                pipe.llen(pool_queue)
+            pipe.hgetall(PENDING_KEY)
+            pipe.mget([self._slot_key(queue, slot) for slot in slots])
+            *queued, pending, counts = pipe.execute()
+
+        depths = {
+            pool_queue: length + max(0, int(pending.get(pool_queue, 0)))
+            for pool_queue, length in zip(POOL_QUEUE_PIPELINES, queued)
+        }
+        depths[BATCH_QUEUE] += redis_job_manager.count_batch_pending()
+        depth = depths[queue]
+
+        # Seconds of queued work per queue, the new jobs included
+        work = {}
+        for pool_queue, pipeline in POOL_QUEUE_PIPELINES.items():
+            jobs = depths[pool_queue] + (incoming if pool_queue == queue else 0)
+            work[pool_queue] = jobs * self.progress.service_time(pipeline)
+        total_work = sum(work.values())
+        share = work[queue] / total_work if total_work > 0 else 1.0
+
+        completed = sum(int(count) for count in counts if count)
+        measured = completed / (len(slots) * self.slot_seconds)
+        service_time = self.progress.service_time(QUEUE_PIPELINES[queue])
+        modelled = self.worker_slots * share / service_time if service_time > 0 else 0.0
+        throughput = max(measured, modelled)
+
+        return QueueSnapshot(
+            queue=queue,
+            depth=depth,
+            measured_throughput=round(measured, 4),
+            throughput=round(throughput, 4),
+            predicted_wait=round((depth + incoming) / throughput, 1) if throughput > 0 else 0.0,
+            wait_slo=settings.ADMISSION_WAIT_SLO_SECONDS[queue]
+        )
+
+    def admit(self, queue: str, jobs: int = 1) -> None:
+        """
+        Check that a queue can take more jobs: the last of them must be
+        predicted to start within the SLO. Fails open if Redis cannot be
+        read, since the enqueue itself would surface that error.
+        Args:
+            queue: Queue the jobs go to
+            jobs: Number of new jobs, e.g. the size of a batch
+        Raises:
+            QueueFullError: If the predicted wait exceeds the queue's SLO
+        """
+        if not settings.ADMISSION_CONTROL_ENABLED:
+            return
+        try:
+            snapshot = self.snapshot(queue, incoming=jobs - 1)
+        except redis.RedisError as e:
+            print(f"Admission check on {queue} skipped: {str(e)}")
+            return
+        if not snapshot.admitting:
+            ADMISSION_REJECTIONS.labels(queue=queue).inc()
+            raise QueueFullError(snapshot)
+
+    def snapshots(self) -> Dict[str, QueueSnapshot]:
+        """Snapshots of every admission-controlled queue, also exported as metrics"""
+        result = {queue: self.snapshot(queue) for queue in QUEUE_PIPELINES}
+        for queue, s in result.items():
+            QUEUE_BACKLOG.labels(queue=queue).set(s.depth)
+            QUEUE_PREDICTED_WAIT.labels(queue=queue).set(s.predicted_wait)
+            QUEUE_THROUGHPUT.labels(queue=queue).set(s.throughput)
+        return result
+
+
+queue_admission = AdmissionController(
+    redis_job_manager.redis_client,
+    job_progress,
+    worker_slots=settings.WORKER_CONCURRENCY,
+    window_seconds=settings.ADMISSION_THROUGHPUT_WINDOW_SECONDS
+)
@@ -0,0 +1,89 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.observability.tracing import span
+
+StageResults = Dict[str, Any]
+StageCallback = Callable[[str, Any], Awaitable[None]]
+
+
+@dataclass(frozen=True)
+class Stage:
+    """A unit of pipeline work that runs once all of its dependencies finished"""
+    name: str
+    run: Callable[[StageResults], Awaitable[Any]]
+    depends_on: Tuple[str, ...] = ()
+
+
+def _validate(stages: List[Stage]) -> None:
+    names = [stage.name for stage in stages]
+    if len(names) != len(set(names)):
+        raise ValueError("Stage names must be unique")
+
+    by_name = {stage.name: stage for stage in stages}
+    for stage in stages:
+        missing = [dep for dep in stage.depends_on if dep not in by_name]
+        if missing:
+            raise ValueError(
+                f"Stage '{stage.name}' depends on unknown stages: {missing}")
+
+    # Depth-first search for cycles
+    visiting, done = set(), set()
+
+    def visit(name: str) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle detected at stage '{name}'")
+        visiting.add(name)
+        for dep in by_name[name].depends_on:
+            visit(dep)
+        visiting.discard(name)
+        done.add(name)
+
+    for name in names:
+        visit(name)
+
+
+async def run_stages(
+    stages: List[Stage],
+    on_stage_complete: Optional[StageCallback] = None
+) -> StageResults:
+    """
+    Run a dependency graph of stages, starting each stage as soon as its
+    dependencies are done so independent stages overlap.
+    Args:
+        stages: Stages to run; each stage receives the results gathered so far
+        on_stage_complete: Optional coroutine called with (name, result) as
+            each stage finishes
+    Returns:
+        Mapping of stage name to its result
+    """
+    _validate(stages)
+
+    results: StageResults = {}
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_stage(stage: Stage) -> Any:
+        if stage.depends_on:
+            await asyncio.gather(*(tasks[dep] for dep in stage.depends_on))
+        with span(f"stage.{stage.name}", "stage"):
+            result = await stage.run(results)
+        results[stage.name] = result
+        if on_stage_complete:
+            await on_stage_complete(stage.name, result)
+        return result
+
+    for stage in stages:
+        tasks[stage.name] = asyncio.create_task(run_stage(stage))
+
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        await asyncio.gather(*tasks.values(), return_exceptions=True)
+        raise
+
+    return results
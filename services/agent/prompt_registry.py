@@ -0,0 +1,70 @@
+import hashlib
+import os
+import textwrap
+from dataclasses import dataclass
+from typing import Dict
+
+PROMPTS_DIR = os.path.join(os.path.dirname(__file__), "prompts")
+
+
+def normalize_prompt(text: str) -> str:
+    """Dedent, strip trailing whitespace on every line and trim the ends"""
+    lines = textwrap.dedent(text).strip().splitlines()
+    return "\n".join(line.rstrip() for line in lines)
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """
+    A normalized system prompt. Variable parts ({placeholders}) belong at the
+    end so the static prefix is byte-identical across calls and can be served
+    from the provider's prompt cache.
+    """
+    name: str
+    text: str
+    version: str
+
+    @property
+    def ref(self) -> str:
+        """Name and content version, e.g. idea@3f2a9c1b04de"""
+        return f"{self.name}@{self.version}"
+
+    @property
+    def cache_key(self) -> str:
+        """Routing hint that sends requests with this prefix to the same cache"""
+        return f"vision-to-startup:{self.ref}"
+
+    def render(self, **params: str) -> str:
+        return self.text.format(**params) if params else self.text
+
+
+class PromptRegistry:
+    """System prompts loaded from a directory of .md files once at startup"""
+
+    def __init__(self, prompts: Dict[str, PromptTemplate]):
+        self.prompts = prompts
+
+    @classmethod
+    def load(cls, directory: str = PROMPTS_DIR) -> "PromptRegistry":
+        prompts = {}
+        for filename in sorted(os.listdir(directory)):
+            name, extension = os.path.splitext(filename)
+            if extension != ".md":
+                continue
+            with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                text = normalize_prompt(f.read())
+            version = hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+            prompts[name] = PromptTemplate(name=name, text=text, version=version)
+        return cls(prompts)
+
+    def get(self, name: str) -> PromptTemplate:
+        try:
+            return self.prompts[name]
+        except KeyError:
+            raise KeyError(f"Unknown prompt '{name}'") from None
+
+    def versions(self) -> Dict[str, str]:
+        return {name: prompt.version for name, prompt in self.prompts.items()}
+
+
+prompt_registry = PromptRegistry.load()
@@ -1,5 +1,6 @@
 from celery import Celery
 from config.settings import settings
+from services.observability import task_tracing  # noqa: F401 - connects trace propagation signals
 import os
 
 redis_url = getattr(settings, 'REDIS_URL', None)
@@ -15,7 +16,8 @@ celery_app = Celery(
     "noteai",
     broker=redis_url,
     backend=redis_url,
-    include=["services.workers.prompt_worker", "services.workers.idea_worker"]
+    include=["services.workers.prompt_worker", "services.workers.idea_worker",
+             "services.workers.telegram_worker"]
 )
 
 # Celery configuration
@@ -40,7 +42,8 @@ celery_app.conf.update(
     # Routing
     task_routes={
         "services.workers.prompt_worker.generate_prompt_task": {"queue": "prompt_generation"},
-        "services.workers.idea_worker.generate_idea_task": {"queue": "idea_generation"}
+        "services.workers.idea_worker.generate_idea_task": {"queue": "idea_generation"},
+        "services.workers.telegram_worker.process_telegram_update_task": {"queue": "telegram_updates"}
     },
 
     # Timezone
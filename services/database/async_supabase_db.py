@@ -0,0 +1,310 @@
+from .base import AsyncDatabase
+from .pagination import encode_cursor, keyset_filter, MAX_PAGE_SIZE
+from .mappers import (
+    IDEA_SUMMARY_COLUMNS, IDEA_DETAIL_COLUMNS, IDEA_WITH_PROMPTS_COLUMNS,
+    PROMPT_COLUMNS, build_patch, idea_summary, idea_details, idea_with_prompts, prompt_record,
+    prompt_metadata, prompt_for_idea_details
+)
+from typing import List, Dict, Any, Optional
+import asyncio
+import httpx
+from postgrest import AsyncPostgrestClient
+from postgrest.exceptions import APIError
+from services.observability.tracing import traced_methods
+
+
+@traced_methods("supabase")
+class AsyncSupabaseDB(AsyncDatabase):
+    """
+    Async Supabase backend talking to PostgREST over a pooled HTTP/2 client,
+    so queries do not block the event loop.
+    """
+
+    def __init__(self, url: str, key: str, max_connections: int = 20, timeout: float = 10.0):
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            follow_redirects=True,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections
+            )
+        )
+        self.client = AsyncPostgrestClient(
+            f"{url.rstrip('/')}/rest/v1",
+            headers={
+                "Accept": "application/json",
+                "Content-Type": "application/json",
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+            },
+            http_client=self.http_client
+        )
+
+    async def insert_plan(self, user_id: str, idea: str, response: Dict[str, Any], schema_version: int = 1) -> Any:
+        data = {
+            "user_id": user_id,
+            "idea": idea,
+            "response": response,
+            "schema_version": schema_version,
+        }
+        result = await self.client.table("business_plans").insert(data).execute()
+        return result.data
+
+    async def get_all_ideas(self) -> List[Dict[str, Any]]:
+        result = await self.client.table("business_plans").select(
+            "id, user_id, response, created_at"
+        ).order("created_at", desc=True).execute()
+
+        return [idea_summary(plan) for plan in result.data]
+
+    async def get_ideas_page(self, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get one page of idea summaries, newest first, using keyset pagination
+        on (created_at, id) so the cost of a page does not depend on its depth.
+        Raises ValueError for an invalid cursor.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+        query = self.client.table("business_plan_summaries").select(
+            IDEA_SUMMARY_COLUMNS)
+        if cursor:
+            query = query.or_(keyset_filter(cursor))
+
+        result = await query.order("created_at", desc=True).order(
+            "id", desc=True).limit(limit + 1).execute()
+
+        rows = result.data or []
+        ideas = rows[:limit]
+        next_cursor = encode_cursor(ideas[-1]) if len(rows) > limit else None
+
+        return {
+            "ideas": ideas,
+            "next_cursor": next_cursor
+        }
+
+    async def get_idea_summary_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
+        """Get idea summary with same structure as get_all_ideas but for a single idea"""
+        try:
+            result = await self.client.table("business_plans").select(
+                "id, user_id, response, created_at"
+            ).eq("id", idea_id).execute()
+
+            if not result.data or len(result.data) == 0:
+                return None
+
+            return idea_summary(result.data[0])
+
+        except Exception as e:
+            print(f"Error retrieving idea summary for ID {idea_id}: {str(e)}")
+            return None
+
+    async def get_idea_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.client.table("business_plans").select(
+                IDEA_DETAIL_COLUMNS
+            ).eq("id", idea_id).execute()
+
+            if not result.data or len(result.data) == 0:
+                return None
+
+        except Exception:
+            return None
+
+        return idea_details(result.data[0])
+
+    async def get_idea_details(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an idea with its prompts history and latest prompt for service_type
+        in a single request by embedding the prompts resource. Falls back to
+        running the three queries concurrently.
+        """
+        try:
+            result = await self.client.table("business_plans").select(
+                IDEA_WITH_PROMPTS_COLUMNS
+            ).eq("id", idea_id).eq(
+                "latest_prompt.service_type", service_type
+            ).order(
+                "created_at", desc=True, foreign_table="prompts_history"
+            ).order(
+                "created_at", desc=True, foreign_table="latest_prompt"
+            ).limit(1, foreign_table="latest_prompt").execute()
+
+            if not result.data:
+                return None
+
+            return idea_with_prompts(result.data[0])
+
+        except Exception as e:
+            print(
+                f"Embedded idea details query failed for idea {idea_id}, falling back: {str(e)}")
+
+        idea, prompts_history, latest_prompt = await asyncio.gather(
+            self.get_idea_by_id(idea_id),
+            self.get_prompts_metadata_by_idea_id(idea_id),
+            self.get_latest_prompt_for_idea_details(idea_id, service_type)
+        )
+        if idea is None:
+            return None
+        idea["prompts_history"] = prompts_history
+        idea["latest_prompt"] = latest_prompt
+        return idea
+
+    async def patch_idea(
+        self,
+        idea_id: str,
+        fields: Optional[Dict[str, str]] = None,
+        lists: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Update several fields and lists of an idea in one call. The patch is
+        merged into the stored response JSON by the patch_business_plan
+        function, so only the changed keys travel over the wire.
+        """
+        try:
+            patch = build_patch(fields or {}, lists or {})
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+        if not patch:
+            return {
+                "success": False,
+                "error": "At least one field must be provided for update"
+            }
+
+        try:
+            result = await self.client.rpc("patch_business_plan", {
+                "p_id": idea_id,
+                "p_patch": patch
+            }).execute()
+
+            if not result.data:
+                return {
+                    "success": False,
+                    "error": f"Idea with ID '{idea_id}' not found"
+                }
+
+            return {
+                "success": True,
+                "error": None
+            }
+
+        except Exception as e:
+            print(f"Error patching idea {idea_id}: {str(e)}")
+            return {
+                "success": False,
+                "error": "Internal server error occurred while updating idea"
+            }
+
+    async def update_idea_field(self, idea_id: str, field_name: str, field_value: str) -> Dict[str, Any]:
+        return await self.patch_idea(idea_id, fields={field_name: field_value})
+
+    async def update_idea_list(self, idea_id: str, list_type: str, items: List[str]) -> Dict[str, Any]:
+        return await self.patch_idea(idea_id, lists={list_type: items})
+
+    async def save_prompt(self, idea_id: str, service_type: str, prompt: str) -> Dict[str, Any]:
+        try:
+            prompt_data = {
+                "idea_id": idea_id,
+                "service_type": service_type,
+                "prompt": prompt,
+                "created_at": "now()",
+                "updated_at": "now()"
+            }
+
+            result = await self.client.table("prompts").insert(prompt_data).execute()
+
+            if not result.data:
+                return {
+                    "success": False,
+                    "error": "Failed to save prompt to database"
+                }
+
+            return {
+                "success": True,
+                "prompt_id": result.data[0]["id"],
+                "error": None
+            }
+
+        except Exception as e:
+            # prompts.idea_id references business_plans.id
+            if isinstance(e, APIError) and e.code == "23503":
+                return {
+                    "success": False,
+                    "error": f"Idea with ID '{idea_id}' not found"
+                }
+            print(
+                f"Error saving prompt for idea {idea_id}, service {service_type}: {str(e)}")
+            return {
+                "success": False,
+                "error": f"Internal server error occurred while saving prompt"
+            }
+
+    async def get_latest_prompt(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.client.table("prompts").select(
+                PROMPT_COLUMNS
+            ).eq("idea_id", idea_id).eq("service_type", service_type).order("created_at", desc=True).limit(1).execute()
+
+            if not result.data:
+                return None
+
+            return prompt_record(result.data[0])
+
+        except Exception as e:
+            print(
+                f"Error retrieving latest prompt for idea {idea_id}, service {service_type}: {str(e)}")
+            return None
+
+    async def get_prompt_by_id(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.client.table("prompts").select(
+                PROMPT_COLUMNS
+            ).eq("id", prompt_id).execute()
+
+            if not result.data:
+                return None
+
+            return prompt_record(result.data[0])
+
+        except Exception as e:
+            print(f"Error retrieving prompt by ID {prompt_id}: {str(e)}")
+            return None
+
+    async def get_prompts_metadata_by_idea_id(self, idea_id: str) -> List[Dict[str, Any]]:
+        try:
+            result = await self.client.table("prompts").select(
+                "id, service_type, created_at"
+            ).eq("idea_id", idea_id).order("created_at", desc=True).execute()
+
+            if not result.data:
+                return []
+
+            return prompt_metadata(result.data)
+
+        except Exception as e:
+            print(
+                f"Error retrieving prompts metadata for idea {idea_id}: {str(e)}")
+            return []
+
+    async def get_latest_prompt_for_idea_details(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        try:
+            result = await self.client.table("prompts").select(
+                "id, service_type, prompt, created_at"
+            ).eq("idea_id", idea_id).eq("service_type", service_type).order("created_at", desc=True).limit(1).execute()
+
+            if not result.data:
+                return None
+
+            return prompt_for_idea_details(result.data[0])
+
+        except Exception as e:
+            print(
+                f"Error retrieving latest prompt for idea details {idea_id}, service {service_type}: {str(e)}")
+            return None
+
+    async def aclose(self) -> None:
+        await self.http_client.aclose()
@@ -0,0 +1,467 @@
+import asyncio
+import copy
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import redis
+
+from services.redis_jobs import create_redis_client
+from .base import AsyncDatabase, Database
+from .mappers import SERVICE_TYPES
+
+CACHE_PREFIX = "db_cache:"
+INVALIDATION_CHANNEL = "db_cache_invalidations"
+VERSION_SUFFIX = ":version"
+# Version keys outlive any load that could still compare against them
+VERSION_TTL_SECONDS = 86400
+
+# Store a loaded value only if no writer bumped the key's version since the
+# load read it, so a slow load cannot put back a row a write just replaced
+STORE_IF_VERSION_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+_MISSING = object()
+
+
+def idea_keys(idea_id: str) -> List[str]:
+    """Cache keys holding data derived from a business plan row"""
+    return [
+        f"idea:{idea_id}",
+        f"idea_summary:{idea_id}",
+        *(f"idea_detail:{idea_id}:{service_type}" for service_type in SERVICE_TYPES),
+    ]
+
+
+def prompt_keys(idea_id: str, service_type: str) -> List[str]:
+    """Cache keys holding data derived from an idea's prompts"""
+    return [
+        f"latest_prompt:{idea_id}:{service_type}",
+        f"latest_prompt_details:{idea_id}:{service_type}",
+        f"prompts_meta:{idea_id}",
+        f"idea_detail:{idea_id}:{service_type}",
+    ]
+
+
+def _invalidation_pipeline(pipe, keys: List[str]) -> None:
+    """Queue the commands that invalidate keys in every process"""
+    for key in keys:
+        version_key = CACHE_PREFIX + key + VERSION_SUFFIX
+        pipe.incr(version_key)
+        pipe.expire(version_key, VERSION_TTL_SECONDS)
+    pipe.delete(*(CACHE_PREFIX + key for key in keys))
+    pipe.publish(INVALIDATION_CHANNEL, json.dumps(keys))
+
+
+def _inserted_idea_id(result: Any) -> Optional[str]:
+    if result and isinstance(result, list) and isinstance(result[0], dict):
+        return result[0].get("id")
+    return None
+
+
+class LRUCache:
+    """Small in-process LRU with per-entry TTL"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedDatabase(AsyncDatabase):
+    """
+    Read-through cache in front of an AsyncDatabase: an in-process LRU backed
+    by Redis. Writes through this wrapper (or InvalidatingDatabase in other
+    processes) delete the affected Redis keys and broadcast the invalidation
+    so every process drops its local copy.
+
+    Concurrent misses for the same key share one load in-process, and a
+    short Redis lock keeps other processes from loading the same key at once.
+    Writers also bump a per-key version in Redis; a load only stores its
+    result if the version is unchanged, so it cannot resurrect a row that
+    was invalidated while it was reading. Callers get copies of cached
+    values.
+    """
+
+    def __init__(
+        self,
+        db: AsyncDatabase,
+        ttl: int = 300,
+        local_ttl: float = 30.0,
+        local_max_entries: int = 1000,
+        lock_ttl_ms: int = 5000,
+        lock_wait: float = 1.0
+    ):
+        self.db = db
+        self.ttl = ttl
+        self.local = LRUCache(local_max_entries, local_ttl)
+        self.lock_ttl_ms = lock_ttl_ms
+        self.lock_wait = lock_wait
+        self.redis_client = create_redis_client(use_async=True)
+        self._store_script = self.redis_client.register_script(STORE_IF_VERSION_SCRIPT)
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._generations: Dict[str, int] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self.counters = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "lock_waits": 0,
+            "invalidations": 0,
+            "errors": 0,
+        }
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Start listening for invalidations published by other processes"""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def aclose(self) -> None:
+        if self._listener:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await self.redis_client.aclose()
+        await self.db.aclose()
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        keys = json.loads(message["data"])
+                    except (ValueError, TypeError):
+                        continue
+                    self._evict_local(keys)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Cache invalidation listener error: {str(e)}")
+                # Local entries may be stale while disconnected
+                self.local = LRUCache(self.local.max_entries, self.local.ttl)
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    # Stats
+
+    def stats(self) -> Dict[str, Any]:
+        hits = (self.counters["local_hits"] + self.counters["redis_hits"]
+                + self.counters["coalesced"])
+        lookups = hits + self.counters["misses"]
+        return {
+            **self.counters,
+            "local_entries": len(self.local),
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+    # Core
+
+    def _evict_local(self, keys: List[str]) -> None:
+        for key in keys:
+            self.local.delete(key)
+            # Loads already in flight must not store what they read
+            if key in self._inflight:
+                self._generations[key] = self._generations.get(key, 0) + 1
+
+    async def _invalidate(self, keys: List[str]) -> None:
+        self.counters["invalidations"] += 1
+        self._evict_local(keys)
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                _invalidation_pipeline(pipe, keys)
+                await pipe.execute()
+        except redis.RedisError as e:
+            self.counters["errors"] += 1
+            print(f"Cache invalidation failed for {keys}: {str(e)}")
+
+    async def _cached(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        # Cached values are shared, so every caller gets its own copy
+        value = self.local.get(key)
+        if value is not _MISSING:
+            self.counters["local_hits"] += 1
+            return copy.deepcopy(value)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.counters["coalesced"] += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        task = asyncio.ensure_future(self._load(key, loader))
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._load_done(key))
+        return copy.deepcopy(await asyncio.shield(task))
+
+    def _load_done(self, key: str) -> None:
+        self._inflight.pop(key, None)
+        self._generations.pop(key, None)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        generation = self._generations.get(key, 0)
+        redis_key = CACHE_PREFIX + key
+        lock_key = f"{redis_key}:lock"
+        version_key = redis_key + VERSION_SUFFIX
+        version = None
+        locked = False
+
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(redis_key)
+                pipe.get(version_key)
+                raw, version = await pipe.execute()
+            version = version or "0"
+            if raw is None:
+                locked = bool(await self.redis_client.set(
+                    lock_key, "1", nx=True, px=self.lock_ttl_ms))
+                if not locked:
+                    # Another process is loading this key; wait briefly for it
+                    self.counters["lock_waits"] += 1
+                    deadline = time.monotonic() + self.lock_wait
+                    while raw is None and time.monotonic() < deadline:
+                        await asyncio.sleep(0.05)
+                        raw = await self.redis_client.get(redis_key)
+        except redis.RedisError as e:
+            self.counters["errors"] += 1
+            print(f"Cache read failed for {key}: {str(e)}")
+            raw = None
+
+        if raw is not None:
+            self.counters["redis_hits"] += 1
+            value = json.loads(raw)
+            self._store_local(key, value, generation)
+            return value
+
+        self.counters["misses"] += 1
+        try:
+            value = await loader()
+            # Negative results are not cached so new rows show up immediately.
+            # That includes empty lists, which backends also return when a
+            # query failed
+            if value is not None and value != []:
+                current = True
+                try:
+                    # Without a version read there is nothing to compare against
+                    if version is not None:
+                        current = bool(await self._store_script(
+                            keys=[redis_key, version_key],
+                            args=[version, json.dumps(value, default=str), self.ttl]))
+                except redis.RedisError as e:
+                    self.counters["errors"] += 1
+                    print(f"Cache write failed for {key}: {str(e)}")
+                if current:
+                    self._store_local(key, value, generation)
+            return value
+        finally:
+            if locked:
+                try:
+                    await self.redis_client.delete(lock_key)
+                except redis.RedisError:
+                    pass
+
+    def _store_local(self, key: str, value: Any, generation: int) -> None:
+        # Skip if the key was invalidated while it was loading
+        if self._generations.get(key, 0) == generation:
+            self.local.set(key, value)
+
+    # Reads
+
+    async def get_all_ideas(self) -> List[Dict[str, Any]]:
+        return await self.db.get_all_ideas()
+
+    async def get_ideas_page(self, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return await self.db.get_ideas_page(limit, cursor)
+
+    async def get_idea_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
+        return await self._cached(
+            f"idea:{idea_id}", lambda: self.db.get_idea_by_id(idea_id))
+
+    async def get_idea_details(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        return await self._cached(
+            f"idea_detail:{idea_id}:{service_type}",
+            lambda: self.db.get_idea_details(idea_id, service_type))
+
+    async def get_idea_summary_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
+        return await self._cached(
+            f"idea_summary:{idea_id}", lambda: self.db.get_idea_summary_by_id(idea_id))
+
+    async def get_latest_prompt(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        return await self._cached(
+            f"latest_prompt:{idea_id}:{service_type}",
+            lambda: self.db.get_latest_prompt(idea_id, service_type))
+
+    async def get_prompt_by_id(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        # Prompts are immutable once saved
+        return await self._cached(
+            f"prompt:{prompt_id}", lambda: self.db.get_prompt_by_id(prompt_id))
+
+    async def get_prompts_metadata_by_idea_id(self, idea_id: str) -> List[Dict[str, Any]]:
+        return await self._cached(
+            f"prompts_meta:{idea_id}",
+            lambda: self.db.get_prompts_metadata_by_idea_id(idea_id))
+
+    async def get_latest_prompt_for_idea_details(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        return await self._cached(
+            f"latest_prompt_details:{idea_id}:{service_type}",
+            lambda: self.db.get_latest_prompt_for_idea_details(idea_id, service_type))
+
+    # Writes
+
+    async def insert_plan(self, user_id: str, idea: str, response: Dict[str, Any], schema_version: int = 1) -> Any:
+        result = await self.db.insert_plan(user_id, idea, response, schema_version)
+        idea_id = _inserted_idea_id(result)
+        if idea_id:
+            await self._invalidate(idea_keys(idea_id))
+        return result
+
+    async def patch_idea(
+        self,
+        idea_id: str,
+        fields: Optional[Dict[str, str]] = None,
+        lists: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, Any]:
+        result = await self.db.patch_idea(idea_id, fields, lists)
+        if result.get("success"):
+            await self._invalidate(idea_keys(idea_id))
+        return result
+
+    async def update_idea_field(self, idea_id: str, field_name: str, field_value: str) -> Dict[str, Any]:
+        result = await self.db.update_idea_field(idea_id, field_name, field_value)
+        if result.get("success"):
+            await self._invalidate(idea_keys(idea_id))
+        return result
+
+    async def update_idea_list(self, idea_id: str, list_type: str, items: List[str]) -> Dict[str, Any]:
+        result = await self.db.update_idea_list(idea_id, list_type, items)
+        if result.get("success"):
+            await self._invalidate(idea_keys(idea_id))
+        return result
+
+    async def save_prompt(self, idea_id: str, service_type: str, prompt: str) -> Dict[str, Any]:
+        result = await self.db.save_prompt(idea_id, service_type, prompt)
+        if result.get("success"):
+            await self._invalidate(prompt_keys(idea_id, service_type))
+        return result
+
+
+class InvalidatingDatabase(Database):
+    """
+    Sync Database wrapper for processes that write without reading through the
+    cache (Celery workers): writes are delegated, then the affected cache
+    keys are deleted and the invalidation is broadcast.
+    """
+
+    def __init__(self, db: Database):
+        self.db = db
+        self.redis_client = create_redis_client()
+
+    def close(self) -> None:
+        self.db.close()
+        self.redis_client.close()
+
+    def _invalidate(self, keys: List[str]) -> None:
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            _invalidation_pipeline(pipe, keys)
+            pipe.execute()
+        except redis.RedisError as e:
+            print(f"Cache invalidation failed for {keys}: {str(e)}")
+
+    def insert_plan(self, user_id: str, idea: str, response: Dict[str, Any], schema_version: int = 1) -> Any:
+        result = self.db.insert_plan(user_id, idea, response, schema_version)
+        idea_id = _inserted_idea_id(result)
+        if idea_id:
+            self._invalidate(idea_keys(idea_id))
+        return result
+
+    def patch_idea(
+        self,
+        idea_id: str,
+        fields: Optional[Dict[str, str]] = None,
+        lists: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, Any]:
+        result = self.db.patch_idea(idea_id, fields, lists)
+        if result.get("success"):
+            self._invalidate(idea_keys(idea_id))
+        return result
+
+    def update_idea_field(self, idea_id: str, field_name: str, field_value: str) -> Dict[str, Any]:
+        result = self.db.update_idea_field(idea_id, field_name, field_value)
+        if result.get("success"):
+            self._invalidate(idea_keys(idea_id))
+        return result
+
+    def update_idea_list(self, idea_id: str, list_type: str, items: List[str]) -> Dict[str, Any]:
+        result = self.db.update_idea_list(idea_id, list_type, items)
+        if result.get("success"):
+            self._invalidate(idea_keys(idea_id))
+        return result
+
+    def save_prompt(self, idea_id: str, service_type: str, prompt: str) -> Dict[str, Any]:
+        result = self.db.save_prompt(idea_id, service_type, prompt)
+        if result.get("success"):
+            self._invalidate(prompt_keys(idea_id, service_type))
+        return result
+
+    def get_all_ideas(self) -> List[Dict[str, Any]]:
+        return self.db.get_all_ideas()
+
+    def get_ideas_page(self, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        return self.db.get_ideas_page(limit, cursor)
+
+    def get_idea_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
+        return self.db.get_idea_by_id(idea_id)
+
+    def get_idea_details(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        return self.db.get_idea_details(idea_id, service_type)
+
+    def get_idea_summary_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
+        return self.db.get_idea_summary_by_id(idea_id)
+
+    def get_latest_prompt(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        return self.db.get_latest_prompt(idea_id, service_type)
+
+    def get_prompt_by_id(self, prompt_id: str) -> Optional[Dict[str, Any]]:
+        return self.db.get_prompt_by_id(prompt_id)
+
+    def get_prompts_metadata_by_idea_id(self, idea_id: str) -> List[Dict[str, Any]]:
+        return self.db.get_prompts_metadata_by_idea_id(idea_id)
+
+    def get_latest_prompt_for_idea_details(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        return self.db.get_latest_prompt_for_idea_details(idea_id, service_type)
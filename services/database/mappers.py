@@ -0,0 +1,157 @@
+from typing import Any, Dict, List
+
+IDEA_SUMMARY_COLUMNS = (
+    "id, user_id, created_at, title, description, problem_statement, "
+    "target_demographics, key_features_count, reddit_insights_count"
+)
+IDEA_DETAIL_COLUMNS = "id, user_id, idea, response, created_at, schema_version"
+PROMPT_COLUMNS = "id, idea_id, service_type, prompt, created_at, updated_at"
+# Idea row with its prompt history and latest prompt embedded (one request)
+IDEA_WITH_PROMPTS_COLUMNS = (
+    f"{IDEA_DETAIL_COLUMNS}, "
+    "prompts_history:prompts(id, service_type, created_at), "
+    "latest_prompt:prompts(id, service_type, prompt, created_at)"
+)
+
+# Services prompts can be generated for
+SERVICE_TYPES = ["lovable"]
+
+# Editable text fields and lists, mapped to their section of the response JSON
+FIELD_SECTION_MAP = {
+    "title": "idea",
+    "description": "idea",
+    "problem_statement": "idea",
+    "ideal_customer_profile": "icp"
+}
+LIST_SECTION_MAP = {
+    "key_features": ("idea", "key_features"),
+    "pain_points": ("icp", "pain_points"),
+    "target_demographics": ("icp", "target_demographics"),
+    "user_motivations": ("icp", "user_motivations")
+}
+
+
+def _sections(plan: Dict[str, Any]):
+    response = plan.get("response", {})
+    if not isinstance(response, dict):
+        return {}, {}, {}
+    return (
+        response.get("idea", {}),
+        response.get("icp", {}),
+        response.get("reddit_analysis", {})
+    )
+
+
+def idea_summary(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a business_plans row into the summary shown on the home page"""
+    idea_data, icp_data, reddit_data = _sections(plan)
+    return {
+        "id": plan["id"],
+        "user_id": plan["user_id"],
+        "created_at": plan["created_at"],
+        "title": idea_data.get("title", ""),
+        "description": idea_data.get("description", ""),
+        "problem_statement": idea_data.get("problem_statement", ""),
+        "target_demographics": icp_data.get("target_demographics", ""),
+        "key_features_count": len(idea_data.get("key_features", [])),
+        "reddit_insights_count": len(reddit_data.get("challenging_feedback", [])) + len(reddit_data.get("supportive_feedback", [])),
+    }
+
+
+def idea_details(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a business_plans row to the full idea detail structure"""
+    idea_data, icp_data, reddit_data = _sections(plan)
+    return {
+        "id": plan["id"],
+        "user_id": plan["user_id"],
+        "original_idea": plan["idea"],
+        "created_at": plan["created_at"],
+        "schema_version": plan.get("schema_version", 1),
+        "idea": {
+            "title": idea_data.get("title", ""),
+            "description": idea_data.get("description", ""),
+            "problem_statement": idea_data.get("problem_statement", ""),
+            "key_features": idea_data.get("key_features", []),
+            "confidence": idea_data.get("confidence", 0.0)
+        },
+        "icp": {
+            "target_demographics": icp_data.get("target_demographics", []),
+            "ideal_customer_profile": icp_data.get("ideal_customer_profile", ""),
+            "pain_points": icp_data.get("pain_points", []),
+            "user_motivations": icp_data.get("user_motivations", []),
+            "confidence": icp_data.get("confidence", 0.0)
+        },
+        "reddit_analysis": {
+            "supportive_feedback": reddit_data.get("supportive_feedback", []),
+            "challenging_feedback": reddit_data.get("challenging_feedback", []),
+            "relevant_subreddits": reddit_data.get("relevant_subreddits", []),
+            "confidence": reddit_data.get("confidence", 0.0)
+        }
+    }
+
+
+def prompt_record(prompt_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": prompt_data["id"],
+        "idea_id": prompt_data["idea_id"],
+        "service_type": prompt_data["service_type"],
+        "prompt": prompt_data["prompt"],
+        "created_at": prompt_data["created_at"],
+        "updated_at": prompt_data["updated_at"]
+    }
+
+
+def prompt_metadata(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "prompt_id": prompt_data["id"],
+            "service_type": prompt_data["service_type"],
+            "created_at": prompt_data["created_at"]
+        }
+        for prompt_data in rows
+    ]
+
+
+def prompt_for_idea_details(prompt_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": prompt_data["id"],
+        "service_type": prompt_data["service_type"],
+        "prompt": prompt_data["prompt"],
+        "created_at": prompt_data["created_at"]
+    }
+
+
+def idea_with_prompts(plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a business_plans row with embedded prompts to the idea detail
+    structure including prompts_history and latest_prompt"""
+    idea = idea_details(plan)
+    idea["prompts_history"] = prompt_metadata(plan.get("prompts_history") or [])
+    latest_prompt = plan.get("latest_prompt") or []
+    idea["latest_prompt"] = prompt_for_idea_details(
+        latest_prompt[0]) if latest_prompt else None
+    return idea
+
+
+def build_patch(fields: Dict[str, Any], lists: Dict[str, List[str]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Build a {section: {key: value}} patch of the response JSON from editable
+    fields and lists. Raises ValueError for names that cannot be updated.
+    """
+    patch: Dict[str, Dict[str, Any]] = {}
+
+    for field_name, field_value in fields.items():
+        section = FIELD_SECTION_MAP.get(field_name)
+        if not section:
+            allowed_fields = list(FIELD_SECTION_MAP.keys())
+            raise ValueError(
+                f"Field '{field_name}' is not allowed for update. Allowed fields: {allowed_fields}")
+        patch.setdefault(section, {})[field_name] = field_value
+
+    for list_type, items in lists.items():
+        if list_type not in LIST_SECTION_MAP:
+            raise ValueError(f"Field '{list_type}' is not allowed for update.")
+        section, field = LIST_SECTION_MAP[list_type]
+        patch.setdefault(section, {})[field] = [
+            item.strip() for item in items if item.strip()]
+
+    return patch
@@ -0,0 +1,35 @@
+import base64
+import json
+from typing import Any, Dict, Tuple
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Encode the (created_at, id) keyset position of a row as an opaque cursor"""
+    raw = json.dumps([row["created_at"], str(row["id"])])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor into (created_at, id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(
+            base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(created_at), str(row_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def keyset_filter(cursor: str) -> str:
+    """PostgREST or-filter selecting rows strictly after the cursor in
+    (created_at desc, id desc) order"""
+    created_at, row_id = decode_cursor(cursor)
+    created_at = created_at.replace('"', '')
+    row_id = row_id.replace('"', '')
+    return (
+        f'created_at.lt."{created_at}",'
+        f'and(created_at.eq."{created_at}",id.lt."{row_id}")'
+    )
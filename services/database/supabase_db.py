@@ -1,12 +1,24 @@
 from .base import Database
+from .pagination import encode_cursor, keyset_filter, MAX_PAGE_SIZE
+from .mappers import (
+    IDEA_SUMMARY_COLUMNS, IDEA_DETAIL_COLUMNS, IDEA_WITH_PROMPTS_COLUMNS,
+    PROMPT_COLUMNS, build_patch, idea_summary, idea_details, idea_with_prompts, prompt_record,
+    prompt_metadata, prompt_for_idea_details
+)
 from typing import List, Dict, Any, Optional
 from supabase import create_client, Client
+from postgrest.exceptions import APIError
+from services.observability.tracing import traced_methods
 
 
+@traced_methods("supabase")
 class SupabaseDB(Database):
     def __init__(self, url: str, key: str):
         self.client: Client = create_client(url, key)
 
+    def close(self) -> None:
+        self.client.postgrest.aclose()
+
     def insert_plan(self, user_id: str, idea: str, response: Dict[str, Any], schema_version: int = 1) -> Any:
         data = {
             "user_id": user_id,
@@ -22,30 +34,32 @@ class SupabaseDB(Database):
             "id, user_id, response, created_at"
         ).order("created_at", desc=True).execute()
 
-        ideas = []
-        for plan in result.data:
-            response = plan.get("response", {})
-            idea_data = response.get("idea", {}) if isinstance(
-                response, dict) else {}
-            icp_data = response.get("icp", {}) if isinstance(
-                response, dict) else {}
-            reddit_data = response.get("reddit_analysis", {}) if isinstance(
-                response, dict) else {}
-
-            idea_entry = {
-                "id": plan["id"],
-                "user_id": plan["user_id"],
-                "created_at": plan["created_at"],
-                "title": idea_data.get("title", ""),
-                "description": idea_data.get("description", ""),
-                "problem_statement": idea_data.get("problem_statement", ""),
-                "target_demographics": icp_data.get("target_demographics", ""),
-                "key_features_count": len(idea_data.get("key_features", [])),
-                "reddit_insights_count": len(reddit_data.get("challenging_feedback", [])) + len(reddit_data.get("supportive_feedback", [])),
-            }
-            ideas.append(idea_entry)
+        return [idea_summary(plan) for plan in result.data]
+
+    def get_ideas_page(self, limit: int, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get one page of idea summaries, newest first, using keyset pagination
+        on (created_at, id) so the cost of a page does not depend on its depth.
+        Raises ValueError for an invalid cursor.
+        """
+        limit = max(1, min(limit, MAX_PAGE_SIZE))
 
-        return ideas
+        query = self.client.table("business_plan_summaries").select(
+            IDEA_SUMMARY_COLUMNS)
+        if cursor:
+            query = query.or_(keyset_filter(cursor))
+
+        result = query.order("created_at", desc=True).order(
+            "id", desc=True).limit(limit + 1).execute()
+
+        rows = result.data or []
+        ideas = rows[:limit]
+        next_cursor = encode_cursor(ideas[-1]) if len(rows) > limit else None
+
+        return {
+            "ideas": ideas,
+            "next_cursor": next_cursor
+        }
 
     def get_idea_summary_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
         """Get idea summary with same structure as get_all_ideas but for a single idea"""
@@ -57,26 +71,7 @@ class SupabaseDB(Database):
             if not result.data or len(result.data) == 0:
                 return None
 
-            plan = result.data[0]
-            response = plan.get("response", {})
-            idea_data = response.get("idea", {}) if isinstance(
-                response, dict) else {}
-            icp_data = response.get("icp", {}) if isinstance(
-                response, dict) else {}
-            reddit_data = response.get("reddit_analysis", {}) if isinstance(
-                response, dict) else {}
-
-            return {
-                "id": plan["id"],
-                "user_id": plan["user_id"],
-                "created_at": plan["created_at"],
-                "title": idea_data.get("title", ""),
-                "description": idea_data.get("description", ""),
-                "problem_statement": idea_data.get("problem_statement", ""),
-                "target_demographics": icp_data.get("target_demographics", ""),
-                "key_features_count": len(idea_data.get("key_features", [])),
-                "reddit_insights_count": len(reddit_data.get("challenging_feedback", [])) + len(reddit_data.get("supportive_feedback", [])),
-            }
+            return idea_summary(result.data[0])
 
         except Exception as e:
             print(f"Error retrieving idea summary for ID {idea_id}: {str(e)}")
@@ -85,7 +80,7 @@ class SupabaseDB(Database):
     def get_idea_by_id(self, idea_id: str) -> Optional[Dict[str, Any]]:
         try:
             result = self.client.table("business_plans").select(
-                "id, user_id, idea, response, created_at, schema_version"
+                IDEA_DETAIL_COLUMNS
             ).eq("id", idea_id).execute()
 
             if not result.data or len(result.data) == 0:
@@ -94,121 +89,71 @@ class SupabaseDB(Database):
         except Exception:
             return None
 
-        plan = result.data[0]
-        response = plan.get("response", {})
+        return idea_details(result.data[0])
 
-        idea_data = response.get("idea", {}) if isinstance(
-            response, dict) else {}
-        icp_data = response.get("icp", {}) if isinstance(
-            response, dict) else {}
-        reddit_data = response.get(
-            "reddit_analysis", {}) if isinstance(response, dict) else {}
-
-        return {
-            "id": plan["id"],
-            "user_id": plan["user_id"],
-            "original_idea": plan["idea"],
-            "created_at": plan["created_at"],
-            "schema_version": plan.get("schema_version", 1),
-            "idea": {
-                "title": idea_data.get("title", ""),
-                "description": idea_data.get("description", ""),
-                "problem_statement": idea_data.get("problem_statement", ""),
-                "key_features": idea_data.get("key_features", []),
-                "confidence": idea_data.get("confidence", 0.0)
-            },
-            "icp": {
-                "target_demographics": icp_data.get("target_demographics", []),
-                "ideal_customer_profile": icp_data.get("ideal_customer_profile", ""),
-                "pain_points": icp_data.get("pain_points", []),
-                "user_motivations": icp_data.get("user_motivations", []),
-                "confidence": icp_data.get("confidence", 0.0)
-            },
-            "reddit_analysis": {
-                "supportive_feedback": reddit_data.get("supportive_feedback", []),
-                "challenging_feedback": reddit_data.get("challenging_feedback", []),
-                "relevant_subreddits": reddit_data.get("relevant_subreddits", []),
-                "confidence": reddit_data.get("confidence", 0.0)
-            }
-        }
-
-    def update_idea_field(self, idea_id: str, field_name: str, field_value: str) -> Dict[str, Any]:
+    def get_idea_details(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
+        """
+        Get an idea with its prompts history and latest prompt for service_type
+        in a single request by embedding the prompts resource.
+        """
         try:
-            field_section_map = {
-                "title": "idea",
-                "description": "idea",
-                "problem_statement": "idea",
-                "ideal_customer_profile": "icp"
-            }
-
-            section = field_section_map.get(field_name)
-            if not section:
-                allowed_fields = list(field_section_map.keys())
-                return {
-                    "success": False,
-                    "error": f"Field '{field_name}' is not allowed for update. Allowed fields: {allowed_fields}"
-                }
-
             result = self.client.table("business_plans").select(
-                "response"
-            ).eq("id", idea_id).execute()
+                IDEA_WITH_PROMPTS_COLUMNS
+            ).eq("id", idea_id).eq(
+                "latest_prompt.service_type", service_type
+            ).order(
+                "created_at", desc=True, foreign_table="prompts_history"
+            ).order(
+                "created_at", desc=True, foreign_table="latest_prompt"
+            ).limit(1, foreign_table="latest_prompt").execute()
 
             if not result.data:
-                return {
-                    "success": False,
-                    "error": f"Idea with ID '{idea_id}' not found"
-                }
-
-            response = result.data[0]["response"]
-
-            if section not in response:
-                response[section] = {}
-
-            response[section][field_name] = field_value
+                return None
 
-            update_result = self.client.table("business_plans").update({
-                "response": response
-            }).eq("id", idea_id).execute()
+            return idea_with_prompts(result.data[0])
 
-            if not update_result.data:
-                return {
-                    "success": False,
-                    "error": "Failed to update idea field in database"
-                }
+        except Exception as e:
+            print(
+                f"Embedded idea details query failed for idea {idea_id}, falling back: {str(e)}")
 
+        idea = self.get_idea_by_id(idea_id)
+        if idea is None:
+            return None
+        idea["prompts_history"] = self.get_prompts_metadata_by_idea_id(idea_id)
+        idea["latest_prompt"] = self.get_latest_prompt_for_idea_details(
+            idea_id, service_type)
+        return idea
+
+    def patch_idea(
+        self,
+        idea_id: str,
+        fields: Optional[Dict[str, str]] = None,
+        lists: Optional[Dict[str, List[str]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Update several fields and lists of an idea in one call. The patch is
+        merged into the stored response JSON by the patch_business_plan
+        function, so only the changed keys travel over the wire.
+        """
+        try:
+            patch = build_patch(fields or {}, lists or {})
+        except ValueError as e:
             return {
-                "success": True,
-                "error": None
+                "success": False,
+                "error": str(e)
             }
 
-        except Exception as e:
-            print(
-                f"Error updating idea field {field_name} for idea {idea_id}: {str(e)}")
+        if not patch:
             return {
                 "success": False,
-                "error": "Internal server error occurred while updating idea"
+                "error": "At least one field must be provided for update"
             }
 
-    def update_idea_list(self, idea_id: str, list_type: str, items: List[str]) -> Dict[str, Any]:
         try:
-            list_section_map = {
-                "key_features": ("idea", "key_features"),
-                "pain_points": ("icp", "pain_points"),
-                "target_demographics": ("icp", "target_demographics"),
-                "user_motivations": ("icp", "user_motivations")
-            }
-
-            if list_type not in list_section_map:
-                return {
-                    "success": False,
-                    "error": f"Field '{list_type}' is not allowed for update."
-                }
-
-            section, field = list_section_map[list_type]
-
-            result = self.client.table("business_plans").select(
-                "response"
-            ).eq("id", idea_id).execute()
+            result = self.client.rpc("patch_business_plan", {
+                "p_id": idea_id,
+                "p_patch": patch
+            }).execute()
 
             if not result.data:
                 return {
@@ -216,46 +161,26 @@ class SupabaseDB(Database):
                     "error": f"Idea with ID '{idea_id}' not found"
                 }
 
-            response = result.data[0]["response"]
-
-            if section not in response:
-                response[section] = {}
-
-            cleaned_items = [item.strip() for item in items if item.strip()]
-            response[section][field] = cleaned_items
-
-            update_result = self.client.table("business_plans").update({
-                "response": response
-            }).eq("id", idea_id).execute()
-
-            if not update_result.data:
-                return {
-                    "success": False,
-                    "error": "Failed to update list in database"
-                }
-
             return {
                 "success": True,
                 "error": None
             }
 
         except Exception as e:
-            print(f"Error updating {list_type} for idea {idea_id}: {str(e)}")
+            print(f"Error patching idea {idea_id}: {str(e)}")
             return {
                 "success": False,
-                "error": f"Internal server error occurred while updating {list_type}"
+                "error": "Internal server error occurred while updating idea"
             }
 
+    def update_idea_field(self, idea_id: str, field_name: str, field_value: str) -> Dict[str, Any]:
+        return self.patch_idea(idea_id, fields={field_name: field_value})
+
+    def update_idea_list(self, idea_id: str, list_type: str, items: List[str]) -> Dict[str, Any]:
+        return self.patch_idea(idea_id, lists={list_type: items})
+
     def save_prompt(self, idea_id: str, service_type: str, prompt: str) -> Dict[str, Any]:
         try:
-            idea_check = self.client.table("business_plans").select(
-                "id").eq("id", idea_id).execute()
-            if not idea_check.data:
-                return {
-                    "success": False,
-                    "error": f"Idea with ID '{idea_id}' not found"
-                }
-
             prompt_data = {
                 "idea_id": idea_id,
                 "service_type": service_type,
@@ -279,6 +204,12 @@ class SupabaseDB(Database):
             }
 
         except Exception as e:
+            # prompts.idea_id references business_plans.id
+            if isinstance(e, APIError) and e.code == "23503":
+                return {
+                    "success": False,
+                    "error": f"Idea with ID '{idea_id}' not found"
+                }
             print(
                 f"Error saving prompt for idea {idea_id}, service {service_type}: {str(e)}")
             return {
@@ -289,21 +220,13 @@ class SupabaseDB(Database):
     def get_latest_prompt(self, idea_id: str, service_type: str) -> Optional[Dict[str, Any]]:
         try:
             result = self.client.table("prompts").select(
-                "id, idea_id, service_type, prompt, created_at, updated_at"
+                PROMPT_COLUMNS
             ).eq("idea_id", idea_id).eq("service_type", service_type).order("created_at", desc=True).limit(1).execute()
 
             if not result.data:
                 return None
 
-            prompt_data = result.data[0]
-            return {
-                "id": prompt_data["id"],
-                "idea_id": prompt_data["idea_id"],
-                "service_type": prompt_data["service_type"],
-                "prompt": prompt_data["prompt"],
-                "created_at": prompt_data["created_at"],
-                "updated_at": prompt_data["updated_at"]
-            }
+            return prompt_record(result.data[0])
 
         except Exception as e:
             print(
@@ -313,21 +236,13 @@ class SupabaseDB(Database):
     def get_prompt_by_id(self, prompt_id: str) -> Optional[Dict[str, Any]]:
         try:
             result = self.client.table("prompts").select(
-                "id, idea_id, service_type, prompt, created_at, updated_at"
+                PROMPT_COLUMNS
             ).eq("id", prompt_id).execute()
 
             if not result.data:
                 return None
 
-            prompt_data = result.data[0]
-            return {
-                "id": prompt_data["id"],
-                "idea_id": prompt_data["idea_id"],
-                "service_type": prompt_data["service_type"],
-                "prompt": prompt_data["prompt"],
-                "created_at": prompt_data["created_at"],
-                "updated_at": prompt_data["updated_at"]
-            }
+            return prompt_record(result.data[0])
 
         except Exception as e:
             print(f"Error retrieving prompt by ID {prompt_id}: {str(e)}")
@@ -342,15 +257,7 @@ class SupabaseDB(Database):
             if not result.data:
                 return []
 
-            prompts_metadata = []
-            for prompt_data in result.data:
-                prompts_metadata.append({
-                    "prompt_id": prompt_data["id"],
-                    "service_type": prompt_data["service_type"],
-                    "created_at": prompt_data["created_at"]
-                })
-
-            return prompts_metadata
+            return prompt_metadata(result.data)
 
         except Exception as e:
             print(
@@ -366,13 +273,7 @@ class SupabaseDB(Database):
             if not result.data:
                 return None
 
-            prompt_data = result.data[0]
-            return {
-                "id": prompt_data["id"],
-                "service_type": prompt_data["service_type"],
-                "prompt": prompt_data["prompt"],
-                "created_at": prompt_data["created_at"]
-            }
+            return prompt_for_idea_details(result.data[0])
 
         except Exception as e:
             print(
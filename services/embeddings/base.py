@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class Embedder(ABC):
+    dimensions: int
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError("embed method must be implemented")
+
+    async def aclose(self) -> None:
+        """Release pooled connections"""
+        return None
@@ -0,0 +1,20 @@
+from config.settings import settings
+from .base import Embedder
+from .hashing_embedder import HashingEmbedder
+from .openai_embedder import OpenAIEmbedder
+
+
+def create_embedder() -> Embedder:
+    """Build the embedder selected by settings.EMBEDDING_BACKEND"""
+    backend = settings.EMBEDDING_BACKEND.lower()
+
+    if backend == "openai":
+        return OpenAIEmbedder(
+            api_key=settings.OPENAI_API_KEY,
+            model=settings.EMBEDDING_MODEL,
+            dimensions=settings.EMBEDDING_DIMENSIONS
+        )
+    if backend == "hashing":
+        return HashingEmbedder(dimensions=settings.EMBEDDING_DIMENSIONS)
+
+    raise ValueError(f"Unknown embedding backend '{settings.EMBEDDING_BACKEND}'")
@@ -0,0 +1,28 @@
+import hashlib
+import re
+from typing import List
+from .base import Embedder
+
+
+class HashingEmbedder(Embedder):
+    """
+    Offline embedder using feature hashing of words and word bigrams.
+    Captures lexical overlap only; meant for local runs and benchmarks.
+    """
+
+    def __init__(self, dimensions: int = 512):
+        self.dimensions = dimensions
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimensions
+        words = re.findall(r"\w+", text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for feature in features:
+            digest = hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+            sign = 1.0 if digest[4] & 1 else -1.0
+            vector[bucket] += sign
+        return vector
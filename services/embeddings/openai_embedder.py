@@ -0,0 +1,27 @@
+from typing import List, Optional
+from openai import AsyncOpenAI
+from .base import Embedder
+
+
+class OpenAIEmbedder(Embedder):
+    def __init__(self, api_key: str, model: str, dimensions: Optional[int] = None):
+        if not api_key:
+            raise ValueError("OpenAI API key not provided for embedder")
+        self.client = AsyncOpenAI(api_key=api_key, timeout=30)
+        self.model = model
+        self.dimensions = dimensions or 1536
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+
+        resp = await self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            dimensions=self.dimensions,
+        )
+
+        return [item.embedding for item in sorted(resp.data, key=lambda item: item.index)]
+
+    async def aclose(self) -> None:
+        await self.client.close()
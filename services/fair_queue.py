@@ -0,0 +1,335 @@
+import time
+from typing import Any, Callable, Dict, List
+
+from config.settings import settings
+from services.celery_app import celery_app
+from services.observability.tracing import current_span
+from services.redis_jobs import redis_job_manager
+
+RING_KEY = "fairq:ring"
+IN_FLIGHT_KEY = "fairq:in_flight"
+ENTRY_TENANT_KEY = "fairq:entry_tenant"
+ENTRY_TRACE_KEY = "fairq:entry_trace"
+TENANT_IN_FLIGHT_KEY = "fairq:tenant_in_flight"
+TENANT_WEIGHT_KEY = "fairq:tenant_weight"
+TENANT_CAP_KEY = "fairq:tenant_cap"
+CREDITS_KEY = "fairq:credits"
+PENDING_KEY = "fairq:pending"
+TENANT_QUEUE_PREFIX = "fairq:tenant:"
+
+# Celery task behind each queue, from the routing table
+QUEUE_TASKS = {route["queue"]: name for name,
+               route in celery_app.conf.task_routes.items()}
+
+# Append (or, to undo a failed dispatch, prepend) an entry to the tenant's
+# sub-queue; a tenant joins the round-robin ring when its sub-queue becomes
+# non-empty, so ring membership always matches pending work
+SUBMIT_SCRIPT = """
+local tenant_queue = ARGV[8] .. ARGV[1]
+local length
+if ARGV[7] == '1' then
+    length = redis.call('LPUSH', tenant_queue, ARGV[2])
+else
+    length = redis.call('RPUSH', tenant_queue, ARGV[2])
+end
+redis.call('HSET', KEYS[2], ARGV[1], ARGV[3])
+redis.call('HSET', KEYS[3], ARGV[1], ARGV[4])
+redis.call('HINCRBY', KEYS[4], ARGV[5], 1)
+if ARGV[6] ~= '' then
+    redis.call('HSET', KEYS[5], ARGV[2], ARGV[6])
+end
+if length == 1 then
+    redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+return length
+"""
+
+# Weighted round robin over the ring: the tenant at the head gets up to
+# `weight` consecutive dispatches, then moves to the tail. Tenants at their
+# in-flight cap pass their turn. Dispatched entries are leased until
+# completion; expired leases (a completion that was never reported) are
+# reclaimed first and returned next to the dispatched entries.
+DISPATCH_SCRIPT = """
+local ring, in_flight, entry_tenant, entry_trace = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local tenant_in_flight, weights, caps, credits, pending = KEYS[5], KEYS[6], KEYS[7], KEYS[8], KEYS[9]
+local now = tonumber(ARGV[1])
+local budget = tonumber(ARGV[2]) - redis.call('ZCARD', in_flight)
+local lease = tonumber(ARGV[3])
+local prefix = ARGV[4]
+
+local function release(entry)
+    local tenant = redis.call('HGET', entry_tenant, entry)
+    redis.call('ZREM', in_flight, entry)
+    redis.call('HDEL', entry_tenant, entry)
+    if tenant and redis.call('HINCRBY', tenant_in_flight, tenant, -1) <= 0 then
+        redis.call('HDEL', tenant_in_flight, tenant)
+    end
+end
+
+local reclaimed = redis.call('ZRANGEBYSCORE', in_flight, '-inf', now)
+for _, entry in ipairs(reclaimed) do
+    release(entry)
+    budget = budget + 1
+end
+
+local function leave(tenant)
+    redis.call('LPOP', ring)
+    redis.call('HDEL', weights, tenant)
+    redis.call('HDEL', caps, tenant)
+    redis.call('HDEL', credits, tenant)
+end
+
+local function rotate(tenant)
+    redis.call('RPUSH', ring, redis.call('LPOP', ring))
+    redis.call('HDEL', credits, tenant)
+end
+
+local dispatched = {}
+local passed = 0
+while budget > 0 do
+    local tenant = redis.call('LINDEX', ring, 0)
+    if not tenant then
+        break
+    end
+    local running = tonumber(redis.call('HGET', tenant_in_flight, tenant) or '0')
+    local cap = tonumber(redis.call('HGET', caps, tenant) or '1')
+    if running >= cap then
+        rotate(tenant)
+        passed = passed + 1
+        if passed >= redis.call('LLEN', ring) then
+            break
+        end
+    else
+        local tenant_queue = prefix .. tenant
+        local entry = redis.call('LPOP', tenant_queue)
+        if not entry then
+            leave(tenant)
+        else
+            passed = 0
+            budget = budget - 1
+            redis.call('ZADD', in_flight, now + lease, entry)
+            redis.call('HSET', entry_tenant, entry, tenant)
+            redis.call('HINCRBY', tenant_in_flight, tenant, 1)
+            redis.call('HINCRBY', pending, string.match(entry, '^([^|]+)|'), -1)
+            local trace = redis.call('HGET', entry_trace, entry) or ''
+            redis.call('HDEL', entry_trace, entry)
+            table.insert(dispatched, entry)
+            table.insert(dispatched, tenant)
+            table.insert(dispatched, trace)
+
+            local left = tonumber(redis.call('HGET', credits, tenant) or redis.call('HGET', weights, tenant) or '1') - 1
+            if redis.call('LLEN', tenant_queue) == 0 then
+                leave(tenant)
+            elseif left <= 0 then
+                rotate(tenant)
+            else
+                redis.call('HSET', credits, tenant, left)
+            end
+        end
+    end
+end
+return {dispatched, reclaimed}
+"""
+
+# Release a finished entry's lease; returns 0 if it held none
+COMPLETE_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+local tenant = redis.call('HGET', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+if tenant and redis.call('HINCRBY', KEYS[3], tenant, -1) <= 0 then
+    redis.call('HDEL', KEYS[3], tenant)
+end
+return 1
+"""
+
+
+def _entry(queue: str, job_id: str) -> str:
+    return f"{queue}|{job_id}"
+
+
+class FairScheduler:
+    """
+    Fair queuing in front of the Celery generation queues. Jobs wait in
+    per-tenant sub-queues in Redis and are handed to Celery by weighted round
+    robin, at most `max_dispatched` at a time across all queues (the worker
+    slots), so the Celery FIFOs stay short and one tenant's burst cannot
+    delay another tenant by more than about one job. Each tenant class has a
+    weight (turns per round) and a cap on jobs in flight.
+
+    Tenants are "<class>:<id>", e.g. telegram:12345, web:web_user or
+    batch:web_user. Dispatch runs whenever a job is submitted or completes.
+    A job whose lease expires was lost by its worker (acks_late does not
+    redeliver after a crash): it is failed and the queue's lease-expiry
+    handler runs, e.g. to release the next child of its batch.
+    Args:
+        redis_client: Sync Redis client (tenant sub-queue keys are built in
+            the scripts, so this needs a single, non-cluster Redis)
+        max_dispatched: Jobs queued in Celery or running at once
+        lease_seconds: After this long an unreported job stops counting
+            against the limits
+        classes: Weight and max_in_flight per tenant class
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        max_dispatched: int,
+        lease_seconds: int,
+        classes: Dict[str, Dict[str, int]]
+    ):
+        self.redis_client = redis_client
+        self.max_dispatched = max_dispatched
+        self.lease_seconds = lease_seconds
+        self.classes = classes
+        self._submit_script = redis_client.register_script(SUBMIT_SCRIPT)
+        self._dispatch_script = redis_client.register_script(DISPATCH_SCRIPT)
+        self._complete_script = redis_client.register_script(COMPLETE_SCRIPT)
+        self._expiry_handlers: Dict[str, Callable[[str, Dict[str, Any]], None]] = {}
+
+    def on_lease_expired(self, queue: str, handler: Callable[[str, Dict[str, Any]], None]) -> None:
+        """Run handler(job_id, job) for lost jobs of a queue after failing them"""
+        self._expiry_handlers[queue] = handler
+
+    def _push(self, queue: str, job_id: str, tenant: str, traceparent: str, front: bool = False) -> None:
+        tenant_class = self.classes.get(tenant.split(":", 1)[0], {})
+        self._submit_script(
+            keys=[RING_KEY, TENANT_WEIGHT_KEY, TENANT_CAP_KEY, PENDING_KEY, ENTRY_TRACE_KEY],
+            args=[
+                tenant,
+                _entry(queue, job_id),
+                max(1, tenant_class.get("weight", 1)),
+                max(1, tenant_class.get("max_in_flight", 1)),
+                queue,
+                traceparent,
+                "1" if front else "0",
+                TENANT_QUEUE_PREFIX
+            ]
+        )
+
+    def submit(self, queue: str, job_id: str, tenant_class: str, tenant_id: str) -> None:
+        """
+        Queue a job for its tenant and dispatch whatever is now allowed.
+        Args:
+            queue: Celery queue the job's task is routed to
+            job_id: Job passed to the task
+            tenant_class: Key of the configured classes, e.g. telegram
+            tenant_id: Identity within the class, e.g. the chat ID
+        """
+        if not settings.FAIR_QUEUE_ENABLED:
+            celery_app.send_task(QUEUE_TASKS[queue], args=[job_id])
+            return
+        span = current_span()
+        self._push(queue, job_id, f"{tenant_class}:{tenant_id}",
+                   span.traceparent if span else "")
+        self.dispatch()
+
+    def complete(self, queue: str, job_id: str) -> None:
+        """Release a finished job's slot and dispatch the next jobs"""
+        if not settings.FAIR_QUEUE_ENABLED:
+            return
+        self._complete_script(
+            keys=[IN_FLIGHT_KEY, ENTRY_TENANT_KEY, TENANT_IN_FLIGHT_KEY],
+            args=[_entry(queue, job_id)]
+        )
+        self.dispatch()
+
+    def dispatch(self) -> int:
+        """
+        Hand the jobs chosen by the round robin to Celery.
+        Returns:
+            Number of jobs enqueued
+        """
+        result, reclaimed = self._dispatch_script(
+            keys=[RING_KEY, IN_FLIGHT_KEY, ENTRY_TENANT_KEY, ENTRY_TRACE_KEY, TENANT_IN_FLIGHT_KEY,
+                  TENANT_WEIGHT_KEY, TENANT_CAP_KEY, CREDITS_KEY, PENDING_KEY],
+            args=[time.time(), self.max_dispatched,
+                  self.lease_seconds, TENANT_QUEUE_PREFIX]
+        )
+
+        sent = 0
+        for index in range(0, len(result), 3):
+            entry, tenant, traceparent = result[index:index + 3]
+            queue, job_id = entry.split("|", 1)
+            try:
+                # The job keeps the trace of the request that submitted it
+                headers = {"traceparent": traceparent} if traceparent else None
+                celery_app.send_task(QUEUE_TASKS[queue], args=[job_id], headers=headers)
+                sent += 1
+            except Exception as e:
+                print(f"Failed to dispatch {entry} for {tenant}, requeueing: {str(e)}")
+                self._complete_script(
+                    keys=[IN_FLIGHT_KEY, ENTRY_TENANT_KEY, TENANT_IN_FLIGHT_KEY],
+                    args=[entry])
+                self._push(queue, job_id, tenant, traceparent, front=True)
+
+        for entry in reclaimed:
+            queue, job_id = entry.split("|", 1)
+            try:
+                self._lease_expired(queue, job_id)
+            except Exception as e:
+                print(f"Error handling expired lease of {entry}: {str(e)}")
+        return sent
+
+    def _lease_expired(self, queue: str, job_id: str) -> None:
+        job = redis_job_manager.get_job(job_id)
+        if not job or job.get("status") in ("succeeded", "failed"):
+            return
+        print(f"Lease of {queue} job {job_id} expired, failing it")
+        redis_job_manager.fail_job(job_id, "Job was lost by its worker")
+        handler = self._expiry_handlers.get(queue)
+        if handler:
+            handler(job_id, job)
+
+    def pending(self, queue: str) -> int:
+        """Jobs of a queue still waiting in tenant sub-queues"""
+        return max(0, int(self.redis_client.hget(PENDING_KEY, queue) or 0))
+
+    def stats(self) -> Dict[str, Any]:
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.lrange(RING_KEY, 0, -1)
+            pipe.hgetall(PENDING_KEY)
+            pipe.zcard(IN_FLIGHT_KEY)
+            pipe.hgetall(TENANT_IN_FLIGHT_KEY)
+            ring, pending, in_flight, tenant_in_flight = pipe.execute()
+
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for tenant in ring:
+                pipe.llen(f"{TENANT_QUEUE_PREFIX}{tenant}")
+            waiting: List[int] = pipe.execute()
+
+        waiting_by_tenant = dict(zip(ring, waiting))
+        tenants = list(ring) + [
+            tenant for tenant in tenant_in_flight if tenant not in waiting_by_tenant]
+        return {
+            "enabled": settings.FAIR_QUEUE_ENABLED,
+            "max_dispatched": self.max_dispatched,
+            "in_flight": in_flight,
+            "pending_by_queue": {queue: int(count) for queue, count in pending.items()},
+            "tenants": [
+                {
+                    "tenant": tenant,
+                    "waiting": waiting_by_tenant.get(tenant, 0),
+                    "in_flight": int(tenant_in_flight.get(tenant, 0))
+                }
+                for tenant in tenants
+            ]
+        }
+
+
+def _tenant_classes() -> Dict[str, Dict[str, int]]:
+    classes = {name: dict(config) for name, config in settings.FAIR_QUEUE_CLASSES.items()}
+    # A batch's children are released IDEA_BATCH_MAX_IN_FLIGHT at a time;
+    # the same cap applies here unless configured otherwise
+    classes.setdefault("batch", {}).setdefault(
+        "max_in_flight", settings.IDEA_BATCH_MAX_IN_FLIGHT)
+    return classes
+
+
+fair_scheduler = FairScheduler(
+    redis_job_manager.redis_client,
+    max_dispatched=settings.WORKER_CONCURRENCY,
+    lease_seconds=settings.FAIR_QUEUE_LEASE_SECONDS,
+    classes=_tenant_classes()
+)
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
+from services.redis_jobs import create_redis_client, job_channel, redis_job_manager
+
+TERMINAL_STATUSES = {"succeeded", "failed"}
+
+
+class JobEventStream:
+    """
+    Streams job state changes published by RedisJobManager.update_job.
+
+    A single pub/sub connection watches any number of job IDs. The current
+    state of each job is emitted first, followed by every transition, until
+    all watched jobs have reached a terminal status or expired.
+    """
+
+    def __init__(self, heartbeat_interval: float = 15.0):
+        self.redis_client = create_redis_client(use_async=True)
+        self.heartbeat_interval = heartbeat_interval
+
+    async def watch(self, job_ids: List[str]) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield job events for the given job IDs.
+        Yields None as a heartbeat when nothing happened for heartbeat_interval.
+        Each heartbeat re-reads the watched jobs, so a job whose hash expired
+        (for example after its worker died) ends with an expired event.
+        """
+        channels = {job_channel(job_id): job_id for job_id in job_ids}
+        pending = set(job_ids)
+
+        pubsub = self.redis_client.pubsub()
+        # Subscribe before taking the snapshot so no transition is missed
+        await pubsub.subscribe(*channels.keys())
+
+        try:
+            for event in await self._snapshot(job_ids):
+                if event["status"] in TERMINAL_STATUSES or event["status"] == "expired":
+                    pending.discard(event["job_id"])
+                yield event
+
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + self.heartbeat_interval
+            while pending:
+                message = await pubsub.get_message(
+                    ignore_subscribe_messages=True,
+                    timeout=max(0.0, deadline - loop.time())
+                )
+                if message is None:
+                    # Subscribe confirmations also return None early
+                    if loop.time() < deadline:
+                        continue
+                    deadline = loop.time() + self.heartbeat_interval
+
+                    changed = False
+                    for event in await self._snapshot(sorted(pending)):
+                        if event["status"] in TERMINAL_STATUSES or event["status"] == "expired":
+                            pending.discard(event["job_id"])
+                            changed = True
+                            yield event
+                    if not changed:
+                        yield None
+                    continue
+
+                job_id = channels.get(message["channel"])
+                if job_id is None or job_id not in pending:
+                    continue
+
+                try:
+                    job_data = json.loads(message["data"])
+                except (ValueError, TypeError):
+                    continue
+
+                event = self._to_event(job_id, job_data)
+                if event["status"] in TERMINAL_STATUSES:
+                    pending.discard(job_id)
+                deadline = loop.time() + self.heartbeat_interval
+                yield event
+
+        finally:
+            await pubsub.unsubscribe()
+            await pubsub.aclose()
+
+    async def _snapshot(self, job_ids: List[str]) -> List[Dict[str, Any]]:
+        """Current state of each job as an event"""
+        snapshots = await asyncio.gather(
+            *(asyncio.to_thread(redis_job_manager.get_job, job_id)
+              for job_id in job_ids)
+        )
+        return [self._to_event(job_id, job_data)
+                for job_id, job_data in zip(job_ids, snapshots)]
+
+    @staticmethod
+    def _to_event(job_id: str, job_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not job_data:
+            return {"job_id": job_id, "status": "expired"}
+
+        try:
+            progress = float(job_data.get("progress", 0.0))
+        except (ValueError, TypeError):
+            progress = 0.0
+
+        event = {
+            "job_id": job_id,
+            "status": job_data.get("status"),
+            "progress": progress,
+            "error": job_data.get("error") or None,
+        }
+
+        if job_data.get("duplicate_of"):
+            event["duplicate_of"] = job_data["duplicate_of"]
+        if job_data.get("idea_result_id"):
+            event["idea_url"] = f"/ideas/{job_data['idea_result_id']}/summary"
+        if job_data.get("prompt_id"):
+            event["by_id_url"] = f"/prompts/{job_data['prompt_id']}"
+
+        return event
+
+    async def close(self) -> None:
+        await self.redis_client.aclose()
+
+
+job_event_stream = JobEventStream()
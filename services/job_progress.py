@@ -0,0 +1,302 @@
+import math
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set, Tuple
+
+import redis
+
+from config.settings import settings
+from services.redis_jobs import RedisJobManager, redis_job_manager
+
+# Each job type as a sequence of steps; the stages of one step run in
+# parallel and the next step starts once all of them finished
+PIPELINE_STEPS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "idea": (("queue",), ("idea",), ("icp", "reddit"), ("save",)),
+    "prompt": (("queue",), ("load",), ("script",), ("save",)),
+}
+
+# Typical stage durations used until a stage has enough history
+DEFAULT_STAGE_SECONDS: Dict[str, Dict[str, float]] = {
+    "idea": {"queue": 2.0, "idea": 15.0, "icp": 20.0, "reddit": 60.0, "save": 1.0},
+    "prompt": {"queue": 2.0, "load": 0.5, "script": 40.0, "save": 1.0},
+}
+
+# Upper bounds of the histogram buckets, in seconds
+HISTOGRAM_BUCKETS = (
+    0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 20.0, 30.0,
+    45.0, 60.0, 90.0, 120.0, 180.0, 240.0, 360.0
+)
+
+
+def _created_timestamp(job: dict) -> float:
+    try:
+        return datetime.fromisoformat(job["created_at"]).replace(tzinfo=timezone.utc).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return time.time()
+
+
+@dataclass(frozen=True)
+class StageStats:
+    count: int
+    mean: float
+    p50: float
+    p90: float
+
+
+@dataclass(frozen=True)
+class JobEstimate:
+    eta_seconds: Optional[float]
+    retry_after: Optional[int]
+
+
+class StageHistogram:
+    """
+    Rolling histogram of stage durations shared by all processes. Samples are
+    counted into fixed buckets in one Redis hash per time window; reads merge
+    the most recent windows, so the estimate follows current provider
+    latency and old history ages out.
+    Args:
+        redis_client: Sync Redis client
+        window_seconds: Length of one window
+        windows: Windows merged on read
+        cache_seconds: How long merged stats are reused in this process
+    """
+
+    def __init__(self, redis_client, window_seconds: int = 3600, windows: int = 24, cache_seconds: float = 10.0):
+        self.redis_client = redis_client
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.cache_seconds = cache_seconds
+        self._cache: Dict[str, Tuple[float, Dict[str, StageStats]]] = {}
+
+    def _key(self, pipeline: str, stage: str, window: int) -> str:
+        return f"stage_hist:{pipeline}:{stage}:{window}"
+
+    def record(self, pipeline: str, stage: str, seconds: float) -> None:
+        window = int(time.time() // self.window_seconds)
+        key = self._key(pipeline, stage, window)
+        bucket = next((str(bound) for bound in HISTOGRAM_BUCKETS if seconds <= bound), "inf")
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(key, bucket, 1)
+            pipe.hincrby(key, "count", 1)
+            pipe.hincrbyfloat(key, "sum", seconds)
+            pipe.expire(key, self.window_seconds * (self.windows + 1))
+            pipe.execute()
+
+    def stats(self, pipeline: str) -> Dict[str, StageStats]:
+        """Merged duration stats of every stage of a pipeline that has samples"""
+        cached = self._cache.get(pipeline)
+        if cached and time.monotonic() - cached[0] < self.cache_seconds:
+            return cached[1]
+
+        stages = [stage for step in PIPELINE_STEPS[pipeline] for stage in step]
+        current = int(time.time() // self.window_seconds)
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for stage in stages:
+                for window in range(current - self.windows + 1, current + 1):
+                    pipe.hgetall(self._key(pipeline, stage, window))
+            rows = pipe.execute()
+
+        result = {}
+        for index, stage in enumerate(stages):
+            merged: Dict[str, float] = {}
+            for row in rows[index * self.windows:(index + 1) * self.windows]:
+                for field, value in row.items():
+                    merged[field] = merged.get(field, 0) + float(value)
+            count = int(merged.get("count", 0))
+            if count:
+                result[stage] = StageStats(
+                    count=count,
+                    mean=merged.get("sum", 0.0) / count,
+                    p50=self._quantile(merged, count, 0.5),
+                    p90=self._quantile(merged, count, 0.9)
+                )
+
+        self._cache[pipeline] = (time.monotonic(), result)
+        return result
+
+    @staticmethod
+    def _quantile(buckets: Dict[str, float], count: int, quantile: float) -> float:
+        """Quantile interpolated linearly within the bucket that contains it"""
+        target = quantile * count
+        cumulative = 0.0
+        lower = 0.0
+        for bound in HISTOGRAM_BUCKETS:
+            in_bucket = buckets.get(str(bound), 0)
+            if in_bucket and cumulative + in_bucket >= target:
+                return lower + (bound - lower) * (target - cumulative) / in_bucket
+            cumulative += in_bucket
+            lower = bound
+        return lower
+
+
+class JobProgress:
+    """
+    Progress of one running job. Each completed stage is timed from the start
+    of its step, recorded in the histogram and written to the job as the share
+    of expected work done.
+    """
+
+    def __init__(self, tracker: "JobProgressTracker", job_id: str, pipeline: str, step_started_at: float):
+        self.tracker = tracker
+        self.job_id = job_id
+        self.pipeline = pipeline
+        self.step_started_at = step_started_at
+        self.completed: Set[str] = set()
+        self.progress = 0.0
+        self._lock = threading.Lock()
+
+    def complete(self, stage: str, record: bool = True) -> None:
+        """
+        Mark a stage finished.
+        Args:
+            stage: Stage name; stages not in the pipeline are ignored
+            record: Add the stage's duration to the histogram
+        """
+        steps = PIPELINE_STEPS[self.pipeline]
+        with self._lock:
+            if stage in self.completed or not any(stage in step for step in steps):
+                return
+            now = time.time()
+            if record:
+                self.tracker.record(self.pipeline, stage, now - self.step_started_at)
+            self.completed.add(stage)
+
+            current = next((step for step in steps if not set(step) <= self.completed), None)
+            if current is None or stage not in current:
+                self.step_started_at = now
+            self.progress = max(self.progress, self.tracker.progress(self.pipeline, self.completed))
+
+            self.tracker.job_manager.update_job(
+                self.job_id,
+                progress=round(self.progress, 4),
+                completed_stages=",".join(sorted(self.completed)),
+                step_started_at=self.step_started_at
+            )
+
+
+class JobProgressTracker:
+    """
+    Stage-driven job progress and completion estimates. Workers report stages
+    as they really finish; status endpoints turn the job's completed stages
+    and the historical stage durations into an ETA and a polling interval
+    that points at the next likely change.
+    """
+
+    def __init__(self, job_manager: RedisJobManager, histogram: StageHistogram):
+        self.job_manager = job_manager
+        self.histogram = histogram
+
+    def record(self, pipeline: str, stage: str, seconds: float) -> None:
+        try:
+            self.histogram.record(pipeline, stage, seconds)
+        except redis.RedisError as e:
+            print(f"Failed to record {pipeline}.{stage} duration: {str(e)}")
+
+    def _stats(self, pipeline: str) -> Dict[str, StageStats]:
+        try:
+            return self.histogram.stats(pipeline)
+        except redis.RedisError as e:
+            print(f"Failed to read stage durations: {str(e)}")
+            return {}
+
+    def _expected(self, pipeline: str, stats: Dict[str, StageStats], stage: str) -> Tuple[float, float]:
+        """Median and 90th percentile duration of a stage, or the prior"""
+        entry = stats.get(stage)
+        if entry is None or entry.count < settings.JOB_ETA_MIN_SAMPLES:
+            prior = DEFAULT_STAGE_SECONDS[pipeline][stage]
+            return prior, prior * 2
+        return entry.p50, max(entry.p90, entry.p50)
+
+    def start(self, job_id: str, job: dict, pipeline: str, record_queue_wait: bool = True) -> JobProgress:
+        """
+        Mark a job running and finish its queue stage.
+        Args:
+            job_id: Job to start
+            job: The job's current data
+            pipeline: Key of PIPELINE_STEPS
+            record_queue_wait: Add the time since creation to the queue
+                histogram; off for jobs that waited for another reason, such
+                as batch children waiting to be dispatched
+        Returns:
+            The job's progress reporter
+        """
+        self.job_manager.update_job(job_id, status="running")
+        progress = JobProgress(self, job_id, pipeline, _created_timestamp(job))
+        progress.complete("queue", record=record_queue_wait)
+        return progress
+
+    def progress(self, pipeline: str, completed: Set[str]) -> float:
+        """Share of the expected pipeline duration covered by completed stages"""
+        stats = self._stats(pipeline)
+        total = remaining = 0.0
+        for step in PIPELINE_STEPS[pipeline]:
+            expected = [self._expected(pipeline, stats, stage)[0] for stage in step]
+            total += max(expected)
+            pending = [value for stage, value in zip(step, expected) if stage not in completed]
+            remaining += max(pending, default=0.0)
+        if total <= 0:
+            return 0.0
+        # 1.0 is only reported once the job succeeded
+        return min(0.99, 1 - remaining / total)
+
+    def service_time(self, pipeline: str) -> float:
+        """Expected seconds a worker spends on one job, excluding queue wait"""
+        stats = self._stats(pipeline)
+        return sum(
+            max(self._expected(pipeline, stats, stage)[0] for stage in step)
+            for step in PIPELINE_STEPS[pipeline] if step != ("queue",))
+
+    def estimate(self, job: dict, pipeline: str) -> JobEstimate:
+        """
+        Expected seconds until the job finishes and until its next stage
+        completes (the suggested poll interval) for a queued or running job.
+        """
+        if job.get("status") not in ("queued", "running"):
+            return JobEstimate(eta_seconds=None, retry_after=None)
+
+        stats = self._stats(pipeline)
+        completed = set(filter(None, (job.get("completed_stages") or "").split(",")))
+        try:
+            step_started_at = float(job["step_started_at"])
+        except (KeyError, TypeError, ValueError):
+            step_started_at = _created_timestamp(job)
+        elapsed = max(0.0, time.time() - step_started_at)
+
+        remaining_steps = [step for step in PIPELINE_STEPS[pipeline]
+                           if not set(step) <= completed]
+        if not remaining_steps:
+            return JobEstimate(eta_seconds=0.0, retry_after=settings.JOB_POLL_MIN_SECONDS)
+
+        # Stages of the current step have all been running for `elapsed`;
+        # one that is past its median is expected by its 90th percentile
+        stage_remaining = []
+        for stage in remaining_steps[0]:
+            if stage in completed:
+                continue
+            median, p90 = self._expected(pipeline, stats, stage)
+            left = median - elapsed
+            if left <= 0:
+                left = max(0.0, p90 - elapsed)
+            stage_remaining.append(left)
+
+        eta = max(stage_remaining) + sum(
+            max(self._expected(pipeline, stats, stage)[0] for stage in step)
+            for step in remaining_steps[1:])
+        next_change = min(stage_remaining)
+
+        retry_after = min(settings.JOB_POLL_MAX_SECONDS,
+                          max(settings.JOB_POLL_MIN_SECONDS, math.ceil(next_change)))
+        return JobEstimate(eta_seconds=round(eta, 1), retry_after=retry_after)
+
+
+job_progress = JobProgressTracker(
+    redis_job_manager,
+    StageHistogram(
+        redis_job_manager.redis_client,
+        window_seconds=settings.JOB_ETA_WINDOW_SECONDS,
+        windows=settings.JOB_ETA_WINDOWS
+    )
+)
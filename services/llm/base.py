@@ -24,3 +24,7 @@ class LLM(ABC):
         web_search: bool = False
     ) -> str:
         raise NotImplementedError("generate_parse method must be implemented")
+
+    async def aclose(self) -> None:
+        """Release pooled connections"""
+        return None
@@ -0,0 +1,166 @@
+import hashlib
+import json
+import re
+import time
+import unicodedata
+from typing import Any, Dict, Optional
+
+import redis
+
+from services.redis_jobs import create_redis_client
+from .base import LLM
+
+CACHE_PREFIX = "llm_cache:"
+INDEX_KEY = "llm_cache_index"
+STATS_KEY = "llm_cache_stats"
+
+# Store the entry, record it in the recency index and evict the least
+# recently used entries beyond the size bound
+SET_SCRIPT = """
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('ZADD', KEYS[2], ARGV[3], KEYS[1])
+local excess = redis.call('ZCARD', KEYS[2]) - tonumber(ARGV[4])
+if excess > 0 then
+    local evicted = redis.call('ZPOPMIN', KEYS[2], excess)
+    for i = 1, #evicted, 2 do
+        redis.call('DEL', evicted[i])
+    end
+end
+return 1
+"""
+
+# Read the entry, refresh its recency and count the hit or miss
+GET_SCRIPT = """
+local value = redis.call('GET', KEYS[1])
+if value then
+    redis.call('ZADD', KEYS[2], ARGV[1], KEYS[1])
+    redis.call('HINCRBY', KEYS[3], 'hits', 1)
+else
+    redis.call('ZREM', KEYS[2], KEYS[1])
+    redis.call('HINCRBY', KEYS[3], 'misses', 1)
+end
+return value
+"""
+
+
+def normalize_input(text: str) -> str:
+    """Normalize user input so trivial variations map to the same entry"""
+    text = unicodedata.normalize("NFKC", text)
+    return re.sub(r"\s+", " ", text).strip().casefold()
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CachedLLM(LLM):
+    """
+    Opt-in cache for structured LLM responses, keyed on the normalized input,
+    the system prompt hash, the model and the output schema. Entries live in
+    Redis with a TTL and the total number of entries is bounded with LRU
+    eviction. Hits return the parsed pydantic object without calling the LLM.
+    """
+
+    def __init__(self, llm: LLM, ttl: int = 86400, max_entries: int = 10000):
+        self.llm = llm
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.redis_client = create_redis_client(use_async=True)
+        self._get_script = self.redis_client.register_script(GET_SCRIPT)
+        self._set_script = self.redis_client.register_script(SET_SCRIPT)
+        self._schema_hashes: Dict[Any, str] = {}
+
+    def cache_key(
+        self,
+        user_input: str,
+        system: Optional[str],
+        options: Optional[dict],
+        schema: Any,
+        web_search: bool
+    ) -> str:
+        schema_hash = self._schema_hashes.get(schema)
+        if schema_hash is None:
+            schema_json = json.dumps(
+                schema.model_json_schema(), sort_keys=True) if hasattr(schema, "model_json_schema") else str(schema)
+            schema_hash = _sha256(schema_json)
+            self._schema_hashes[schema] = schema_hash
+
+        options = options or {}
+        material = json.dumps({
+            "input": _sha256(normalize_input(user_input)),
+            "system": _sha256(system or ""),
+            "model": options.get("model"),
+            "max_tokens": options.get("max_tokens"),
+            "schema": schema_hash,
+            "web_search": web_search,
+        }, sort_keys=True)
+        return CACHE_PREFIX + _sha256(material)
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+    ) -> str:
+        return await self.llm.generate(prompt, system=system, options=options)
+
+    async def generate_parse(
+        self,
+        user_input: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+        schema: Any = None,
+        web_search: bool = False
+    ) -> Any:
+        if schema is None or not hasattr(schema, "model_validate_json"):
+            return await self.llm.generate_parse(
+                user_input, system=system, options=options, schema=schema, web_search=web_search)
+
+        key = self.cache_key(user_input, system, options, schema, web_search)
+
+        try:
+            cached = await self._get_script(
+                keys=[key, INDEX_KEY, STATS_KEY], args=[time.time()])
+            if cached is not None:
+                return schema.model_validate_json(cached)
+        except (redis.RedisError, ValueError) as e:
+            print(f"LLM cache read failed: {str(e)}")
+
+        parsed = await self.llm.generate_parse(
+            user_input, system=system, options=options, schema=schema, web_search=web_search)
+        # Refusals and empty parses are passed on, never cached
+        if parsed is None:
+            return None
+
+        try:
+            await self._set_script(
+                keys=[key, INDEX_KEY],
+                args=[parsed.model_dump_json(), self.ttl, time.time(), self.max_entries])
+        except redis.RedisError as e:
+            print(f"LLM cache write failed: {str(e)}")
+
+        return parsed
+
+    async def stats(self) -> Dict[str, Any]:
+        """Cluster-wide hit/miss counts and current number of entries"""
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.hgetall(STATS_KEY)
+            pipe.zcard(INDEX_KEY)
+            counters, entries = await pipe.execute()
+
+        hits = int(counters.get("hits", 0))
+        misses = int(counters.get("misses", 0))
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+        }
+
+    async def aclose(self) -> None:
+        await self.redis_client.aclose()
+        await self.llm.aclose()
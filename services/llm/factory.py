@@ -0,0 +1,79 @@
+import os
+from config.settings import settings
+from services.simulation import LatencyModel
+from .base import LLM
+from .cached_llm import CachedLLM
+from .openai_llm import OpenAILLM
+from .replay_llm import RecordingLLM, ReplayLLM
+from .resilience import CircuitBreaker, ResilientCaller
+from .resilient_llm import ResilientLLM
+from .synthetic_llm import SyntheticLLM
+from .usage import UsageRecorder
+
+
+def create_llm() -> LLM:
+    """Build the LLM backend selected by settings.LLM_BACKEND with deadlines,
+    retries and a circuit breaker, wrapped in the response cache when
+    settings.LLM_CACHE_ENABLED is set"""
+    llm = ResilientLLM(
+        _create_backend(),
+        caller=ResilientCaller(
+            max_attempts=settings.LLM_MAX_ATTEMPTS,
+            base_delay=settings.LLM_RETRY_BASE_DELAY,
+            max_delay=settings.LLM_RETRY_MAX_DELAY,
+            hedge=settings.LLM_HEDGE_ENABLED,
+            hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+                reset_timeout=settings.LLM_CIRCUIT_RESET_SECONDS
+            )
+        ),
+        stage_deadlines=settings.LLM_STAGE_DEADLINES,
+        default_deadline=settings.LLM_DEFAULT_DEADLINE
+    )
+    if settings.LLM_CACHE_ENABLED:
+        return CachedLLM(
+            llm,
+            ttl=settings.LLM_CACHE_TTL_SECONDS,
+            max_entries=settings.LLM_CACHE_MAX_ENTRIES
+        )
+    return llm
+
+
+def _create_backend() -> LLM:
+    backend = settings.LLM_BACKEND.lower()
+    recordings_dir = os.path.join(settings.RECORDINGS_DIR, "llm")
+
+    if backend == "openai":
+        return _create_openai()
+    if backend == "record":
+        return RecordingLLM(_create_openai(), recordings_dir)
+    if backend == "replay":
+        return ReplayLLM(recordings_dir, replay_latency=settings.REPLAY_LATENCY)
+    if backend == "synthetic":
+        return SyntheticLLM(
+            latency=LatencyModel(
+                median_ms=settings.SYNTHETIC_LATENCY_MS,
+                sigma=settings.SYNTHETIC_LATENCY_SIGMA,
+                error_rate=settings.SYNTHETIC_ERROR_RATE,
+                seed=settings.SYNTHETIC_SEED
+            ),
+            web_search_latency=LatencyModel(
+                median_ms=settings.SYNTHETIC_WEB_SEARCH_LATENCY_MS,
+                sigma=settings.SYNTHETIC_LATENCY_SIGMA,
+                error_rate=settings.SYNTHETIC_ERROR_RATE,
+                seed=settings.SYNTHETIC_SEED
+            )
+        )
+
+    raise ValueError(f"Unknown LLM backend '{settings.LLM_BACKEND}'")
+
+
+def _create_openai() -> OpenAILLM:
+    # Retries happen in ResilientLLM; each request only gets its own timeout
+    return OpenAILLM(
+        api_key=settings.OPENAI_API_KEY,
+        timeout=settings.LLM_REQUEST_TIMEOUT,
+        max_retries=0,
+        usage_recorder=UsageRecorder() if settings.LLM_USAGE_TRACKING_ENABLED else None
+    )
@@ -2,15 +2,37 @@ from typing import Any, Optional
 
 from openai import AsyncOpenAI
 from .base import LLM
+from .usage import UsageRecorder
 
 
 class OpenAILLM(LLM):
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: str,
+        timeout: float = 360,
+        max_retries: int = 2,
+        usage_recorder: Optional[UsageRecorder] = None
+    ):
 
         if not api_key:
             raise ValueError("OpenAI API key not provided")
 
-        self.client = AsyncOpenAI(api_key=api_key, timeout=360)
+        self.client = AsyncOpenAI(
+            api_key=api_key, timeout=timeout, max_retries=max_retries)
+        self.usage_recorder = usage_recorder
+
+    @staticmethod
+    def _cache_params(options: dict[str, Any]) -> dict[str, Any]:
+        # Requests sharing a system prompt prefix are routed to the same
+        # prompt cache
+        if options.get("prompt_cache_key"):
+            return {"prompt_cache_key": options["prompt_cache_key"]}
+        return {}
+
+    async def _record_usage(self, options: dict[str, Any], response: Any) -> None:
+        if self.usage_recorder is not None:
+            await self.usage_recorder.record(
+                options.get("prompt_version"), getattr(response, "usage", None))
 
     async def generate(
         self,
@@ -34,9 +56,11 @@ class OpenAILLM(LLM):
             model=options["model"],
             input=messages,
             max_output_tokens=options["max_tokens"],
+            **self._cache_params(options)
         )
+        await self._record_usage(options, response)
 
-        return response.choices[0].message.content or ""
+        return response.output_text or ""
 
     async def generate_parse(
         self,
@@ -62,11 +86,18 @@ class OpenAILLM(LLM):
             "max_output_tokens": options["max_tokens"],
             "input": messages,
             "text_format": schema,
+            **self._cache_params(options)
         }
 
         if web_search:
             request_params["tools"] = [{"type": "web_search"}]
 
         response = await self.client.responses.parse(**request_params)
+        await self._record_usage(options, response)
 
         return response.output_parsed
+
+    async def aclose(self) -> None:
+        await self.client.close()
+        if self.usage_recorder is not None:
+            await self.usage_recorder.aclose()
@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Any, Optional
+
+from .base import LLM
+
+
+def exchange_key(method: str, **request: Any) -> str:
+    """Stable key for an LLM exchange, independent of argument order"""
+    payload = json.dumps(request, sort_keys=True, default=str)
+    return hashlib.sha256(f"{method}:{payload}".encode("utf-8")).hexdigest()
+
+
+def _request(user_input: str, system: Optional[str], options: Optional[dict], schema: Any = None, web_search: bool = False) -> dict:
+    return {
+        "user_input": user_input,
+        "system": system,
+        "model": (options or {}).get("model"),
+        "schema": getattr(schema, "__name__", None),
+        "web_search": web_search,
+    }
+
+
+class RecordingLLM(LLM):
+    """
+    Wraps a real LLM and writes every exchange to a directory of JSON files
+    so it can be replayed offline with ReplayLLM.
+    """
+
+    def __init__(self, llm: LLM, directory: str):
+        self.llm = llm
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+    ) -> str:
+        started = time.perf_counter()
+        text = await self.llm.generate(prompt, system=system, options=options)
+        request = _request(prompt, system, options)
+        self._write(exchange_key("generate", **request), {
+            "method": "generate",
+            "request": request,
+            "response": text,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+        })
+        return text
+
+    async def generate_parse(
+        self,
+        user_input: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+        schema: Any = None,
+        web_search: bool = False
+    ) -> Any:
+        started = time.perf_counter()
+        parsed = await self.llm.generate_parse(
+            user_input,
+            system=system,
+            options=options,
+            schema=schema,
+            web_search=web_search
+        )
+        request = _request(user_input, system, options, schema, web_search)
+        self._write(exchange_key("generate_parse", **request), {
+            "method": "generate_parse",
+            "request": request,
+            "response": parsed.model_dump(mode="json") if hasattr(parsed, "model_dump") else parsed,
+            "latency_ms": (time.perf_counter() - started) * 1000,
+        })
+        return parsed
+
+    async def aclose(self) -> None:
+        await self.llm.aclose()
+
+    def _write(self, key: str, record: dict) -> None:
+        path = os.path.join(self.directory, f"{key}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+class ReplayLLM(LLM):
+    """
+    Serves exchanges recorded by RecordingLLM without network access.
+    Args:
+        directory: Directory containing the recordings
+        replay_latency: Sleep for the recorded latency before returning
+    """
+
+    def __init__(self, directory: str, replay_latency: bool = False):
+        self.directory = directory
+        self.replay_latency = replay_latency
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+    ) -> str:
+        record = await self._read(
+            exchange_key("generate", **_request(prompt, system, options)))
+        return record["response"]
+
+    async def generate_parse(
+        self,
+        user_input: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+        schema: Any = None,
+        web_search: bool = False
+    ) -> Any:
+        request = _request(user_input, system, options, schema, web_search)
+        record = await self._read(exchange_key("generate_parse", **request))
+        if schema is not None and hasattr(schema, "model_validate"):
+            return schema.model_validate(record["response"])
+        return record["response"]
+
+    async def _read(self, key: str) -> dict:
+        path = os.path.join(self.directory, f"{key}.json")
+        if not os.path.exists(path):
+            raise LookupError(f"No recorded LLM exchange for key {key}")
+
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+
+        if self.replay_latency:
+            await asyncio.sleep(record.get("latency_ms", 0) / 1000)
+        return record
@@ -0,0 +1,233 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+
+import httpx
+import openai
+
+from services.observability.metrics import LLM_RETRIES
+from services.simulation import SyntheticError
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider while the circuit breaker is open"""
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Transient provider errors worth another attempt"""
+    return isinstance(error, (
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.RateLimitError,
+        openai.InternalServerError,
+        httpx.TimeoutException,
+        asyncio.TimeoutError,
+        SyntheticError,
+    ))
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures and fails
+    calls fast for `reset_timeout` seconds. After that a single trial call is
+    let through (half-open): success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "open":
+            raise CircuitOpenError(
+                "LLM provider circuit is open after repeated failures")
+        if state == "half_open":
+            if self._trial_in_flight:
+                raise CircuitOpenError(
+                    "LLM provider circuit is half-open; trial call in flight")
+            self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def abandon(self) -> None:
+        """Forget a trial call that was cancelled before it finished"""
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None or self._trial_in_flight:
+                print(
+                    f"LLM circuit opened after {self.failures} consecutive failures")
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+
+class LatencyTracker:
+    """Recent successful call latencies per key, for hedging thresholds"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        self._samples.setdefault(key, deque(maxlen=self.window)).append(seconds)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        """Latency at the given percentile, or None until enough samples exist"""
+        samples = self._samples.get(key)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+
+class ResilientCaller:
+    """
+    Runs provider calls under a deadline with jittered retries, optional
+    hedging and a shared circuit breaker.
+    Args:
+        max_attempts: Attempts per call, including the first
+        base_delay: Base of the exponential backoff, in seconds
+        max_delay: Cap on a single backoff sleep
+        hedge: Start a second identical request once the first has run
+            longer than the tracked latency percentile, and use whichever
+            finishes first
+        hedge_percentile: Percentile of recent latencies that triggers a hedge
+        breaker: Circuit breaker shared by all calls
+        tracker: Latency history used for hedging
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        hedge: bool = False,
+        hedge_percentile: float = 95.0,
+        breaker: Optional[CircuitBreaker] = None,
+        tracker: Optional[LatencyTracker] = None
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker or CircuitBreaker()
+        self.tracker = tracker or LatencyTracker()
+        self.hedges_started = 0
+        self.hedges_won = 0
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt`"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    async def call(self, key: str, request: Callable[[], Awaitable[Any]], deadline: Optional[float] = None) -> Any:
+        """
+        Run `request` until it succeeds, fails permanently or the deadline passes.
+        Args:
+            key: Latency bucket, e.g. the pipeline stage
+            request: Zero-argument coroutine factory making one provider call
+            deadline: Seconds for the whole call, including retries
+        Returns:
+            The request's result
+        """
+        scope = asyncio.timeout(deadline)
+        try:
+            async with scope:
+                return await self._call(key, request)
+        except TimeoutError:
+            # Running out the deadline counts against the provider; a
+            # per-attempt timeout was already recorded by _call
+            if scope.expired():
+                self.breaker.record_failure()
+            raise
+
+    async def _call(self, key: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.max_attempts):
+            self.breaker.before_call()
+            try:
+                result = await self._attempt(key, request)
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered; the request itself was bad
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt == self.max_attempts - 1:
+                    raise
+                delay = self.backoff(attempt)
+                LLM_RETRIES.labels(stage=key, error=type(e).__name__).inc()
+                print(
+                    f"LLM call '{key}' failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+            else:
+                self.breaker.record_success()
+                return result
+
+    async def _attempt(self, key: str, request: Callable[[], Awaitable[Any]]) -> Any:
+        started = time.monotonic()
+        hedge_after = self.tracker.percentile(
+            key, self.hedge_percentile) if self.hedge else None
+
+        if hedge_after is None:
+            result = await request()
+            self.tracker.record(key, time.monotonic() - started)
+            return result
+
+        primary = asyncio.ensure_future(request())
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=hedge_after)
+            if not done:
+                self.hedges_started += 1
+                hedge = asyncio.ensure_future(request())
+                pending.add(hedge)
+
+            error: Optional[BaseException] = None
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                        self.tracker.record(key, time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "hedges_started": self.hedges_started,
+            "hedges_won": self.hedges_won,
+        }
@@ -0,0 +1,75 @@
+from typing import Any, Dict, Optional
+
+from services.observability.tracing import span
+from .base import LLM
+from .resilience import ResilientCaller
+
+
+class ResilientLLM(LLM):
+    """
+    Bounds the latency of every LLM call: each call gets a deadline chosen by
+    its pipeline stage (options["stage"]), transient errors are retried with
+    jittered backoff, slow calls can be hedged, and a circuit breaker fails
+    calls fast while the provider is degraded.
+    Args:
+        llm: The backend to call
+        caller: Retry, hedging and circuit breaker policy
+        stage_deadlines: Seconds allowed per stage, including retries
+        default_deadline: Seconds allowed for calls without a known stage
+    """
+
+    def __init__(
+        self,
+        llm: LLM,
+        caller: ResilientCaller,
+        stage_deadlines: Optional[Dict[str, float]] = None,
+        default_deadline: Optional[float] = None
+    ):
+        self.llm = llm
+        self.caller = caller
+        self.stage_deadlines = stage_deadlines or {}
+        self.default_deadline = default_deadline
+
+    def _stage(self, options: Optional[dict], default: str) -> str:
+        return (options or {}).get("stage") or default
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+    ) -> str:
+        stage = self._stage(options, "generate")
+        with span(f"llm.{stage}", "llm"):
+            return await self.caller.call(
+                stage,
+                lambda: self.llm.generate(
+                    prompt, system=system, options=options),
+                deadline=self.stage_deadlines.get(stage, self.default_deadline)
+            )
+
+    async def generate_parse(
+        self,
+        user_input: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+        schema: Any = None,
+        web_search: bool = False
+    ) -> Any:
+        stage = self._stage(
+            options, "web_search" if web_search else "generate_parse")
+        with span(f"llm.{stage}", "llm", web_search=web_search):
+            return await self.caller.call(
+                stage,
+                lambda: self.llm.generate_parse(
+                    user_input, system=system, options=options, schema=schema, web_search=web_search),
+                deadline=self.stage_deadlines.get(stage, self.default_deadline)
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        return self.caller.stats()
+
+    async def aclose(self) -> None:
+        await self.llm.aclose()
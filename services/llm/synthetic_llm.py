@@ -0,0 +1,129 @@
+from typing import Any, Optional
+
+from schemas.idea import IdeaSchema, IcpSchema, RedditSchema, RedditFeedback
+from services.simulation import LatencyModel
+from .base import LLM
+
+
+class SyntheticLLM(LLM):
+    """
+    Offline LLM that synthesizes schema-valid responses after a modelled
+    latency. Used for load and performance testing without network access.
+    """
+
+    def __init__(self, latency: LatencyModel, web_search_latency: Optional[LatencyModel] = None):
+        self.latency = latency
+        self.web_search_latency = web_search_latency or latency
+        self.rng = latency.rng
+
+    async def generate(
+        self,
+        prompt: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+    ) -> str:
+        await self.latency.wait("generate")
+        first_line = prompt.strip().splitlines()[0] if prompt.strip() else ""
+        topic = self._topic(first_line.split(":", 1)[-1])
+        return (
+            f"# Website Development Prompt\n\n"
+            f"## Project Overview\n"
+            f"Build a web application for: {topic}.\n\n"
+            f"## Key Features\n"
+            f"- User registration and authentication\n"
+            f"- Dashboard for managing {topic.lower()}\n"
+            f"- Responsive, accessible design\n"
+        )
+
+    async def generate_parse(
+        self,
+        user_input: str,
+        *,
+        system: Optional[str] = None,
+        options: Optional[dict[str, Any]] = None,
+        schema: Any = None,
+        web_search: bool = False
+    ) -> Any:
+        latency = self.web_search_latency if web_search else self.latency
+        await latency.wait(f"generate_parse({getattr(schema, '__name__', schema)})")
+
+        if schema is IdeaSchema:
+            return self._idea(user_input)
+        if schema is IcpSchema:
+            return self._icp()
+        if schema is RedditSchema:
+            return self._reddit()
+
+        raise ValueError(f"SyntheticLLM cannot synthesize schema {schema!r}")
+
+    @staticmethod
+    def _topic(text: str) -> str:
+        words = text.replace("\n", " ").split()
+        return " ".join(words[:8]).strip(" .,:;") or "an everyday problem"
+
+    def _confidence(self) -> float:
+        return round(self.rng.uniform(0.6, 0.95), 2)
+
+    def _idea(self, user_input: str) -> IdeaSchema:
+        topic = self._topic(user_input)
+        return IdeaSchema(
+            title=f"Smart assistant for {topic}"[:100],
+            description=f"A service that removes the busywork around {topic}."[:500],
+            problem_statement=f"People waste time and money dealing with {topic} manually."[:300],
+            key_features=[
+                "Guided onboarding that captures user goals",
+                "Automated recommendations based on usage patterns",
+                "Progress tracking and weekly insights",
+                "Integrations with popular calendar and messaging tools",
+            ][:self.rng.randint(3, 4)],
+            confidence=self._confidence()
+        )
+
+    def _icp(self) -> IcpSchema:
+        return IcpSchema(
+            target_demographics=[
+                "Busy professionals aged 25-45",
+                "Remote workers",
+                "Small business owners",
+            ],
+            ideal_customer_profile="Mid-career professionals earning $50k-$150k in urban areas who value saving time and will pay for tools that reduce stress.",
+            pain_points=[
+                "Constant context switching",
+                "Hard to prioritize competing tasks",
+                "Forgetting important deadlines",
+            ],
+            user_motivations=[
+                "Better work-life balance",
+                "More time for meaningful work",
+                "Feeling in control",
+            ],
+            confidence=self._confidence()
+        )
+
+    def _reddit(self) -> RedditSchema:
+        return RedditSchema(
+            supportive_feedback=[
+                RedditFeedback(
+                    comment="I've been looking for something like this for years.",
+                    username="u/synthetic_supporter",
+                    subreddit="r/productivity",
+                    link="https://www.reddit.com/r/productivity/comments/synthetic1"
+                )
+            ],
+            challenging_feedback=[
+                RedditFeedback(
+                    comment="There are already dozens of these apps. What makes this different?",
+                    username="u/synthetic_skeptic",
+                    subreddit="r/startups",
+                    link="https://www.reddit.com/r/startups/comments/synthetic2"
+                )
+            ],
+            relevant_subreddits=[
+                "r/productivity",
+                "r/startups",
+                "r/entrepreneur",
+                "r/smallbusiness",
+            ],
+            confidence=self._confidence()
+        )
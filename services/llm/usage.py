@@ -0,0 +1,57 @@
+from typing import Any, Dict, Optional
+
+import redis
+
+from services.redis_jobs import create_redis_client
+
+USAGE_PREFIX = "llm_usage:"
+USAGE_INDEX_KEY = "llm_usage_index"
+
+
+class UsageRecorder:
+    """
+    Cluster-wide token counters per system prompt version, used to measure
+    how much of each prompt is served from the provider's prompt cache.
+    """
+
+    def __init__(self):
+        self.redis_client = create_redis_client(use_async=True)
+
+    async def record(self, prompt_version: Optional[str], usage: Any) -> None:
+        """
+        Add one response's token usage to the counters.
+        Args:
+            prompt_version: Prompt name and version, e.g. idea@3f2a9c1b04de
+            usage: The `usage` object of a Responses API response
+        """
+        if usage is None:
+            return
+        details = getattr(usage, "input_tokens_details", None)
+        key = f"{USAGE_PREFIX}{prompt_version or 'unversioned'}"
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.sadd(USAGE_INDEX_KEY, key)
+                pipe.hincrby(key, "calls", 1)
+                pipe.hincrby(key, "input_tokens", usage.input_tokens or 0)
+                pipe.hincrby(key, "cached_tokens",
+                             getattr(details, "cached_tokens", 0) or 0)
+                pipe.hincrby(key, "output_tokens", usage.output_tokens or 0)
+                await pipe.execute()
+        except redis.RedisError as e:
+            print(f"LLM usage recording failed: {str(e)}")
+
+    async def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Counters and prompt cache hit ratio for every prompt version"""
+        keys = sorted(await self.redis_client.smembers(USAGE_INDEX_KEY))
+        result = {}
+        for key in keys:
+            counters = {name: int(value) for name, value in (
+                await self.redis_client.hgetall(key)).items()}
+            input_tokens = counters.get("input_tokens", 0)
+            counters["cached_ratio"] = round(
+                counters.get("cached_tokens", 0) / input_tokens, 4) if input_tokens else 0.0
+            result[key[len(USAGE_PREFIX):]] = counters
+        return result
+
+    async def aclose(self) -> None:
+        await self.redis_client.aclose()
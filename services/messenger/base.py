@@ -1,16 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, BinaryIO, Optional
 
 
 class Messenger(ABC):
     @abstractmethod
-    def send_message(self, chat_id: str, text: str, reply_markup: Any = None) -> None:
+    def send_message(self, chat_id: str, text: str, reply_markup: Any = None, plain_text: bool = False) -> Optional[int]:
         raise NotImplementedError("send_message method must be implemented")
 
+    @abstractmethod
+    async def edit_message(self, chat_id: str, message_id: int, text: str) -> bool:
+        raise NotImplementedError("edit_message method must be implemented")
+
     @abstractmethod
     def receive_message(self, payload: dict[str, Any]) -> str:
         raise NotImplementedError("receive_message method must be implemented")
 
     @abstractmethod
-    async def download_voice(self, payload: dict[str, Any]) -> bytes:
+    async def download_voice(self, payload: dict[str, Any], max_bytes: Optional[int] = None) -> BinaryIO:
         raise NotImplementedError("download_voice method must be implemented")
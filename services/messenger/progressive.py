@@ -0,0 +1,179 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from schemas.idea import IdeaSchema, IcpSchema, RedditSchema
+from .base import Messenger
+
+PLACEHOLDER = "⏳ Analysing your idea…"
+
+# Telegram allows roughly one edit per second per chat
+DEFAULT_MIN_EDIT_INTERVAL = 1.5
+
+# Leave room for the "still working" footer under Telegram's 4096 limit
+MAX_MESSAGE_LENGTH = 4000
+
+
+def _bullets(items) -> str:
+    return "\n".join(f"• {item}" for item in items)
+
+
+def format_idea(idea: IdeaSchema) -> str:
+    return (
+        f"💡 {idea.title}\n\n"
+        f"{idea.description}\n\n"
+        f"Problem: {idea.problem_statement}\n\n"
+        f"Key features:\n{_bullets(idea.key_features)}"
+    )
+
+
+def format_icp(icp: IcpSchema) -> str:
+    return (
+        f"🎯 Ideal customer\n\n"
+        f"{icp.ideal_customer_profile}\n\n"
+        f"Target demographics: {', '.join(icp.target_demographics)}\n\n"
+        f"Pain points:\n{_bullets(icp.pain_points)}\n\n"
+        f"Motivations:\n{_bullets(icp.user_motivations)}"
+    )
+
+
+def format_reddit(reddit: RedditSchema) -> str:
+    def feedback(items):
+        return "\n".join(
+            f"• \"{item.comment}\" ({item.username}, {item.subreddit})" for item in items)
+
+    return (
+        f"💬 Reddit analysis\n\n"
+        f"Supportive:\n{feedback(reddit.supportive_feedback)}\n\n"
+        f"Challenging:\n{feedback(reddit.challenging_feedback)}\n\n"
+        f"Relevant subreddits: {', '.join(reddit.relevant_subreddits)}"
+    )
+
+
+# Stage name -> (section title shown while pending, formatter)
+STAGE_SECTIONS: Dict[str, Tuple[str, Callable[[Any], str]]] = {
+    "idea": ("idea", format_idea),
+    "icp": ("ideal customer profile", format_icp),
+    "reddit": ("Reddit analysis", format_reddit),
+}
+
+
+def _split(text: str, max_length: int = MAX_MESSAGE_LENGTH) -> List[str]:
+    """Split text into parts at paragraph boundaries where possible"""
+    parts = []
+    while len(text) > max_length:
+        cut = text.rfind("\n\n", 0, max_length)
+        if cut <= 0:
+            cut = max_length
+        parts.append(text[:cut].rstrip())
+        text = text[cut:].lstrip()
+    parts.append(text)
+    return parts
+
+
+class ProgressiveReply:
+    """
+    A chat reply that is posted as a placeholder right away and then edited
+    in place as pipeline stages finish. Edits are throttled: an update that
+    arrives within `min_interval` of the previous edit is deferred, and only
+    the newest pending text is sent.
+    """
+
+    def __init__(self, messenger: Messenger, chat_id: str, min_interval: float = DEFAULT_MIN_EDIT_INTERVAL):
+        self.messenger = messenger
+        self.chat_id = chat_id
+        self.min_interval = min_interval
+        self.message_id: Optional[int] = None
+        self.sections: Dict[str, str] = {}
+
+        self._shown: Optional[str] = None
+        self._pending: Optional[str] = None
+        self._last_edit = 0.0
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self, text: str = PLACEHOLDER) -> None:
+        """Post the placeholder message"""
+        self.message_id = await self.messenger.send_message(
+            self.chat_id, text, plain_text=True)
+        self._shown = text
+        self._last_edit = time.monotonic()
+
+    def render(self, final: bool = False) -> str:
+        """Render the finished sections in pipeline order"""
+        done = [self.sections[name]
+                for name in STAGE_SECTIONS if name in self.sections]
+        text = "\n\n".join(done)
+        if not final:
+            waiting = [title for name, (title, _) in STAGE_SECTIONS.items()
+                       if name not in self.sections]
+            if waiting:
+                text = f"{text}\n\n⏳ Still working on: {', '.join(waiting)}…".strip()
+        return text
+
+    async def on_stage_complete(self, name: str, result: Any) -> None:
+        """Pipeline callback: add the stage's section and schedule an edit"""
+        section = STAGE_SECTIONS.get(name)
+        if section is None:
+            return
+        try:
+            self.sections[name] = section[1](result)
+            await self.update(self.render())
+        except Exception as e:
+            # A failed edit must never fail the pipeline
+            print(f"Failed to update progressive reply: {str(e)}")
+
+    async def update(self, text: str) -> None:
+        """Show text as soon as the edit rate allows"""
+        if len(text) > MAX_MESSAGE_LENGTH:
+            text = text[:MAX_MESSAGE_LENGTH - 1] + "…"
+        self._pending = text
+
+        wait = self.min_interval - (time.monotonic() - self._last_edit)
+        if wait <= 0:
+            await self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush_later(wait))
+
+    async def _flush_later(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._flush_task = None
+        await self._flush()
+
+    async def _flush(self) -> None:
+        async with self._lock:
+            text, self._pending = self._pending, None
+            if text is None or text == self._shown:
+                return
+            await self._show(text)
+
+    async def _show(self, text: str) -> None:
+        if self.message_id is None:
+            self.message_id = await self.messenger.send_message(
+                self.chat_id, text, plain_text=True)
+        else:
+            await self.messenger.edit_message(self.chat_id, self.message_id, text)
+        self._shown = text
+        self._last_edit = time.monotonic()
+
+    async def finish(self, text: Optional[str] = None) -> None:
+        """
+        Replace the placeholder with the final text, waiting out the edit
+        interval if needed. Text beyond one message is sent as follow-ups.
+        Args:
+            text: Final text; defaults to all rendered sections
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
+        self._pending = None
+
+        parts = _split(text if text is not None else self.render(final=True))
+
+        async with self._lock:
+            wait = self.min_interval - (time.monotonic() - self._last_edit)
+            if wait > 0 and self.message_id is not None:
+                await asyncio.sleep(wait)
+            if parts[0] != self._shown:
+                await self._show(parts[0])
+            for part in parts[1:]:
+                await self.messenger.send_message(self.chat_id, part, plain_text=True)
@@ -0,0 +1,271 @@
+import asyncio
+import itertools
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from telegram.error import RetryAfter
+from config.settings import settings
+
+# Lower values are sent first
+INTERACTIVE = 0
+BULK = 1
+
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens +
+                          (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available"""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def take(self, now: float) -> None:
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass
+class _SendRequest:
+    chat_id: str
+    send: Callable[[], Awaitable[Any]]
+    priority: int
+    seq: int
+    future: asyncio.Future
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class TelegramSendScheduler:
+    """
+    Async send queue for the Telegram Bot API. Each request waits for a
+    token from its chat's bucket and from the global bucket; among the chats
+    that are ready, interactive requests go before bulk ones. A chat has at
+    most one request in flight, so its messages arrive in order. A 429 pauses
+    the chat for the `retry_after` Telegram returns and requeues the request.
+    """
+
+    def __init__(
+        self,
+        global_rate: float = 30.0,
+        global_burst: float = 30.0,
+        per_chat_rate: float = 1.0,
+        per_chat_burst: float = 3.0,
+        max_retries: int = 3
+    ):
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.max_retries = max_retries
+        self.global_bucket = TokenBucket(global_rate, global_burst)
+
+        self._queues: Dict[str, Deque[_SendRequest]] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._paused_until: Dict[str, float] = {}
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+        self._sent = 0
+        self._failed = 0
+        self._retried = 0
+        self._max_wait = 0.0
+
+    async def submit(self, chat_id: str, send: Callable[[], Awaitable[Any]], priority: int = INTERACTIVE) -> Any:
+        """
+        Queue a Bot API call and wait for its result.
+        Args:
+            chat_id: Chat the call targets; calls to one chat run in order
+            send: Zero-argument coroutine factory performing the call
+            priority: INTERACTIVE or BULK
+        Returns:
+            Whatever `send` returns
+        """
+        self._ensure_dispatcher()
+        request = _SendRequest(
+            chat_id=str(chat_id),
+            send=send,
+            priority=priority,
+            seq=next(self._seq),
+            future=asyncio.get_running_loop().create_future()
+        )
+        self._queues.setdefault(request.chat_id, deque()).append(request)
+        self._wakeup.set()
+        return await request.future
+
+    def _ensure_dispatcher(self) -> None:
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    def _bucket(self, chat_id: str) -> TokenBucket:
+        bucket = self._buckets.get(chat_id)
+        if bucket is None:
+            bucket = TokenBucket(self.per_chat_rate, self.per_chat_burst)
+            self._buckets[chat_id] = bucket
+        return bucket
+
+    async def _dispatch(self) -> None:
+        while True:
+            if not self._queues:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            now = time.monotonic()
+            global_wait = self.global_bucket.wait_time(now)
+            if global_wait > 0:
+                await asyncio.sleep(global_wait)
+                continue
+
+            # Pick the most urgent chat that may send now
+            best: Optional[_SendRequest] = None
+            next_ready = float("inf")
+            for chat_id, queue in self._queues.items():
+                if chat_id in self._in_flight:
+                    continue
+                wait = max(self._bucket(chat_id).wait_time(now),
+                           self._paused_until.get(chat_id, 0.0) - now)
+                if wait > 0:
+                    next_ready = min(next_ready, wait)
+                    continue
+                head = queue[0]
+                if best is None or (head.priority, head.seq) < (best.priority, best.seq):
+                    best = head
+
+            if best is None:
+                # Sleep until a chat becomes ready, a send finishes or a
+                # new request arrives
+                self._wakeup.clear()
+                timeout = None if next_ready == float("inf") else next_ready
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            queue = self._queues[best.chat_id]
+            queue.popleft()
+            if not queue:
+                del self._queues[best.chat_id]
+            if best.future.done():
+                # The caller stopped waiting
+                continue
+
+            self.global_bucket.take(now)
+            self._bucket(best.chat_id).take(now)
+            self._max_wait = max(self._max_wait, now - best.enqueued_at)
+            self._in_flight[best.chat_id] = asyncio.create_task(
+                self._send(best))
+
+    async def _send(self, request: _SendRequest) -> None:
+        try:
+            result = await request.send()
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            seconds = retry_after.total_seconds() if isinstance(
+                retry_after, timedelta) else float(retry_after)
+            request.attempts += 1
+            if request.future.done():
+                pass
+            elif request.attempts > self.max_retries:
+                self._failed += 1
+                request.future.set_exception(e)
+            else:
+                self._retried += 1
+                print(
+                    f"Telegram flood limit for chat {request.chat_id}, retrying in {seconds}s")
+                self._paused_until[request.chat_id] = time.monotonic() + seconds
+                self._queues.setdefault(
+                    request.chat_id, deque()).appendleft(request)
+        except Exception as e:
+            self._failed += 1
+            if not request.future.done():
+                request.future.set_exception(e)
+        else:
+            self._sent += 1
+            if not request.future.done():
+                request.future.set_result(result)
+        finally:
+            self._in_flight.pop(request.chat_id, None)
+            self._prune()
+            self._wakeup.set()
+
+    def _prune(self) -> None:
+        """Forget rate state of idle chats once it is back to the default"""
+        if len(self._buckets) < 1024:
+            return
+        now = time.monotonic()
+        for chat_id in list(self._buckets):
+            if (chat_id not in self._queues and chat_id not in self._in_flight
+                    and self._buckets[chat_id].is_full(now)
+                    and self._paused_until.get(chat_id, 0.0) <= now):
+                del self._buckets[chat_id]
+                self._paused_until.pop(chat_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and send counters for this process"""
+        by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+        oldest = 0.0
+        now = time.monotonic()
+        for queue in self._queues.values():
+            for request in queue:
+                name = PRIORITY_NAMES.get(request.priority, str(request.priority))
+                by_priority[name] = by_priority.get(name, 0) + 1
+                oldest = max(oldest, now - request.enqueued_at)
+
+        return {
+            "queued": sum(by_priority.values()),
+            "queued_by_priority": by_priority,
+            "chats_waiting": len(self._queues),
+            "chats_paused": sum(1 for until in self._paused_until.values() if until > now),
+            "in_flight": len(self._in_flight),
+            "oldest_queued_seconds": round(oldest, 3),
+            "max_wait_seconds": round(self._max_wait, 3),
+            "sent": self._sent,
+            "retried": self._retried,
+            "failed": self._failed,
+        }
+
+    async def close(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+            self._dispatcher = None
+        for task in list(self._in_flight.values()):
+            task.cancel()
+        for queue in self._queues.values():
+            for request in queue:
+                if not request.future.done():
+                    request.future.cancel()
+        self._queues.clear()
+
+
+def create_send_scheduler() -> TelegramSendScheduler:
+    """Build a scheduler with the limits from settings"""
+    return TelegramSendScheduler(
+        global_rate=settings.TELEGRAM_GLOBAL_SENDS_PER_SECOND,
+        global_burst=settings.TELEGRAM_GLOBAL_SENDS_PER_SECOND,
+        per_chat_rate=settings.TELEGRAM_CHAT_SENDS_PER_SECOND,
+        per_chat_burst=settings.TELEGRAM_CHAT_SEND_BURST
+    )
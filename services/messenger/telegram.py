@@ -1,30 +1,56 @@
 from .base import Messenger
-from typing import Any, Optional
+from typing import Any, BinaryIO, Optional
 from telegram import Bot
-from telegram.constants import ParseMode
+from telegram.constants import MessageLimit, ParseMode
+from telegram.error import BadRequest
+from .send_scheduler import INTERACTIVE, TelegramSendScheduler, create_send_scheduler
+from config.settings import settings
+from services.observability.tracing import traced
+from tempfile import SpooledTemporaryFile
 import asyncio
+import httpx
+
+# Voice notes up to this size are kept in memory while downloading
+SPOOL_MAX_MEMORY = 1024 * 1024
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class VoiceTooLargeError(ValueError):
+    """Raised when a voice message exceeds the download size cap"""
 
 
 class TelegramMessenger(Messenger):
 
-    def __init__(self, token: str):
+    def __init__(self, token: str, scheduler: Optional[TelegramSendScheduler] = None):
         self.bot = Bot(token=token)
-
-    async def send_message(self, chat_id: str, text: str, reply_markup: Optional[Any] = None) -> None:
+        # Outgoing calls go through the scheduler to stay under Telegram's limits
+        self.scheduler = scheduler or create_send_scheduler()
+        self.http = httpx.AsyncClient(timeout=httpx.Timeout(30.0, connect=10.0))
+
+    @traced("telegram")
+    async def send_message(self, chat_id: str, text: str, reply_markup: Optional[Any] = None, plain_text: bool = False, priority: int = INTERACTIVE) -> Optional[int]:
+        """
+        Send a message, split into parts if it is too long.
+        Args:
+            priority: INTERACTIVE for replies to a user, BULK for notifications
+        Returns:
+            ID of the last message sent
+        """
         print(f"Sending message to chat_id {chat_id}: {text}")
 
         is_json = text.strip().startswith('{') and text.strip().endswith('}')
 
-        parse_mode = None if is_json else ParseMode.MARKDOWN
+        parse_mode = None if is_json or plain_text else ParseMode.MARKDOWN
 
         max_length = 4000
         if len(text) <= max_length:
-            await self.bot.send_message(
+            message = await self.scheduler.submit(chat_id, lambda: self.bot.send_message(
                 chat_id=chat_id,
                 text=text,
                 parse_mode=parse_mode,
                 reply_markup=reply_markup,
-            )
+            ), priority)
+            return message.message_id
         else:
             # Split into chunks
             chunks = [text[i:i+max_length]
@@ -32,13 +58,48 @@ class TelegramMessenger(Messenger):
             for i, chunk in enumerate(chunks):
                 chunk_text = f"Part {i+1}/{len(chunks)}:\n{chunk}" if len(
                     chunks) > 1 else chunk
-                await self.bot.send_message(
+                message = await self.scheduler.submit(chat_id, lambda: self.bot.send_message(
                     chat_id=chat_id,
                     text=chunk_text,
                     parse_mode=parse_mode,
                     reply_markup=reply_markup if i == len(
                         chunks) - 1 else None,
-                )
+                ), priority)
+            return message.message_id
+
+    @traced("telegram")
+    async def edit_message(self, chat_id: str, message_id: int, text: str) -> bool:
+        """
+        Replace the text of a message sent earlier. The text is sent as plain
+        text and truncated to Telegram's message limit.
+        Returns:
+            True if the message was edited
+        """
+        max_length = MessageLimit.MAX_TEXT_LENGTH
+        if len(text) > max_length:
+            text = text[:max_length - 1] + "…"
+
+        try:
+            await self.scheduler.submit(chat_id, lambda: self.bot.edit_message_text(
+                text=text,
+                chat_id=chat_id,
+                message_id=message_id,
+            ))
+            return True
+        except BadRequest as e:
+            # Editing to identical text is rejected; nothing to do
+            if "not modified" in str(e).lower():
+                return True
+            print(f"Failed to edit message {message_id}: {str(e)}")
+            return False
+        except Exception as e:
+            print(f"Failed to edit message {message_id}: {str(e)}")
+            return False
+
+    async def close(self) -> None:
+        await self.scheduler.close()
+        await self.bot.shutdown()
+        await self.http.aclose()
 
     def receive_message(self, payload: dict) -> str:
         if "message" in payload:
@@ -49,33 +110,61 @@ class TelegramMessenger(Messenger):
 
         return ""
 
-    async def download_voice(self, payload: dict) -> bytes:
+    @traced("telegram")
+    async def download_voice(self, payload: dict, max_bytes: Optional[int] = None) -> BinaryIO:
+        """
+        Stream a voice message into a spooled temporary file: small notes stay
+        in memory, larger ones spill to disk, and nothing is copied again.
+        Args:
+            payload: Telegram update containing the voice message
+            max_bytes: Reject voice messages larger than this
+        Returns:
+            The file, positioned at the start; the caller closes it
+        """
         max_retries = 3
         retry_delay = 1  # seconds
-        download_timeout = 30  # seconds
+        max_bytes = max_bytes or settings.TELEGRAM_VOICE_MAX_BYTES
 
         voice = payload.get("message", {}).get("voice", {})
         file_id = voice.get("file_id")
 
         if not file_id:
             raise ValueError("No voice file_id found in payload")
+        if (voice.get("file_size") or 0) > max_bytes:
+            raise VoiceTooLargeError(
+                f"Voice message is larger than {max_bytes} bytes")
 
         for attempt in range(max_retries):
+            buffer = SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
             try:
                 file = await self.bot.get_file(file_id)
-                file_bytes = await file.download_as_bytearray(
-                    read_timeout=download_timeout
-                )
-
-                return bytes(file_bytes)
 
-            except TimeoutError:
+                size = 0
+                async with self.http.stream("GET", file.file_path) as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        size += len(chunk)
+                        if size > max_bytes:
+                            raise VoiceTooLargeError(
+                                f"Voice message is larger than {max_bytes} bytes")
+                        buffer.write(chunk)
+
+                buffer.seek(0)
+                return buffer
+
+            except VoiceTooLargeError:
+                buffer.close()
+                raise
+
+            except (TimeoutError, httpx.TimeoutException):
+                buffer.close()
                 if attempt == max_retries - 1:
                     raise RuntimeError(
                         f"Download timed out after {max_retries} attempts")
                 await asyncio.sleep(retry_delay)
 
             except Exception as e:
+                buffer.close()
                 if attempt == max_retries - 1:
                     raise RuntimeError(
                         f"Failed to download voice message: {str(e)}")
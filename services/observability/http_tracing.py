@@ -0,0 +1,47 @@
+from .metrics import SPAN_ERRORS
+from .tracing import TRACEPARENT_HEADER, parse_traceparent, span
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware timing every HTTP request as a span named after its route
+    template, continuing the caller's trace when a traceparent header is sent.
+    The span ends when the response body is complete, so streamed responses
+    are timed in full. The trace ID is returned in the X-Trace-Id header.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        parent = parse_traceparent(
+            headers.get(TRACEPARENT_HEADER.encode(), b"").decode("latin-1"))
+        status_code = 500
+
+        with span("http.unmatched", "http", parent, method=scope["method"]) as request_span:
+            async def send_with_trace(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"x-trace-id", request_span.trace_id.encode())]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_trace)
+            finally:
+                # The router records the matched route in the scope
+                route = scope.get("route")
+                path = getattr(route, "path", None)
+                request_span.name = f"http.{scope['method']} {path}" if path else "http.unmatched"
+                request_span.attributes["status"] = status_code
+                if status_code >= 500:
+                    request_span.status = "error"
+                    SPAN_ERRORS.labels(
+                        kind="http", name=request_span.name, error=f"HTTP {status_code}").inc()
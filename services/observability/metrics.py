@@ -0,0 +1,76 @@
+from typing import Dict, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Covers sub-millisecond Redis calls up to multi-minute LLM stages
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0, 240.0
+)
+
+SPAN_DURATION = Histogram(
+    "vts_span_duration_seconds",
+    "Duration of traced operations",
+    ["kind", "name", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+SPAN_ERRORS = Counter(
+    "vts_span_errors_total",
+    "Traced operations that raised, by exception type",
+    ["kind", "name", "error"]
+)
+
+TASK_QUEUE_WAIT = Histogram(
+    "vts_task_queue_wait_seconds",
+    "Time Celery tasks spent in the broker queue before a worker started them",
+    ["task"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_RETRIES = Counter(
+    "vts_llm_retries_total",
+    "LLM calls retried after a transient failure",
+    ["stage", "error"]
+)
+
+QUEUE_DEPTH = Gauge(
+    "vts_queue_depth",
+    "Messages waiting in a queue, sampled when metrics are scraped",
+    ["queue"]
+)
+
+QUEUE_BACKLOG = Gauge(
+    "vts_queue_backlog",
+    "Jobs waiting for a queue anywhere (Celery, fair queue and undispatched "
+    "batch children) as counted by admission control, sampled when metrics are scraped",
+    ["queue"]
+)
+
+QUEUE_PREDICTED_WAIT = Gauge(
+    "vts_queue_predicted_wait_seconds",
+    "Predicted wait for a job enqueued now, sampled when metrics are scraped",
+    ["queue"]
+)
+
+QUEUE_THROUGHPUT = Gauge(
+    "vts_queue_throughput_jobs_per_second",
+    "Throughput used for admission control, sampled when metrics are scraped",
+    ["queue"]
+)
+
+ADMISSION_REJECTIONS = Counter(
+    "vts_admission_rejections_total",
+    "Jobs turned away with 429 because the predicted queue wait exceeded the SLO",
+    ["queue"]
+)
+
+
+def set_queue_depths(depths: Dict[str, int]) -> None:
+    for queue, depth in depths.items():
+        QUEUE_DEPTH.labels(queue=queue).set(depth)
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Metrics of this process in the Prometheus text format, with its content type"""
+    return generate_latest(), CONTENT_TYPE_LATEST
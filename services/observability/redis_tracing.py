@@ -0,0 +1,56 @@
+import redis
+import redis.asyncio
+from redis.asyncio.client import Pipeline as AsyncPipeline
+from redis.client import Pipeline
+from redis.exceptions import NoScriptError
+
+from .tracing import span
+
+
+def _command_name(args: tuple) -> str:
+    return f"redis.{str(args[0]).upper()}" if args else "redis.UNKNOWN"
+
+
+class TracedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        with span("redis.pipeline", "redis", commands=len(self.command_stack)):
+            return super().execute(raise_on_error)
+
+
+class TracedRedis(redis.Redis):
+    """Redis client recording a span per command and per pipeline round trip"""
+
+    def execute_command(self, *args, **options):
+        with span(_command_name(args), "redis") as command_span:
+            try:
+                return super().execute_command(*args, **options)
+            except NoScriptError:
+                # Scripts are loaded on first use; redis-py retries with EVAL
+                command_span.status = "script_miss"
+                raise
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> TracedPipeline:
+        return TracedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+class TracedAsyncPipeline(AsyncPipeline):
+    async def execute(self, raise_on_error: bool = True):
+        with span("redis.pipeline", "redis", commands=len(self.command_stack)):
+            return await super().execute(raise_on_error)
+
+
+class TracedAsyncRedis(redis.asyncio.Redis):
+    """redis.asyncio client recording a span per command and per pipeline round trip"""
+
+    async def execute_command(self, *args, **options):
+        with span(_command_name(args), "redis") as command_span:
+            try:
+                return await super().execute_command(*args, **options)
+            except NoScriptError:
+                command_span.status = "script_miss"
+                raise
+
+    def pipeline(self, transaction: bool = True, shard_hint=None) -> TracedAsyncPipeline:
+        return TracedAsyncPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint)
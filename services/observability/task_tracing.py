@@ -0,0 +1,80 @@
+import time
+from contextvars import Token
+from typing import Dict, Optional, Tuple
+
+from celery.signals import before_task_publish, task_failure, task_postrun, task_prerun, worker_init
+from prometheus_client import start_http_server
+
+from config.settings import settings
+from .metrics import TASK_QUEUE_WAIT
+from .tracing import (
+    TRACEPARENT_HEADER, Span, activate, current_span, deactivate, finish_span,
+    parse_traceparent, start_span)
+
+# Set by the publisher so the worker can measure time spent in the queue
+PUBLISHED_AT_HEADER = "published_at"
+
+# Spans of the tasks running in this process, by task ID
+_task_spans: Dict[str, Tuple[Span, Token]] = {}
+_task_errors: Dict[str, BaseException] = {}
+
+
+def _short_name(task_name: Optional[str]) -> str:
+    return (task_name or "unknown").rsplit(".", 1)[-1]
+
+
+@before_task_publish.connect
+def inject_trace_context(headers: Optional[dict] = None, **kwargs):
+    # Custom message headers become attributes of the task request. A
+    # traceparent passed by the sender (e.g. a job dispatched later by the
+    # fair scheduler) wins over the publishing context
+    if headers is None:
+        return
+    parent = current_span()
+    if parent is not None:
+        headers.setdefault(TRACEPARENT_HEADER, parent.traceparent)
+    headers[PUBLISHED_AT_HEADER] = time.time()
+
+
+@task_prerun.connect
+def start_task_span(task_id: str = None, task=None, **kwargs):
+    request = task.request
+    name = _short_name(task.name)
+
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+    if published_at:
+        TASK_QUEUE_WAIT.labels(task=name).observe(
+            max(0.0, time.time() - float(published_at)))
+
+    parent = parse_traceparent(getattr(request, TRACEPARENT_HEADER, None))
+    task_span = start_span(f"celery.{name}", "celery", parent,
+                           task_id=task_id, retries=request.retries or 0)
+    _task_spans[task_id] = (task_span, activate(task_span))
+
+
+@task_failure.connect
+def record_task_failure(task_id: str = None, exception: BaseException = None, **kwargs):
+    if task_id in _task_spans and exception is not None:
+        _task_errors[task_id] = exception
+
+
+@task_postrun.connect
+def finish_task_span(task_id: str = None, state: str = None, **kwargs):
+    entry = _task_spans.pop(task_id, None)
+    error = _task_errors.pop(task_id, None)
+    if entry is None:
+        return
+    task_span, token = entry
+    task_span.attributes["state"] = state
+    finish_span(task_span, error=error)
+    deactivate(token)
+
+
+@worker_init.connect
+def start_worker_metrics_server(**kwargs):
+    # Workers have no HTTP app, so they expose /metrics on their own port.
+    # With the prefork pool every child keeps separate counters; the gevent
+    # pool used in deployment runs all tasks in this one process.
+    if settings.WORKER_METRICS_PORT:
+        start_http_server(settings.WORKER_METRICS_PORT)
+        print(f"Worker metrics on port {settings.WORKER_METRICS_PORT}")
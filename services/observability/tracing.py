@@ -0,0 +1,179 @@
+import asyncio
+import functools
+import inspect
+import re
+import secrets
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Dict, Iterator, Optional
+
+from config.settings import settings
+from .metrics import SPAN_DURATION, SPAN_ERRORS
+
+TRACEPARENT_HEADER = "traceparent"
+_TRACEPARENT = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    """
+    One timed operation. Spans nest through a context variable, so child
+    spans started in the same task (or a coroutine bound with `bind`) share
+    the trace ID.
+    """
+    name: str
+    kind: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    started: float = field(default_factory=time.perf_counter)
+    # Overrides the ok/error status derived from exceptions
+    status: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value pointing at this span"""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    span = _current_span.get()
+    return span.trace_id if span else None
+
+
+def activate(span: Span) -> Token:
+    """Make `span` the current span until `deactivate` is called with the token"""
+    return _current_span.set(span)
+
+
+def deactivate(token: Token) -> None:
+    _current_span.reset(token)
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[Span]:
+    """Remote parent span from a traceparent header, or None if it is malformed"""
+    match = _TRACEPARENT.match((value or "").strip().lower())
+    if not match:
+        return None
+    return Span(name="remote", kind="remote", trace_id=match.group(1), span_id=match.group(2))
+
+
+def start_span(name: str, kind: str = "internal", parent: Optional[Span] = None, **attributes: Any) -> Span:
+    """Create a span under `parent`, or under the current span if none is given"""
+    parent = parent or _current_span.get()
+    return Span(
+        name=name,
+        kind=kind,
+        trace_id=parent.trace_id if parent else secrets.token_hex(16),
+        span_id=secrets.token_hex(8),
+        parent_id=parent.span_id if parent else None,
+        attributes=attributes
+    )
+
+
+def finish_span(span: Span, error: Optional[BaseException] = None) -> float:
+    """
+    Record a finished span in the latency histogram and error counter, and
+    log it when it was slow or failed.
+    Returns:
+        The span's duration in seconds
+    """
+    duration = time.perf_counter() - span.started
+    status = span.status or ("error" if error is not None else "ok")
+    SPAN_DURATION.labels(kind=span.kind, name=span.name, status=status).observe(duration)
+    if error is not None and status == "error":
+        SPAN_ERRORS.labels(kind=span.kind, name=span.name, error=type(error).__name__).inc()
+
+    if settings.TRACE_LOG_SPANS or status == "error" or duration >= settings.TRACE_SLOW_SPAN_SECONDS:
+        attributes = " ".join(f"{key}={value}" for key, value in span.attributes.items())
+        print(
+            f"[trace {span.trace_id} span {span.span_id} parent {span.parent_id or '-'}] "
+            f"{span.kind} {span.name} {status} {duration * 1000:.1f}ms {attributes}".rstrip())
+    return duration
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", parent: Optional[Span] = None, **attributes: Any) -> Iterator[Span]:
+    """
+    Time the enclosed block as a span; works in sync and async code.
+    Args:
+        name: Low-cardinality operation name, used as a metric label
+        kind: Subsystem, e.g. http, redis, celery, llm, supabase
+        parent: Explicit parent, e.g. one parsed from a traceparent header
+        attributes: Extra fields included in the span's log line
+    """
+    if not settings.TRACING_ENABLED:
+        yield start_span(name, kind, parent, **attributes)
+        return
+
+    current = start_span(name, kind, parent, **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        # Cancellations are recorded as errors too: a hedged or timed out
+        # call that was abandoned still took time
+        finish_span(current, error=e)
+        raise
+    else:
+        finish_span(current)
+    finally:
+        _current_span.reset(token)
+
+
+def traced(kind: str, name: Optional[str] = None):
+    """Decorator running a function or coroutine function inside a span"""
+    def decorator(func):
+        span_name = name or f"{kind}.{func.__name__}"
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(span_name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def traced_methods(kind: str, exclude: tuple = ("close", "aclose")):
+    """Class decorator tracing every public method the class defines itself"""
+    def decorator(cls):
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith("_") or attr in exclude or not inspect.isfunction(value):
+                continue
+            setattr(cls, attr, traced(kind, f"{kind}.{attr}")(value))
+        return cls
+    return decorator
+
+
+def bind(coro: Awaitable[Any]) -> Awaitable[Any]:
+    """
+    Carry the caller's current span into a coroutine that runs on another
+    event loop or thread (e.g. the worker runtime's loop), where the
+    context variable would otherwise start empty.
+    """
+    parent = _current_span.get()
+
+    async def run():
+        token = _current_span.set(parent)
+        try:
+            return await coro
+        finally:
+            _current_span.reset(token)
+    return run()
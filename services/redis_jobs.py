@@ -1,37 +1,89 @@
 import redis
+import redis.asyncio
+import time
 import uuid
 import json
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from config.settings import settings
+from services.observability.redis_tracing import TracedAsyncRedis, TracedRedis
+
+# Batches with undispatched children, scored by when their lists expire
+BATCH_PENDING_INDEX_KEY = "idea_batches:pending"
+
+CREATE_JOB_SCRIPT = """
+local existing = redis.call('GET', KEYS[1])
+if existing then
+    return existing
+end
+redis.call('HSET', KEYS[2], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return ARGV[1]
+"""
+
+UPDATE_JOB_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return 0
+end
+if #ARGV > 2 then
+    redis.call('HSET', KEYS[1], unpack(ARGV, 3))
+    redis.call('EXPIRE', KEYS[1], ARGV[1])
+    local fields = redis.call('HGETALL', KEYS[1])
+    local job = {}
+    for i = 1, #fields, 2 do
+        job[fields[i]] = fields[i + 1]
+    end
+    redis.call('PUBLISH', ARGV[2], cjson.encode(job))
+end
+return 1
+"""
+
+
+def create_redis_client(use_async: bool = False):
+    """
+    Create a Redis client from settings (sync by default, or redis.asyncio)
+    that records a span for every command
+    """
+    client_class = TracedAsyncRedis if use_async else TracedRedis
+    redis_url = getattr(settings, 'REDIS_URL', None)
+    if redis_url and redis_url.strip():
+        return client_class.from_url(redis_url, decode_responses=True)
+
+    redis_password = getattr(settings, 'REDIS_PASSWORD', None)
+    if redis_password:
+        return client_class(
+            host=settings.REDIS_HOST,
+            port=settings.REDIS_PORT,
+            password=redis_password,
+            db=settings.REDIS_DB,
+            decode_responses=True
+        )
+    return client_class(
+        host=settings.REDIS_HOST,
+        port=settings.REDIS_PORT,
+        db=settings.REDIS_DB,
+        decode_responses=True
+    )
+
+
+def job_channel(job_id: str) -> str:
+    """Pub/sub channel that receives every update of a job"""
+    return f"prompt_job_events:{job_id}"
 
 
 class RedisJobManager:
 
     def __init__(self):
-        redis_url = getattr(settings, 'REDIS_URL', None)
-        if redis_url and redis_url.strip():
-            self.redis_client = redis.from_url(
-                redis_url, decode_responses=True)
-        else:
-            redis_password = getattr(settings, 'REDIS_PASSWORD', None)
-            if redis_password:
-                self.redis_client = redis.Redis(
-                    host=settings.REDIS_HOST,
-                    port=settings.REDIS_PORT,
-                    password=redis_password,
-                    db=settings.REDIS_DB,
-                    decode_responses=True
-                )
-            else:
-                self.redis_client = redis.Redis(
-                    host=settings.REDIS_HOST,
-                    port=settings.REDIS_PORT,
-                    db=settings.REDIS_DB,
-                    decode_responses=True
-                )
+        self.redis_client = create_redis_client()
         self.job_ttl = 48 * 3600
 
+        # Server-side scripts: each job operation is one atomic round trip
+        self._create_job_script = self.redis_client.register_script(
+            CREATE_JOB_SCRIPT)
+        self._update_job_script = self.redis_client.register_script(
+            UPDATE_JOB_SCRIPT)
+
     def create_job(
         self,
         idea_id: str,
@@ -39,17 +91,15 @@ class RedisJobManager:
         idempotency_key: str,
         additional_data: Optional[Dict[str, Any]] = None
     ) -> str:
-        """Create a new job and return job_id"""
+        """Create a new job and return job_id.
+
+        The dedupe lookup, job hash write and dedupe key write run as a single
+        script, so concurrent requests with the same idempotency key always
+        resolve to the same job.
+        """
         job_id = str(uuid.uuid4())
 
-        # Check for existing job with same idempotency key
         dedupe_key = f"prompt_job_dedupe:{idea_id}:{service_type}:{idempotency_key}"
-        existing_job_id = self.redis_client.get(dedupe_key)
-
-        if existing_job_id:
-            return existing_job_id
-
-        # Create job hash
         job_key = f"prompt_job:{job_id}"
         job_data = {
             "status": "queued",
@@ -67,14 +117,10 @@ class RedisJobManager:
         if additional_data:
             job_data.update(additional_data)
 
-        # Set job data with TTL
-        self.redis_client.hset(job_key, mapping=job_data)
-        self.redis_client.expire(job_key, self.job_ttl)
-
-        # Set dedupe key with same TTL
-        self.redis_client.setex(dedupe_key, self.job_ttl, job_id)
-
-        return job_id
+        return self._create_job_script(
+            keys=[dedupe_key, job_key],
+            args=[job_id, self.job_ttl, *self._flatten(job_data)]
+        )
 
     def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
         """Get job data by job_id"""
@@ -100,15 +146,14 @@ class RedisJobManager:
         progress: Optional[float] = None,
         error: Optional[str] = None,
         prompt_id: Optional[str] = None,
-        idea_result_id: Optional[str] = None
+        idea_result_id: Optional[str] = None,
+        **fields: Any
     ) -> bool:
-        """Update job fields"""
+        """Update job fields, refresh the TTL and publish the new job state
+        to the job's channel in one round trip. Extra keyword arguments are
+        stored as additional fields."""
         job_key = f"prompt_job:{job_id}"
 
-        # Check if job exists
-        if not self.redis_client.exists(job_key):
-            return False
-
         updates = {}
         if status is not None:
             updates["status"] = status
@@ -120,13 +165,15 @@ class RedisJobManager:
             updates["prompt_id"] = prompt_id
         if idea_result_id is not None:
             updates["idea_result_id"] = idea_result_id
+        for name, value in fields.items():
+            if value is not None:
+                updates[name] = str(value)
 
-        if updates:
-            self.redis_client.hset(job_key, mapping=updates)
-            # Refresh TTL on update
-            self.redis_client.expire(job_key, self.job_ttl)
-
-        return True
+        result = self._update_job_script(
+            keys=[job_key],
+            args=[self.job_ttl, job_channel(job_id), *self._flatten(updates)]
+        )
+        return bool(result)
 
     def job_exists(self, job_id: str) -> bool:
         """Check if job exists"""
@@ -138,6 +185,103 @@ class RedisJobManager:
         dedupe_key = f"prompt_job_dedupe:{idea_id}:{service_type}:{idempotency_key}"
         return self.redis_client.get(dedupe_key)
 
+    def create_batch_children(
+        self,
+        batch_id: str,
+        user_id: str,
+        user_inputs: List[str]
+    ) -> List[str]:
+        """
+        Create one idea job per input under a batch job, in a single
+        transaction. Children are listed in order and also queued on the
+        batch's pending list, from which they are dispatched.
+        Returns:
+            The child job IDs, in input order
+        """
+        created_at = datetime.utcnow().isoformat()
+        child_ids = [str(uuid.uuid4()) for _ in user_inputs]
+
+        with self.redis_client.pipeline(transaction=True) as pipe:
+            for index, (child_id, user_input) in enumerate(zip(child_ids, user_inputs)):
+                job_key = f"prompt_job:{child_id}"
+                pipe.hset(job_key, mapping={
+                    "status": "queued",
+                    "progress": "0.0",
+                    "error": "",
+                    "idea_id": f"idea_generation_{user_id}",
+                    "service_type": "idea",
+                    "idempotency_key": f"{batch_id}:{index}",
+                    "prompt_id": "",
+                    "idea_result_id": "",
+                    "created_at": created_at,
+                    "user_input": user_input,
+                    "user_id": user_id,
+                    "batch_id": batch_id
+                })
+                pipe.expire(job_key, self.job_ttl)
+
+            for key in (f"idea_batch:{batch_id}:children", f"idea_batch:{batch_id}:pending"):
+                pipe.rpush(key, *child_ids)
+                pipe.expire(key, self.job_ttl)
+            pipe.zadd(BATCH_PENDING_INDEX_KEY, {batch_id: time.time() + self.job_ttl})
+            pipe.execute()
+
+        return child_ids
+
+    def get_batch_children(self, batch_id: str) -> List[str]:
+        """Child job IDs of a batch, in input order"""
+        return self.redis_client.lrange(f"idea_batch:{batch_id}:children", 0, -1)
+
+    def pop_batch_pending(self, batch_id: str, count: int) -> List[str]:
+        """Atomically take up to `count` undispatched children of a batch"""
+        pending_key = f"idea_batch:{batch_id}:pending"
+        with self.redis_client.pipeline(transaction=True) as pipe:
+            pipe.lpop(pending_key, count)
+            pipe.llen(pending_key)
+            child_ids, remaining = pipe.execute()
+        if remaining == 0:
+            self.redis_client.zrem(BATCH_PENDING_INDEX_KEY, batch_id)
+        return child_ids or []
+
+    def count_batch_pending(self) -> int:
+        """Undispatched children across all batches"""
+        self.redis_client.zremrangebyscore(BATCH_PENDING_INDEX_KEY, "-inf", time.time())
+        batch_ids = self.redis_client.zrange(BATCH_PENDING_INDEX_KEY, 0, -1)
+        if not batch_ids:
+            return 0
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for batch_id in batch_ids:
+                pipe.llen(f"idea_batch:{batch_id}:pending")
+            return sum(pipe.execute())
+
+    def get_jobs_fields(self, job_ids: List[str], fields: List[str]) -> List[Dict[str, Any]]:
+        """Read the given fields of many jobs in one round trip"""
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for job_id in job_ids:
+                pipe.hmget(f"prompt_job:{job_id}", fields)
+            rows = pipe.execute()
+        return [dict(zip(fields, row)) for row in rows]
+
+    def get_queue_depths(self, queues: List[str]) -> Dict[str, int]:
+        """Messages waiting in each Celery queue (Redis broker lists)"""
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for queue in queues:
+                pipe.llen(queue)
+            depths = pipe.execute()
+        return dict(zip(queues, depths))
+
+    def claim_once(self, key: str, ttl: int) -> bool:
+        """
+        Atomically claim a key for `ttl` seconds.
+        Returns:
+            True for the first caller, False while the claim is held
+        """
+        return bool(self.redis_client.set(key, "1", nx=True, ex=ttl))
+
+    def release_claim(self, key: str) -> None:
+        """Drop a claim so the same work can be claimed again"""
+        self.redis_client.delete(key)
+
     def complete_job(self, job_id: str) -> bool:
         """Mark job as completed"""
         return self.update_job(job_id, status="succeeded", progress=1.0, error="")
@@ -146,6 +290,15 @@ class RedisJobManager:
         """Mark job as failed with error message"""
         return self.update_job(job_id, status="failed", error=error_message)
 
+    @staticmethod
+    def _flatten(mapping: Dict[str, Any]) -> List[str]:
+        """Flatten a mapping into [field, value, ...] script arguments"""
+        args = []
+        for field, value in mapping.items():
+            args.append(field)
+            args.append("" if value is None else str(value))
+        return args
+
 
 # Global instance
 redis_job_manager = RedisJobManager()
@@ -0,0 +1,21 @@
+from typing import Optional
+
+from config.settings import settings
+from services.embeddings.factory import create_embedder
+from .idea_index import IdeaDeduplicator, IdeaIndex
+
+
+def create_deduplicator() -> IdeaDeduplicator:
+    """Build the idea deduplicator from settings"""
+    return IdeaDeduplicator(
+        embedder=create_embedder(),
+        index=IdeaIndex(settings.IDEA_INDEX_DIR, settings.EMBEDDING_DIMENSIONS),
+        threshold=settings.IDEA_DEDUPE_THRESHOLD
+    )
+
+
+def create_optional_deduplicator() -> Optional[IdeaDeduplicator]:
+    """Return a deduplicator when IDEA_DEDUPE_ENABLED is set, otherwise None"""
+    if not settings.IDEA_DEDUPE_ENABLED:
+        return None
+    return create_deduplicator()
@@ -0,0 +1,189 @@
+import asyncio
+import fcntl
+import json
+import os
+from typing import List, Optional, Set, Tuple
+
+import numpy as np
+
+from services.database.base import Database
+from services.embeddings.base import Embedder
+
+
+class IdeaIndex:
+    """
+    Append-only vector index of stored ideas, persisted as a float32 matrix
+    that is memory-mapped for search. Rows are L2-normalized, so the dot
+    product with a normalized query is the cosine similarity.
+
+    Files in `directory`: vectors.f32 (rows), ids.txt (one idea ID per row)
+    and meta.json (dimensions). Appends take an exclusive file lock, so
+    several processes sharing the directory can add ideas safely.
+    """
+
+    def __init__(self, directory: str, dimensions: int):
+        self.directory = directory
+        self.dimensions = dimensions
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.txt")
+        self.lock_path = os.path.join(directory, ".lock")
+
+        os.makedirs(directory, exist_ok=True)
+        self._check_meta()
+
+        self._ids: List[str] = []
+        self._id_set: Set[str] = set()
+        self._matrix: Optional[np.ndarray] = None
+        self._files_size = (-1, -1)
+        self.refresh()
+
+    def _check_meta(self) -> None:
+        meta_path = os.path.join(self.directory, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, encoding="utf-8") as f:
+                stored = json.load(f).get("dimensions")
+            if stored != self.dimensions:
+                raise ValueError(
+                    f"Idea index at {self.directory} has {stored} dimensions, expected {self.dimensions}")
+        else:
+            with open(meta_path, "w", encoding="utf-8") as f:
+                json.dump({"dimensions": self.dimensions}, f)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, idea_id: str) -> bool:
+        return idea_id in self._id_set
+
+    def refresh(self) -> None:
+        """Re-map the matrix if another process appended rows"""
+        size = os.path.getsize(self.vectors_path) if os.path.exists(
+            self.vectors_path) else 0
+        # A row is written before its ID, so both files are checked
+        ids_size = os.path.getsize(self.ids_path) if os.path.exists(
+            self.ids_path) else 0
+        if (size, ids_size) == self._files_size:
+            return
+
+        ids = []
+        if os.path.exists(self.ids_path):
+            with open(self.ids_path, encoding="utf-8") as f:
+                ids = [line.strip() for line in f if line.strip()]
+
+        row_bytes = self.dimensions * 4
+        rows = min(size // row_bytes, len(ids))
+
+        self._ids = ids[:rows]
+        self._id_set = set(self._ids)
+        self._matrix = np.memmap(
+            self.vectors_path, dtype=np.float32, mode="r",
+            shape=(rows, self.dimensions)) if rows else None
+        self._files_size = (size, ids_size)
+
+    def _normalize(self, vector) -> np.ndarray:
+        array = np.asarray(vector, dtype=np.float32).reshape(-1)
+        if array.shape[0] != self.dimensions:
+            raise ValueError(
+                f"Expected a {self.dimensions}-dimensional vector, got {array.shape[0]}")
+        norm = np.linalg.norm(array)
+        return array / norm if norm > 0 else array
+
+    def add(self, idea_id: str, vector) -> bool:
+        """Append an idea's vector; returns False if it is already indexed"""
+        row = self._normalize(vector)
+
+        with open(self.lock_path, "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                self.refresh()
+                if idea_id in self._id_set:
+                    return False
+                # Vector first, then ID: readers only use rows that have both
+                with open(self.vectors_path, "ab") as f:
+                    f.write(row.tobytes())
+                with open(self.ids_path, "a", encoding="utf-8") as f:
+                    f.write(f"{idea_id}\n")
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+        self.refresh()
+        return True
+
+    def search(self, vector, k: int = 1) -> List[Tuple[str, float]]:
+        """Return up to k (idea_id, cosine similarity) pairs, best first"""
+        self.refresh()
+        if self._matrix is None:
+            return []
+
+        scores = self._matrix @ self._normalize(vector)
+        k = min(k, scores.shape[0])
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self._ids[i], float(scores[i])) for i in top]
+
+
+class IdeaDeduplicator:
+    """
+    Finds stored ideas that are near-duplicates of a new submission by
+    comparing embeddings of the original idea text.
+    """
+
+    def __init__(self, embedder: Embedder, index: IdeaIndex, threshold: float):
+        self.embedder = embedder
+        self.index = index
+        self.threshold = threshold
+
+    async def find_duplicate(self, text: str) -> Optional[Tuple[str, float]]:
+        """Return (idea_id, similarity) of the closest stored idea above the
+        threshold, or None"""
+        if not text.strip():
+            return None
+        # Pick up ideas other processes indexed before skipping the embedding
+        await asyncio.to_thread(self.index.refresh)
+        if len(self.index) == 0:
+            return None
+
+        [vector] = await self.embedder.embed([text.strip()])
+        matches = await asyncio.to_thread(self.index.search, vector, 1)
+        if matches and matches[0][1] >= self.threshold:
+            return matches[0]
+        return None
+
+    async def index_idea(self, idea_id: str, text: str) -> None:
+        if not idea_id or not text.strip() or idea_id in self.index:
+            return
+        [vector] = await self.embedder.embed([text.strip()])
+        await asyncio.to_thread(self.index.add, idea_id, vector)
+
+    async def backfill(self, db: Database, page_size: int = 100) -> int:
+        """Index every stored idea that is not indexed yet; returns the count added"""
+        added = 0
+        cursor = None
+        while True:
+            page = await asyncio.to_thread(db.get_ideas_page, page_size, cursor)
+            for summary in page["ideas"]:
+                if summary["id"] in self.index:
+                    continue
+                idea = await asyncio.to_thread(db.get_idea_by_id, summary["id"])
+                if idea and idea.get("original_idea"):
+                    await self.index_idea(str(idea["id"]), idea["original_idea"])
+                    added += 1
+            cursor = page["next_cursor"]
+            if not cursor:
+                return added
+
+
+if __name__ == "__main__":
+    # python -m services.similarity.idea_index  -> backfill the index from the database
+    from config.settings import settings
+    from services.database.supabase_db import SupabaseDB
+    from services.similarity.factory import create_deduplicator
+
+    async def main():
+        deduplicator = create_deduplicator()
+        db = SupabaseDB(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        added = await deduplicator.backfill(db)
+        print(f"Indexed {added} ideas, index size {len(deduplicator.index)}")
+        await deduplicator.embedder.aclose()
+
+    asyncio.run(main())
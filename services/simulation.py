@@ -0,0 +1,49 @@
+import asyncio
+import math
+import random
+from typing import Optional
+
+
+class SyntheticError(RuntimeError):
+    """Injected failure raised by synthetic backends"""
+
+
+class LatencyModel:
+    """
+    Log-normal latency distribution with injected failures, used by the
+    synthetic LLM and transcriber backends.
+    Args:
+        median_ms: Median latency in milliseconds
+        sigma: Spread of the underlying normal distribution (0 = fixed latency)
+        error_rate: Probability (0.0-1.0) that a call fails
+        seed: Optional seed for reproducible runs
+    """
+
+    def __init__(
+        self,
+        median_ms: float,
+        sigma: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None
+    ):
+        if median_ms < 0:
+            raise ValueError("median_ms must not be negative")
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0.0 and 1.0")
+
+        self.median_ms = median_ms
+        self.sigma = sigma
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+
+    def sample_ms(self) -> float:
+        if self.sigma <= 0:
+            return self.median_ms
+        return self.median_ms * math.exp(self.rng.gauss(0.0, self.sigma))
+
+    async def wait(self, label: str = "call", extra_ms: float = 0.0) -> None:
+        """Sleep for a sampled latency (plus extra_ms), then fail with the
+        configured probability"""
+        await asyncio.sleep((self.sample_ms() + extra_ms) / 1000)
+        if self.error_rate and self.rng.random() < self.error_rate:
+            raise SyntheticError(f"Synthetic failure injected into {label}")
@@ -1,12 +1,63 @@
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import BinaryIO, Optional, Union
+
+# Raw audio, or a seekable binary file positioned at the start of the audio
+AudioInput = Union[bytes, BinaryIO]
+
+_CHUNK_SIZE = 64 * 1024
+
+
+def audio_size(audio: AudioInput) -> int:
+    """Size of the audio in bytes; file-like input keeps its position"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return len(audio)
+    position = audio.tell()
+    audio.seek(0, 2)
+    size = audio.tell() - position
+    audio.seek(position)
+    return size
+
+
+def audio_digest(audio: AudioInput) -> str:
+    """SHA-256 of the audio content, read in chunks for file-like input"""
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return hashlib.sha256(audio).hexdigest()
+    digest = hashlib.sha256()
+    position = audio.tell()
+    for chunk in iter(lambda: audio.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+    audio.seek(position)
+    return digest.hexdigest()
 
 
 class Transcriber(ABC):
     @abstractmethod
     async def transcribe(
         self,
-        audio_bytes: bytes,
-        language: Optional[str] = None
+        audio: AudioInput,
+        language: Optional[str] = None,
+        source_id: Optional[str] = None
     ) -> str:
+        """
+        Transcribe audio to text.
+        Args:
+            audio: Audio bytes or a seekable binary file
+            language: Optional ISO-639-1 language hint
+            source_id: Stable ID of the audio at its source (e.g. Telegram's
+                file_unique_id), used for caching
+        Returns:
+            The transcript
+        """
         raise NotImplementedError("transcribe method must be implemented")
+
+    async def cached_transcript(self, source_id: str, language: Optional[str] = None) -> Optional[str]:
+        """
+        Transcript already stored for a source ID, so callers can skip
+        fetching the audio. Transcribers without a cache return None.
+        """
+        return None
+
+    async def aclose(self) -> None:
+        """Release any clients held by the transcriber"""
+        return None
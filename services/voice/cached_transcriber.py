@@ -0,0 +1,109 @@
+from typing import Any, Dict, Optional
+
+import redis
+
+from services.redis_jobs import create_redis_client
+from .base import AudioInput, Transcriber, audio_digest
+
+CACHE_PREFIX = "transcript:"
+STATS_KEY = "transcript_cache_stats"
+
+
+class CachedTranscriber(Transcriber):
+    """
+    Caches transcripts in Redis under two keys: the source ID (Telegram's
+    file_unique_id, the same for every forward or retry of a voice note) and
+    the SHA-256 of the audio. A source ID hit skips reading the audio at all;
+    a content hit catches the same audio uploaded as a different file.
+    """
+
+    def __init__(self, transcriber: Transcriber, ttl: int = 604800):
+        self.transcriber = transcriber
+        self.ttl = ttl
+        self.redis_client = create_redis_client(use_async=True)
+
+    @staticmethod
+    def _source_key(source_id: str, language: Optional[str]) -> str:
+        return f"{CACHE_PREFIX}source:{source_id}:{language or ''}"
+
+    @staticmethod
+    def _content_key(digest: str, language: Optional[str]) -> str:
+        return f"{CACHE_PREFIX}sha256:{digest}:{language or ''}"
+
+    async def _get(self, key: str, counter: str) -> Optional[str]:
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.hincrby(STATS_KEY, counter, 1)
+                text, _ = await pipe.execute()
+            return text
+        except redis.RedisError as e:
+            print(f"Transcript cache read failed: {str(e)}")
+            return None
+
+    async def _set(self, keys: list, text: str) -> None:
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(key, text, ex=self.ttl)
+                await pipe.execute()
+        except redis.RedisError as e:
+            print(f"Transcript cache write failed: {str(e)}")
+
+    async def cached_transcript(self, source_id: str, language: Optional[str] = None) -> Optional[str]:
+        # A miss is not counted here; it is counted by the transcribe call
+        # that follows it
+        try:
+            text = await self.redis_client.get(self._source_key(source_id, language))
+        except redis.RedisError as e:
+            print(f"Transcript cache read failed: {str(e)}")
+            return None
+        if text is not None:
+            await self._count("source_lookups")
+            await self._count("source_hits")
+        return text
+
+    async def transcribe(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        source_id: Optional[str] = None
+    ) -> str:
+        source_key = self._source_key(
+            source_id, language) if source_id else None
+
+        if source_key:
+            text = await self._get(source_key, "source_lookups")
+            if text is not None:
+                await self._count("source_hits")
+                return text
+
+        content_key = self._content_key(audio_digest(audio), language)
+        text = await self._get(content_key, "content_lookups")
+        if text is not None:
+            await self._count("content_hits")
+            if source_key:
+                await self._set([source_key], text)
+            return text
+
+        text = await self.transcriber.transcribe(
+            audio, language=language, source_id=source_id)
+
+        if text:
+            await self._set([key for key in (source_key, content_key) if key], text)
+        return text
+
+    async def _count(self, counter: str) -> None:
+        try:
+            await self.redis_client.hincrby(STATS_KEY, counter, 1)
+        except redis.RedisError:
+            pass
+
+    async def stats(self) -> Dict[str, Any]:
+        """Cluster-wide lookup and hit counts by key type"""
+        counters = await self.redis_client.hgetall(STATS_KEY)
+        return {name: int(value) for name, value in counters.items()}
+
+    async def aclose(self) -> None:
+        await self.redis_client.aclose()
+        await self.transcriber.aclose()
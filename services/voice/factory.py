@@ -0,0 +1,54 @@
+import os
+from config.settings import settings
+from services.simulation import LatencyModel
+from .base import Transcriber
+from .cached_transcriber import CachedTranscriber
+from .openai_transcriber import OpenAITranscriber
+from .replay_transcriber import RecordingTranscriber, ReplayTranscriber
+from .segmented_transcriber import SegmentedTranscriber
+from .synthetic_transcriber import SyntheticTranscriber
+
+
+def create_transcriber() -> Transcriber:
+    """
+    Build the transcriber backend selected by settings.TRANSCRIBER_BACKEND,
+    splitting long notes into parallel segments, behind the transcript cache
+    when it is enabled
+    """
+    transcriber = SegmentedTranscriber(
+        _create_backend(),
+        segment_seconds=settings.TRANSCRIBE_SEGMENT_SECONDS,
+        overlap_seconds=settings.TRANSCRIBE_SEGMENT_OVERLAP_SECONDS,
+        max_concurrency=settings.TRANSCRIBE_MAX_CONCURRENCY
+    )
+    if settings.TRANSCRIPT_CACHE_ENABLED:
+        return CachedTranscriber(transcriber, ttl=settings.TRANSCRIPT_CACHE_TTL_SECONDS)
+    return transcriber
+
+
+def _create_backend() -> Transcriber:
+    backend = settings.TRANSCRIBER_BACKEND.lower()
+    recordings_dir = os.path.join(settings.RECORDINGS_DIR, "voice")
+
+    if backend == "openai":
+        return OpenAITranscriber(
+            api_key=settings.OPENAI_API_KEY, default_model=settings.TRANSCRIBE_MODEL)
+    if backend == "record":
+        return RecordingTranscriber(
+            OpenAITranscriber(
+                api_key=settings.OPENAI_API_KEY, default_model=settings.TRANSCRIBE_MODEL),
+            recordings_dir)
+    if backend == "replay":
+        return ReplayTranscriber(recordings_dir, replay_latency=settings.REPLAY_LATENCY)
+    if backend == "synthetic":
+        return SyntheticTranscriber(
+            latency=LatencyModel(
+                median_ms=settings.SYNTHETIC_LATENCY_MS,
+                sigma=settings.SYNTHETIC_LATENCY_SIGMA,
+                error_rate=settings.SYNTHETIC_ERROR_RATE,
+                seed=settings.SYNTHETIC_SEED
+            ),
+            ms_per_kb=1.0
+        )
+
+    raise ValueError(f"Unknown transcriber backend '{settings.TRANSCRIBER_BACKEND}'")
@@ -0,0 +1,236 @@
+import struct
+import threading
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Tuple
+
+# Ogg page header: capture pattern, version, flags, granule position,
+# stream serial, page sequence number, CRC, number of lacing values
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+_CAPTURE = b"OggS"
+
+FLAG_CONTINUED = 0x01
+FLAG_BOS = 0x02
+FLAG_EOS = 0x04
+
+# Opus granule positions always count 48 kHz samples
+OPUS_SAMPLE_RATE = 48000
+
+
+class OggError(ValueError):
+    """Raised for data that is not a well-formed Ogg stream"""
+
+
+def _crc_table() -> List[int]:
+    table = []
+    for i in range(256):
+        crc = i << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+        table.append(crc & 0xFFFFFFFF)
+    return table
+
+
+_CRC_TABLE = _crc_table()
+
+
+def ogg_crc(data: bytes) -> int:
+    """Ogg page checksum: CRC-32, polynomial 0x04C11DB7, no reflection, zero init"""
+    crc = 0
+    table = _CRC_TABLE
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFFFF) ^ table[(crc >> 24) ^ byte]
+    return crc
+
+
+@dataclass(frozen=True)
+class OggPage:
+    offset: int
+    length: int
+    flags: int
+    granule: int
+    serial: int
+
+
+def read_pages(f: BinaryIO) -> List[OggPage]:
+    """
+    Index the pages of an Ogg stream without reading their payloads.
+    The file position is restored afterwards.
+    """
+    start = f.tell()
+    pages = []
+    try:
+        while True:
+            offset = f.tell()
+            header = f.read(_PAGE_HEADER.size)
+            if not header:
+                break
+            if len(header) < _PAGE_HEADER.size:
+                raise OggError("Truncated Ogg page header")
+
+            capture, version, flags, granule, serial, _, _, segments = _PAGE_HEADER.unpack(
+                header)
+            if capture != _CAPTURE or version != 0:
+                raise OggError(f"Invalid Ogg page at offset {offset}")
+
+            lacing = f.read(segments)
+            if len(lacing) < segments:
+                raise OggError("Truncated Ogg segment table")
+            payload_length = sum(lacing)
+            f.seek(payload_length, 1)
+
+            pages.append(OggPage(
+                offset=offset,
+                length=_PAGE_HEADER.size + segments + payload_length,
+                flags=flags,
+                granule=granule,
+                serial=serial
+            ))
+    finally:
+        f.seek(start)
+    return pages
+
+
+def _read_page(f: BinaryIO, page: OggPage) -> bytearray:
+    f.seek(page.offset)
+    data = bytearray(f.read(page.length))
+    if len(data) < page.length:
+        raise OggError("Truncated Ogg page")
+    return data
+
+
+class OggOpusSplit:
+    """
+    Splits an Ogg Opus stream into self-contained, optionally overlapping
+    segments. Cuts are made only at page boundaries where no packet continues
+    across the cut. Each segment gets the stream's header pages, renumbered
+    page sequence numbers, granule positions rebased to the segment start,
+    an end-of-stream flag on its last page and recomputed checksums.
+    """
+
+    def __init__(self, f: BinaryIO, pages: List[OggPage], header_count: int, pre_skip: int):
+        self.f = f
+        self.header_pages = pages[:header_count]
+        self.audio_pages = pages[header_count:]
+        self.pre_skip = pre_skip
+        self.segments: List[Tuple[int, int]] = []
+        self._lock = threading.Lock()
+
+        # Sample position at the start of every audio page
+        self._starts = []
+        position = 0
+        for page in self.audio_pages:
+            self._starts.append(position)
+            if page.granule != -1:
+                position = page.granule
+        self.total_samples = position
+
+    @classmethod
+    def open(cls, f: BinaryIO) -> Optional["OggOpusSplit"]:
+        """Index an Ogg Opus stream; returns None if it is not one"""
+        try:
+            pages = read_pages(f)
+        except OggError:
+            return None
+        if not pages or any(page.serial != pages[0].serial for page in pages):
+            return None
+
+        position = f.tell()
+        first = bytes(_read_page(f, pages[0]))
+        f.seek(position)
+
+        payload = first[_PAGE_HEADER.size + first[26]:]
+        if not payload.startswith(b"OpusHead") or len(payload) < 12:
+            return None
+        pre_skip = struct.unpack_from("<H", payload, 10)[0]
+
+        # ID and comment headers sit on pages with granule position 0
+        header_count = 0
+        while header_count < len(pages) and pages[header_count].granule == 0:
+            header_count += 1
+        if header_count == len(pages):
+            return None
+
+        return cls(f, pages, header_count, pre_skip)
+
+    @property
+    def duration(self) -> float:
+        return max(0, self.total_samples - self.pre_skip) / OPUS_SAMPLE_RATE
+
+    def _cuttable(self, index: int) -> bool:
+        return not self.audio_pages[index].flags & FLAG_CONTINUED
+
+    def plan(self, segment_seconds: float, overlap_seconds: float = 0.0) -> List[Tuple[int, int]]:
+        """
+        Choose segments as [start, end) ranges of audio page indexes.
+        Args:
+            segment_seconds: Target segment length
+            overlap_seconds: Audio repeated at the start of the next segment
+        Returns:
+            The segments, also kept on the instance
+        """
+        segment_samples = int(segment_seconds * OPUS_SAMPLE_RATE)
+        overlap_samples = int(overlap_seconds * OPUS_SAMPLE_RATE)
+        count = len(self.audio_pages)
+
+        segments = []
+        start = 0
+        while True:
+            remaining = self.total_samples - self._starts[start]
+            # Fold a short tail into the last segment
+            if remaining <= segment_samples * 1.25:
+                segments.append((start, count))
+                break
+
+            target = self._starts[start] + segment_samples
+            end = next((i for i in range(start + 1, count)
+                        if self._starts[i] >= target and self._cuttable(i)), None)
+            if end is None:
+                segments.append((start, count))
+                break
+            segments.append((start, end))
+
+            next_start = end
+            for i in range(end - 1, start, -1):
+                if self._starts[i] <= self._starts[end] - overlap_samples and self._cuttable(i):
+                    next_start = i
+                    break
+            start = next_start
+
+        self.segments = segments
+        return segments
+
+    def segment_bytes(self, index: int) -> bytes:
+        """Build the Ogg stream for one planned segment"""
+        start, end = self.segments[index]
+        # Later segments start with a fresh decoder that drops pre_skip
+        # samples again; the first keeps the source's granules as they are
+        base_granule = self._starts[start]
+        shift = base_granule - self.pre_skip if base_granule > 0 else 0
+
+        with self._lock:
+            position = self.f.tell()
+            try:
+                raw_pages = [_read_page(self.f, page)
+                             for page in self.header_pages + self.audio_pages[start:end]]
+            finally:
+                self.f.seek(position)
+
+        out = bytearray()
+        header_count = len(self.header_pages)
+        for sequence, data in enumerate(raw_pages):
+            flags = data[5] & ~FLAG_EOS
+            if sequence == len(raw_pages) - 1:
+                flags |= FLAG_EOS
+            data[5] = flags
+
+            if sequence >= header_count:
+                granule = struct.unpack_from("<q", data, 6)[0]
+                if granule != -1:
+                    struct.pack_into("<q", data, 6, granule - shift)
+
+            struct.pack_into("<I", data, 18, sequence)
+            struct.pack_into("<I", data, 22, 0)
+            struct.pack_into("<I", data, 22, ogg_crc(data))
+            out += data
+
+        return bytes(out)
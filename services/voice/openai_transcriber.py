@@ -1,7 +1,7 @@
 from io import BytesIO
 from typing import Optional
 from openai import AsyncOpenAI
-from .base import Transcriber
+from .base import AudioInput, Transcriber, audio_size
 
 
 class OpenAITranscriber(Transcriber):
@@ -13,19 +13,23 @@ class OpenAITranscriber(Transcriber):
 
     async def transcribe(
         self,
-        audio_bytes: bytes,
-        language: Optional[str] = None
+        audio: AudioInput,
+        language: Optional[str] = None,
+        source_id: Optional[str] = None
     ) -> str:
-        if not audio_bytes:
+        if not audio_size(audio):
             return ""
 
-        bio = BytesIO(audio_bytes)
-        bio.name = "audio.ogg"
+        # File-like input is streamed into the upload as is, without a copy
+        file = BytesIO(audio) if isinstance(audio, bytes) else audio
 
         resp = await self.client.audio.transcriptions.create(
             model=self.default_model,
-            file=bio,
+            file=("audio.ogg", file),
             language=language,
         )
 
         return resp.text
+
+    async def aclose(self) -> None:
+        await self.client.close()
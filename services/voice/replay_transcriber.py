@@ -0,0 +1,89 @@
+import asyncio
+import hashlib
+import json
+import os
+import time
+from typing import Optional
+
+from .base import AudioInput, Transcriber, audio_digest, audio_size
+
+
+def transcription_key(audio: AudioInput, language: Optional[str]) -> str:
+    digest = audio_digest(audio)
+    return hashlib.sha256(f"{digest}:{language or ''}".encode("utf-8")).hexdigest()
+
+
+class RecordingTranscriber(Transcriber):
+    """
+    Wraps a real transcriber and writes every transcript to a directory of
+    JSON files, keyed by the audio content, for offline replay.
+    """
+
+    def __init__(self, transcriber: Transcriber, directory: str):
+        self.transcriber = transcriber
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    async def transcribe(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        source_id: Optional[str] = None
+    ) -> str:
+        key = transcription_key(audio, language)
+        size = audio_size(audio)
+
+        started = time.perf_counter()
+        text = await self.transcriber.transcribe(
+            audio, language=language, source_id=source_id)
+
+        path = os.path.join(self.directory, f"{key}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "method": "transcribe",
+                "audio_size": size,
+                "language": language,
+                "response": text,
+                "latency_ms": (time.perf_counter() - started) * 1000,
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+        return text
+
+    async def aclose(self) -> None:
+        await self.transcriber.aclose()
+
+
+class ReplayTranscriber(Transcriber):
+    """
+    Serves transcripts recorded by RecordingTranscriber without network access.
+    Args:
+        directory: Directory containing the recordings
+        replay_latency: Sleep for the recorded latency before returning
+    """
+
+    def __init__(self, directory: str, replay_latency: bool = False):
+        self.directory = directory
+        self.replay_latency = replay_latency
+
+    async def transcribe(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        source_id: Optional[str] = None
+    ) -> str:
+        if not audio_size(audio):
+            return ""
+
+        key = transcription_key(audio, language)
+        path = os.path.join(self.directory, f"{key}.json")
+        if not os.path.exists(path):
+            raise LookupError(f"No recorded transcription for key {key}")
+
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+
+        if self.replay_latency:
+            await asyncio.sleep(record.get("latency_ms", 0) / 1000)
+        return record["response"]
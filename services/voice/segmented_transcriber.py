@@ -0,0 +1,143 @@
+import asyncio
+import math
+import re
+from io import BytesIO
+from typing import List, Optional, Tuple
+
+from .base import AudioInput, Transcriber
+from .ogg import OggOpusSplit
+
+# Upper bound on speech rate, used to size the overlap window in words
+_WORDS_PER_SECOND = 3.5
+# Words at each edge of a seam that may be garbled by the cut
+_EDGE_WORDS = 1
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.casefold())
+
+
+def _seam_overlap(left: List[str], right: List[str], window: int) -> Optional[Tuple[int, int, int]]:
+    """
+    Longest run of words that ends at the end of `left` and starts at the
+    start of `right`, allowing a garbled word at either edge.
+    Returns:
+        (end in left, start in right, length) of the run, or None
+    """
+    best = None
+    for a_end in range(len(left), max(0, len(left) - _EDGE_WORDS - 1), -1):
+        for b_start in range(0, min(_EDGE_WORDS + 1, len(right))):
+            longest = min(window, a_end, len(right) - b_start)
+            for size in range(longest, 0, -1):
+                if left[a_end - size:a_end] == right[b_start:b_start + size]:
+                    if best is None or size > best[2]:
+                        best = (a_end, b_start, size)
+                    break
+    return best
+
+
+def stitch_transcripts(parts: List[str], overlap_seconds: float = 2.0, min_match: int = 2) -> str:
+    """
+    Join transcripts of overlapping segments, dropping the words that both
+    sides of a seam transcribed from the shared audio. The shared words must
+    end one part and start the next; without such a run the parts are
+    concatenated rather than cut.
+    Args:
+        parts: Segment transcripts in order
+        overlap_seconds: Audio shared by neighbouring segments
+        min_match: Fewest matching words accepted as the overlap
+    Returns:
+        The joined transcript
+    """
+    # Pages make the real overlap up to about a second longer
+    window = max(min_match, math.ceil((overlap_seconds + 1) * _WORDS_PER_SECOND))
+    words: List[str] = []
+    for part in parts:
+        incoming = part.split()
+        if not words:
+            words = incoming
+            continue
+
+        tail = words[-(window + _EDGE_WORDS):]
+        head = incoming[:window + _EDGE_WORDS]
+        match = _seam_overlap(
+            [_normalize_word(w) for w in tail],
+            [_normalize_word(w) for w in head],
+            window
+        )
+
+        if match and match[2] >= min_match:
+            # Keep this side up to the shared words, then continue with the
+            # next segment from where they start
+            a_end, b_start, size = match
+            cut = len(words) - len(tail) + a_end - size
+            words = words[:cut] + incoming[b_start:]
+        else:
+            words += incoming
+
+    return " ".join(words)
+
+
+class SegmentedTranscriber(Transcriber):
+    """
+    Transcribes long Ogg Opus voice notes as overlapping segments in
+    parallel, so latency follows the segment length rather than the note
+    length. Short notes and other formats go to the wrapped transcriber whole.
+    Args:
+        transcriber: Transcriber used for each segment
+        segment_seconds: Target segment length
+        overlap_seconds: Audio shared by neighbouring segments, so words cut
+            at a seam are heard whole by one side
+        max_concurrency: Segments transcribed at the same time per note
+    """
+
+    def __init__(
+        self,
+        transcriber: Transcriber,
+        segment_seconds: float = 120.0,
+        overlap_seconds: float = 2.0,
+        max_concurrency: int = 4
+    ):
+        self.transcriber = transcriber
+        self.segment_seconds = segment_seconds
+        self.overlap_seconds = overlap_seconds
+        self.max_concurrency = max_concurrency
+
+    def _plan(self, f) -> Optional[OggOpusSplit]:
+        split = OggOpusSplit.open(f)
+        if split is None:
+            return None
+        split.plan(self.segment_seconds, self.overlap_seconds)
+        return split if len(split.segments) > 1 else None
+
+    async def transcribe(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        source_id: Optional[str] = None
+    ) -> str:
+        f = BytesIO(audio) if isinstance(audio, bytes) else audio
+        split = await asyncio.to_thread(self._plan, f)
+        if split is None:
+            return await self.transcriber.transcribe(
+                audio, language=language, source_id=source_id)
+
+        print(
+            f"Transcribing {split.duration:.0f}s voice note as {len(split.segments)} segments")
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def transcribe_segment(index: int) -> str:
+            async with semaphore:
+                segment = await asyncio.to_thread(split.segment_bytes, index)
+                return await self.transcriber.transcribe(
+                    segment,
+                    language=language,
+                    source_id=f"{source_id}:{index}" if source_id else None
+                )
+
+        parts = await asyncio.gather(
+            *(transcribe_segment(i) for i in range(len(split.segments))))
+        return stitch_transcripts(parts, self.overlap_seconds)
+
+    async def aclose(self) -> None:
+        await self.transcriber.aclose()
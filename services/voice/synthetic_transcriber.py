@@ -0,0 +1,40 @@
+from typing import Optional
+
+from services.simulation import LatencyModel
+from .base import AudioInput, Transcriber, audio_size
+
+
+class SyntheticTranscriber(Transcriber):
+    """
+    Offline transcriber that returns a fixed transcript after a modelled
+    latency, optionally scaled with the audio size.
+    Args:
+        latency: Base latency model per request
+        ms_per_kb: Extra latency per KB of audio, to mimic longer notes
+        transcript: Text returned for every request
+    """
+
+    def __init__(
+        self,
+        latency: LatencyModel,
+        ms_per_kb: float = 0.0,
+        transcript: str = "An app that helps busy parents plan healthy weekly meals and order the groceries automatically."
+    ):
+        self.latency = latency
+        self.ms_per_kb = ms_per_kb
+        self.transcript = transcript
+
+    async def transcribe(
+        self,
+        audio: AudioInput,
+        language: Optional[str] = None,
+        source_id: Optional[str] = None
+    ) -> str:
+        size = audio_size(audio)
+        if not size:
+            return ""
+
+        await self.latency.wait(
+            "transcribe", extra_ms=self.ms_per_kb * size / 1024)
+
+        return self.transcript
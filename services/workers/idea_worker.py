@@ -1,60 +1,118 @@
 import asyncio
+from typing import Optional, Tuple
 from services.celery_app import celery_app
+from services.job_progress import job_progress
+from services.admission import queue_admission
+from services.fair_queue import fair_scheduler
 from services.redis_jobs import redis_job_manager
-from services.database.supabase_db import SupabaseDB
-from services.llm.openai_llm import OpenAILLM
-from services.agent.agent_service import AgentService
+from services.workers.runtime import WorkerRuntime, get_runtime
 from config.settings import settings
 
 
+def dispatch_batch_children(batch_id: str, count: int) -> int:
+    """
+    Submit up to `count` undispatched children of a batch to the fair
+    scheduler as bulk work of the batch's user. Each finished child submits
+    the next one, so a batch never has more than its initial dispatch count
+    queued or running.
+    Returns:
+        Number of children submitted
+    """
+    child_ids = redis_job_manager.pop_batch_pending(batch_id, count)
+    if child_ids:
+        user_id = (redis_job_manager.get_job(batch_id) or {}).get("user_id", "web_user")
+        for child_id in child_ids:
+            fair_scheduler.submit("idea_generation", child_id, "batch", user_id)
+    return len(child_ids)
+
+
+def _release_after_lost_child(job_id: str, job: dict) -> None:
+    # A lost child never reaches the task's finally block, so its batch
+    # slot is handed on here
+    if job.get("batch_id"):
+        dispatch_batch_children(job["batch_id"], 1)
+
+
+fair_scheduler.on_lease_expired("idea_generation", _release_after_lost_child)
+
+
+async def _find_duplicate(runtime: WorkerRuntime, text: str) -> Optional[Tuple[str, float]]:
+    """(idea_id, similarity) of a stored near-duplicate, or None if there is
+    none or the lookup failed"""
+    if runtime.deduplicator is None:
+        return None
+    try:
+        return await runtime.deduplicator.find_duplicate(text)
+    except Exception as e:
+        print(f"Duplicate idea lookup failed: {str(e)}")
+        return None
+
+
 @celery_app.task(bind=True)
 def generate_idea_task(self, job_id: str):
     """
     Celery task for generating ideas asynchronously
     """
+    batch_id = None
+    # Set once this run moves the job to succeeded or failed
+    finished = False
     try:
         job_data = redis_job_manager.get_job(job_id)
         if not job_data:
             print(f"Job {job_id} not found or expired")
             return
 
+        batch_id = job_data.get("batch_id")
+
         if job_data["status"] in ["succeeded", "failed"]:
             print(
                 f"Job {job_id} already completed with status: {job_data['status']}")
             return
 
-        redis_job_manager.update_job(job_id, status="running", progress=0.05)
+        progress = job_progress.start(
+            job_id, job_data, "idea", record_queue_wait=not batch_id)
 
-        # Initialize services
-
-        db = SupabaseDB(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        llm = OpenAILLM(api_key=settings.OPENAI_API_KEY)
-        agent = AgentService(llm=llm, db=db)
+        runtime = get_runtime()
 
         # Extract job parameters
         user_input = job_data["user_input"]
         user_id = job_data["user_id"]
+
+        # The index lives with the workers, so web submissions are checked here
+        if job_data.get("check_duplicate"):
+            duplicate = runtime.run(_find_duplicate(runtime, user_input))
+            if duplicate:
+                duplicate_id, similarity = duplicate
+                redis_job_manager.update_job(
+                    job_id,
+                    status="succeeded",
+                    progress=1.0,
+                    error="",
+                    idea_result_id=duplicate_id,
+                    duplicate_of=duplicate_id,
+                    similarity=round(similarity, 4)
+                )
+                finished = True
+                print(f"Job {job_id} duplicates idea {duplicate_id} ({similarity:.2f})")
+                return
         llm_options = {
             "model": settings.DEFAULT_MODEL,
             "temperature": settings.DEFAULT_TEMPERATURE,
             "max_tokens": settings.MAX_TOKENS
         }
 
-        redis_job_manager.update_job(job_id, status="running", progress=0.1)
+        async def on_stage_complete(stage: str, result) -> None:
+            await asyncio.to_thread(progress.complete, stage)
 
-        # Process idea generation using agent service
-        redis_job_manager.update_job(job_id, status="running", progress=0.5)
-
-        response_schema = asyncio.run(
-            agent.handle_user_message(
+        response_schema = runtime.run(
+            runtime.agent.handle_user_message(
                 user_input=user_input,
                 user_id=user_id,
-                options=llm_options
+                options=llm_options,
+                on_stage_complete=on_stage_complete
             )
         )
 
-        redis_job_manager.update_job(job_id, status="running", progress=0.9)
-
         if response_schema:
             # Extract the idea ID from the response (already saved by agent service)
             idea_result_id = response_schema.idea_id if hasattr(
@@ -68,12 +126,30 @@ def generate_idea_task(self, job_id: str):
                 error="",
                 idea_result_id=idea_result_id
             )
+            finished = True
             print(
                 f"Idea generation completed successfully for job {job_id}, idea ID: {idea_result_id}")
         else:
             redis_job_manager.fail_job(
                 job_id, "Low confidence scores - idea generation failed")
+            finished = True
 
     except Exception as e:
         print(f"Error in idea generation task {job_id}: {str(e)}")
         redis_job_manager.fail_job(job_id, f"Internal error: {str(e)}")
+        finished = True
+    finally:
+        # Early returns and redeliveries of finished jobs are not throughput
+        if finished:
+            queue_admission.record_completion("idea_generation")
+        try:
+            fair_scheduler.complete("idea_generation", job_id)
+        except Exception as e:
+            print(f"Error releasing fair queue slot of job {job_id}: {str(e)}")
+        # A redelivered message for a finished child must not release
+        # another one, or the batch would exceed its in-flight bound
+        if batch_id and finished:
+            try:
+                dispatch_batch_children(batch_id, 1)
+            except Exception as e:
+                print(f"Error dispatching next child of batch {batch_id}: {str(e)}")
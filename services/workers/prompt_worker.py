@@ -1,14 +1,16 @@
-import asyncio
 from services.celery_app import celery_app
 from services.redis_jobs import redis_job_manager
-from services.database.supabase_db import SupabaseDB
-from services.llm.openai_llm import OpenAILLM
-from services.agent.agent_service import AgentService
+from services.job_progress import job_progress
+from services.admission import queue_admission
+from services.fair_queue import fair_scheduler
+from services.workers.runtime import get_runtime
 from config.settings import settings
 
 
 @celery_app.task(bind=True)
 def generate_prompt_task(self, job_id: str):
+    # Set once this run moves the job to succeeded or failed
+    finished = False
     try:
         job_data = redis_job_manager.get_job(job_id)
         if not job_data:
@@ -20,11 +22,10 @@ def generate_prompt_task(self, job_id: str):
                 f"Job {job_id} already completed with status: {job_data['status']}")
             return
 
-        redis_job_manager.update_job(job_id, status="running", progress=0.05)
+        progress = job_progress.start(job_id, job_data, "prompt")
 
-        db = SupabaseDB(settings.SUPABASE_URL, settings.SUPABASE_KEY)
-        llm = OpenAILLM(api_key=settings.OPENAI_API_KEY)
-        agent = AgentService(llm=llm, db=db)
+        runtime = get_runtime()
+        db = runtime.db
 
         idea_id = job_data["idea_id"]
         service_type = job_data["service_type"]
@@ -36,9 +37,10 @@ def generate_prompt_task(self, job_id: str):
                 status="failed",
                 error=f"Idea with ID '{idea_id}' not found"
             )
+            finished = True
             return
 
-        redis_job_manager.update_job(job_id, progress=0.2)
+        progress.complete("load")
 
         llm_options = {
             "model": settings.DEFAULT_MODEL,
@@ -46,19 +48,19 @@ def generate_prompt_task(self, job_id: str):
             "max_tokens": settings.MAX_TOKENS
         }
 
-        script_result = asyncio.run(agent.generate_script(
+        script_result = runtime.run(runtime.agent.generate_script(
             idea_data, service_type, llm_options))
 
-        redis_job_manager.update_job(job_id, progress=0.8)
-
         if "error" in script_result:
             redis_job_manager.update_job(
                 job_id,
                 status="failed",
                 error=f"Failed to generate prompt: {script_result['error']}"
             )
+            finished = True
             return
 
+        progress.complete("script")
         prompt_content = script_result["script"]
 
         save_result = db.save_prompt(idea_id, service_type, prompt_content)
@@ -69,14 +71,18 @@ def generate_prompt_task(self, job_id: str):
                 status="failed",
                 error=f"Failed to save prompt: {save_result['error']}"
             )
+            finished = True
             return
 
+        progress.complete("save")
+
         redis_job_manager.update_job(
             job_id,
             status="succeeded",
             progress=1.0,
             prompt_id=save_result["prompt_id"]
         )
+        finished = True
 
         print(
             f"Successfully generated prompt for idea {idea_id}, service {service_type}")
@@ -88,3 +94,12 @@ def generate_prompt_task(self, job_id: str):
             status="failed",
             error=f"Internal error: {str(e)}"
         )
+        finished = True
+    finally:
+        # Early returns and redeliveries of finished jobs are not throughput
+        if finished:
+            queue_admission.record_completion("prompt_generation")
+        try:
+            fair_scheduler.complete("prompt_generation", job_id)
+        except Exception as e:
+            print(f"Error releasing fair queue slot of job {job_id}: {str(e)}")
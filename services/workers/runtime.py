@@ -0,0 +1,119 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Optional
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+from services.database.supabase_db import SupabaseDB
+from services.database.cached_db import InvalidatingDatabase
+from services.llm.factory import create_llm
+from services.agent.agent_service import AgentService
+from services.similarity.factory import create_optional_deduplicator
+from services.messenger.telegram import TelegramMessenger
+from services.voice.factory import create_transcriber
+from config.settings import settings
+from services.observability.tracing import bind
+
+
+class WorkerRuntime:
+    """
+    Clients shared by every task in a worker process: the database, the LLM
+    (one AsyncOpenAI client and HTTP pool), the agent, the Telegram messenger
+    and the transcriber, plus a long-lived
+    event loop so async clients keep their connections warm between tasks.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="worker-event-loop", daemon=True)
+        self._thread.start()
+
+        self.db = InvalidatingDatabase(
+            SupabaseDB(settings.SUPABASE_URL, settings.SUPABASE_KEY))
+        self.llm = create_llm()
+        self.deduplicator = create_optional_deduplicator()
+        self.agent = AgentService(
+            llm=self.llm, db=self.db, deduplicator=self.deduplicator)
+        self.messenger = TelegramMessenger(token=settings.TELEGRAM_API_TOKEN)
+        self.transcriber = create_transcriber()
+
+        # An index on a fresh disk is rebuilt in the background; lookups
+        # miss until it catches up
+        if self.deduplicator is not None and len(self.deduplicator.index) == 0:
+            asyncio.run_coroutine_threadsafe(self._backfill_index(), self.loop)
+
+    async def _backfill_index(self) -> None:
+        try:
+            added = await self.deduplicator.backfill(self.db)
+            print(f"Idea index backfilled with {added} ideas")
+        except Exception as e:
+            print(f"Idea index backfill failed: {str(e)}")
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def run(self, coro: Awaitable[Any]) -> Any:
+        """
+        Run a coroutine on the runtime's event loop and wait for its result.
+        The coroutine continues the calling task's trace.
+        """
+        return asyncio.run_coroutine_threadsafe(bind(coro), self.loop).result()
+
+    def close(self) -> None:
+        try:
+            self.run(self.llm.aclose())
+        except Exception as e:
+            print(f"Error closing LLM client: {str(e)}")
+        if self.deduplicator is not None:
+            try:
+                self.run(self.deduplicator.embedder.aclose())
+            except Exception as e:
+                print(f"Error closing embedder client: {str(e)}")
+        try:
+            self.run(self.transcriber.aclose())
+        except Exception as e:
+            print(f"Error closing transcriber: {str(e)}")
+        try:
+            self.run(self.messenger.close())
+        except Exception as e:
+            print(f"Error closing Telegram client: {str(e)}")
+        try:
+            self.db.close()
+        except Exception as e:
+            print(f"Error closing database client: {str(e)}")
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        self.loop.close()
+
+
+_runtime: Optional[WorkerRuntime] = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> WorkerRuntime:
+    """Return this process's runtime, creating it on first use"""
+    global _runtime
+    if _runtime is None:
+        with _runtime_lock:
+            if _runtime is None:
+                _runtime = WorkerRuntime()
+    return _runtime
+
+
+@worker_process_init.connect
+def init_worker_runtime(**kwargs):
+    # Prefork children build their clients up front; other pools (gevent,
+    # solo, threads) build them on the first task
+    get_runtime()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def close_worker_runtime(**kwargs):
+    global _runtime
+    with _runtime_lock:
+        runtime, _runtime = _runtime, None
+    if runtime is not None:
+        runtime.close()
+        print("Worker runtime closed")
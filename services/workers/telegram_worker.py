@@ -0,0 +1,158 @@
+import asyncio
+import json
+from typing import Any, Dict, Optional
+from services.celery_app import celery_app
+from services.redis_jobs import redis_job_manager
+from services.fair_queue import fair_scheduler
+from services.messenger.progressive import ProgressiveReply
+from services.workers.runtime import WorkerRuntime, get_runtime
+from config.settings import settings
+
+
+async def process_update(runtime: WorkerRuntime, payload: Dict[str, Any], chat_id: str) -> Optional[str]:
+    """
+    Transcribe (for voice messages), generate and reply to one Telegram update.
+    Args:
+        runtime: The worker's shared clients
+        payload: The Telegram update as received by the webhook
+        chat_id: Chat to reply to
+    Returns:
+        ID of the generated or matching existing idea, if any
+    """
+    messenger = runtime.messenger
+    progress = None
+    try:
+        msg = payload.get("message", {})
+
+        if msg.get("text", {}):
+            incoming_text = messenger.receive_message(payload)
+        elif msg.get("voice", {}):
+            source_id = msg["voice"].get("file_unique_id")
+            # Forwards and redeliveries of a known note skip the download
+            incoming_text = await runtime.transcriber.cached_transcript(
+                source_id, language="en") if source_id else None
+            if incoming_text is None:
+                with await messenger.download_voice(payload) as audio:
+                    incoming_text = await runtime.transcriber.transcribe(
+                        audio,
+                        language="en",
+                        source_id=source_id
+                    )
+        else:
+            incoming_text = ""
+
+        if not incoming_text:
+            await messenger.send_message(chat_id, "Unsupported or empty message.")
+            return None
+
+        duplicate_id = await _reply_with_duplicate(runtime, chat_id, incoming_text)
+        if duplicate_id:
+            return duplicate_id
+
+        llm_options = {
+            "model": settings.DEFAULT_MODEL,
+            "temperature": settings.DEFAULT_TEMPERATURE,
+            "max_tokens": settings.MAX_TOKENS
+        }
+
+        # Post a placeholder now and fill it in as each stage finishes
+        progress = ProgressiveReply(messenger, chat_id)
+        await progress.start()
+
+        reply = await runtime.agent.handle_user_message(
+            user_input=incoming_text,
+            options=llm_options,
+            user_id=chat_id,
+            on_stage_complete=progress.on_stage_complete
+        )
+
+        if not reply:
+            await progress.finish("Sorry, something went wrong.")
+            return None
+
+        final_text = progress.render(final=True)
+        if reply.idea_id:
+            final_text += f"\n\nIdea ID: {reply.idea_id}"
+        await progress.finish(final_text)
+        return reply.idea_id
+
+    except Exception:
+        try:
+            if progress is not None:
+                await progress.finish("Sorry, an error occurred.")
+            else:
+                await messenger.send_message(chat_id, "Sorry, an error occurred.")
+        except Exception as e:
+            print(f"Failed to send error reply: {str(e)}")
+        raise
+
+
+async def _reply_with_duplicate(runtime: WorkerRuntime, chat_id: str, text: str) -> Optional[str]:
+    """Reply with an existing near-duplicate idea, if there is one; returns its ID"""
+    if runtime.deduplicator is None:
+        return None
+    try:
+        duplicate = await runtime.deduplicator.find_duplicate(text)
+    except Exception as e:
+        print(f"Duplicate idea lookup failed: {str(e)}")
+        return None
+    if not duplicate:
+        return None
+
+    duplicate_id, similarity = duplicate
+    summary = await asyncio.to_thread(
+        runtime.db.get_idea_summary_by_id, duplicate_id)
+    if not summary:
+        return None
+
+    await runtime.messenger.send_message(
+        chat_id,
+        f"This looks like an idea that was already analysed "
+        f"(similarity {similarity:.2f}): \"{summary['title']}\"\n\n"
+        f"{summary['description']}\n\nIdea ID: {duplicate_id}",
+        plain_text=True)
+    return duplicate_id
+
+
+@celery_app.task(bind=True)
+def process_telegram_update_task(self, job_id: str):
+    """
+    Celery task for processing a Telegram update acknowledged by the webhook
+    """
+    try:
+        job_data = redis_job_manager.get_job(job_id)
+        if not job_data:
+            print(f"Job {job_id} not found or expired")
+            return
+
+        if job_data["status"] in ["succeeded", "failed"]:
+            print(
+                f"Job {job_id} already completed with status: {job_data['status']}")
+            return
+
+        redis_job_manager.update_job(job_id, status="running", progress=0.05)
+
+        runtime = get_runtime()
+        chat_id = job_data["chat_id"]
+        payload = json.loads(job_data["payload"])
+
+        idea_result_id = runtime.run(process_update(runtime, payload, chat_id))
+
+        redis_job_manager.update_job(
+            job_id,
+            status="succeeded",
+            progress=1.0,
+            error="",
+            idea_result_id=idea_result_id or ""
+        )
+        print(
+            f"Telegram update processed for job {job_id}, idea ID: {idea_result_id}")
+
+    except Exception as e:
+        print(f"Error processing Telegram update {job_id}: {str(e)}")
+        redis_job_manager.fail_job(job_id, f"Internal error: {str(e)}")
+    finally:
+        try:
+            fair_scheduler.complete("telegram_updates", job_id)
+        except Exception as e:
+            print(f"Error releasing fair queue slot of job {job_id}: {str(e)}")
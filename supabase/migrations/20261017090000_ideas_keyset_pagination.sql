@@ -0,0 +1,33 @@
+-- Keyset pagination for GET /ideas.
+-- Pages are read newest first by (created_at, id), so this index lets each
+-- page be an index range scan regardless of table size.
+create index if not exists business_plans_created_at_id_idx
+    on public.business_plans (created_at desc, id desc);
+
+-- Flattened idea summaries, so list pages do not transfer the full
+-- response document. Simple view: filters and ordering are pushed down to
+-- business_plans and use the index above. security_invoker keeps the
+-- caller's row level security on business_plans in force.
+create or replace view public.business_plan_summaries
+with (security_invoker = true) as
+select
+    id,
+    user_id,
+    created_at,
+    coalesce(response -> 'idea' ->> 'title', '') as title,
+    coalesce(response -> 'idea' ->> 'description', '') as description,
+    coalesce(response -> 'idea' ->> 'problem_statement', '') as problem_statement,
+    coalesce(response -> 'icp' -> 'target_demographics', '""'::jsonb) as target_demographics,
+    case when jsonb_typeof(response -> 'idea' -> 'key_features') = 'array'
+        then jsonb_array_length(response -> 'idea' -> 'key_features')
+        else 0
+    end as key_features_count,
+    (case when jsonb_typeof(response -> 'reddit_analysis' -> 'challenging_feedback') = 'array'
+        then jsonb_array_length(response -> 'reddit_analysis' -> 'challenging_feedback')
+        else 0
+    end) +
+    (case when jsonb_typeof(response -> 'reddit_analysis' -> 'supportive_feedback') = 'array'
+        then jsonb_array_length(response -> 'reddit_analysis' -> 'supportive_feedback')
+        else 0
+    end) as reddit_insights_count
+from public.business_plans;
@@ -0,0 +1,29 @@
+-- Single round trip for GET /ideas/{idea_id}.
+-- The idea, its prompt history and its latest prompt are fetched together by
+-- embedding prompts in the business_plans select, which PostgREST only
+-- allows when prompts.idea_id is a foreign key to business_plans.id.
+do $$
+begin
+    if not exists (
+        select 1
+        from pg_constraint
+        where conrelid = 'public.prompts'::regclass
+          and confrelid = 'public.business_plans'::regclass
+          and contype = 'f'
+    ) then
+        alter table public.prompts
+            add constraint prompts_idea_id_fkey
+            foreign key (idea_id) references public.business_plans (id)
+            not valid;
+    end if;
+end $$;
+
+-- Embedded history and latest-prompt lookups are ordered by created_at per idea.
+create index if not exists prompts_idea_id_created_at_idx
+    on public.prompts (idea_id, created_at desc);
+
+create index if not exists prompts_idea_id_service_type_created_at_idx
+    on public.prompts (idea_id, service_type, created_at desc);
+
+-- PostgREST caches the schema; reload it so the new relationship is visible.
+notify pgrst, 'reload schema';
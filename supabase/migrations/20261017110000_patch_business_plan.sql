@@ -0,0 +1,29 @@
+-- Partial updates of business_plans.response applied in the database.
+-- p_patch maps response sections to the keys to overwrite, e.g.
+--   {"idea": {"title": "New title"}, "icp": {"pain_points": ["a", "b"]}}
+-- Each section is merged into the stored section, so concurrent edits to
+-- different fields no longer overwrite each other. Returns null when the
+-- idea does not exist.
+create or replace function public.patch_business_plan(
+    p_id public.business_plans.id%type,
+    p_patch jsonb
+)
+returns boolean
+language sql
+as $$
+    update public.business_plans
+    set response = coalesce(response, '{}'::jsonb) || (
+        select coalesce(
+            jsonb_object_agg(
+                section.key,
+                coalesce(response -> section.key, '{}'::jsonb) || section.value
+            ),
+            '{}'::jsonb
+        )
+        from jsonb_each(p_patch) as section
+    )
+    where id = p_id
+    returning true;
+$$;
+
+notify pgrst, 'reload schema';
@@ -0,0 +1,44 @@
+import os
+
+# Settings are read at import time; these stand in for the deployment's
+# environment so modules can be imported without real credentials
+for _name, _value in {
+    "OPENAI_API_KEY": "test",
+    "DEFAULT_MODEL": "test-model",
+    "MAX_TOKENS": "100",
+    "DEFAULT_TEMPERATURE": "0",
+    "TRANSCRIBE_MODEL": "test-transcribe",
+    "TELEGRAM_API_TOKEN": "123:test",
+    "SUPABASE_URL": "http://localhost",
+    "SUPABASE_KEY": "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9.eyJyb2xlIjoiYW5vbiJ9.test",
+    "LLM_BACKEND": "synthetic",
+}.items():
+    os.environ.setdefault(_name, _value)
+
+import fakeredis  # noqa: E402
+import pytest  # noqa: E402
+import redis  # noqa: E402
+
+from services import redis_jobs  # noqa: E402
+from services.observability.redis_tracing import TracedRedis  # noqa: E402
+
+
+@pytest.fixture
+def redis_client():
+    """Sync client on a fresh in-memory Redis that runs Lua scripts"""
+    pool = redis.ConnectionPool(
+        connection_class=fakeredis.FakeConnection,
+        server=fakeredis.FakeServer(),
+        decode_responses=True
+    )
+    client = TracedRedis(connection_pool=pool)
+    yield client
+    client.close()
+
+
+@pytest.fixture
+def job_manager(redis_client, monkeypatch):
+    """RedisJobManager on the in-memory Redis"""
+    monkeypatch.setattr(redis_jobs, "create_redis_client",
+                        lambda use_async=False: redis_client)
+    return redis_jobs.RedisJobManager()
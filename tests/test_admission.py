@@ -0,0 +1,107 @@
+import pytest
+
+from services import admission
+from services.admission import AdmissionController, QueueFullError
+from services.fair_queue import PENDING_KEY
+
+NOW = 1_000_000.0
+
+
+class StubProgress:
+    """Fixed expected job durations per pipeline"""
+
+    def __init__(self, idea: float = 30.0, prompt: float = 20.0):
+        self.times = {"idea": idea, "prompt": prompt}
+
+    def service_time(self, pipeline: str) -> float:
+        return self.times[pipeline]
+
+
+class StubJobManager:
+    def __init__(self, batch_pending: int = 0):
+        self.batch_pending = batch_pending
+
+    def count_batch_pending(self) -> int:
+        return self.batch_pending
+
+
+@pytest.fixture
+def controller(redis_client, monkeypatch):
+    monkeypatch.setattr(admission.time, "time", lambda: NOW)
+    monkeypatch.setattr(admission, "redis_job_manager", StubJobManager())
+    return AdmissionController(redis_client, StubProgress(), worker_slots=2,
+                               window_seconds=300, slot_seconds=10)
+
+
+def test_idle_queue_predicts_no_wait(controller):
+    snapshot = controller.snapshot("idea_generation")
+
+    assert snapshot.depth == 0
+    assert snapshot.throughput == round(2 / 30, 4)
+    assert snapshot.predicted_wait == 0.0
+    assert snapshot.admitting
+
+
+def test_wait_is_depth_over_modelled_throughput(controller, redis_client):
+    redis_client.rpush("idea_generation", *range(12))
+
+    snapshot = controller.snapshot("idea_generation")
+    # 12 jobs of 30s on 2 slots
+    assert snapshot.predicted_wait == pytest.approx(180, abs=0.5)
+    assert snapshot.admitting
+
+    redis_client.rpush("idea_generation", 12)
+    snapshot = controller.snapshot("idea_generation")
+    assert snapshot.predicted_wait == pytest.approx(195, abs=0.5)
+    assert not snapshot.admitting
+    # Draining 15s of excess brings the wait back under the SLO
+    assert snapshot.retry_after == 15
+
+
+def test_other_queues_take_a_share_of_the_slots(controller, redis_client):
+    redis_client.rpush("idea_generation", *range(4))
+    redis_client.rpush("telegram_updates", *range(4))
+
+    snapshot = controller.snapshot("idea_generation")
+    # Half the queued work, so one slot's worth of throughput
+    assert snapshot.throughput == round(1 / 30, 4)
+    assert snapshot.predicted_wait == pytest.approx(120, abs=0.5)
+
+
+def test_depth_includes_fair_queue_and_batch_pending(controller, redis_client, monkeypatch):
+    monkeypatch.setattr(admission, "redis_job_manager", StubJobManager(batch_pending=3))
+    redis_client.rpush("idea_generation", "a")
+    redis_client.hset(PENDING_KEY, mapping={"idea_generation": 2, "prompt_generation": 5})
+
+    assert controller.snapshot("idea_generation").depth == 6
+    assert controller.snapshot("prompt_generation").depth == 5
+
+
+def test_measured_throughput_counts_complete_slots_in_window(controller, redis_client):
+    current = int(NOW // 10)
+    redis_client.set(f"queue_completions:idea_generation:{current}", 1000)
+    redis_client.set(f"queue_completions:idea_generation:{current - 1}", 150)
+    redis_client.set(f"queue_completions:idea_generation:{current - 30}", 150)
+    # Older than the 300s window
+    redis_client.set(f"queue_completions:idea_generation:{current - 31}", 1000)
+
+    snapshot = controller.snapshot("idea_generation")
+    assert snapshot.measured_throughput == 1.0
+    assert snapshot.throughput == 1.0
+
+
+def test_record_completion_counts_in_current_slot(controller, redis_client):
+    controller.record_completion("prompt_generation")
+    controller.record_completion("prompt_generation")
+
+    assert redis_client.get(f"queue_completions:prompt_generation:{int(NOW // 10)}") == "2"
+
+
+def test_admit_counts_the_whole_batch(controller, redis_client, monkeypatch):
+    monkeypatch.setattr(admission.settings, "ADMISSION_CONTROL_ENABLED", True)
+    redis_client.rpush("idea_generation", *range(6))
+
+    controller.admit("idea_generation", jobs=7)
+    with pytest.raises(QueueFullError) as error:
+        controller.admit("idea_generation", jobs=8)
+    assert error.value.snapshot.predicted_wait == pytest.approx(195, abs=0.5)
@@ -0,0 +1,121 @@
+import pytest
+
+from services import fair_queue
+from services.fair_queue import FairScheduler
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Job IDs handed to Celery, in order"""
+    sent = []
+    monkeypatch.setattr(fair_queue.settings, "FAIR_QUEUE_ENABLED", True)
+    monkeypatch.setattr(fair_queue.celery_app, "send_task",
+                        lambda name, args, headers=None: sent.append(args[0]))
+    return sent
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(fair_queue.time, "time", clock)
+    return clock
+
+
+def make_scheduler(redis_client, max_dispatched=10, lease_seconds=600):
+    return FairScheduler(redis_client, max_dispatched, lease_seconds, classes={
+        "telegram": {"weight": 2, "max_in_flight": 10},
+        "web": {"weight": 1, "max_in_flight": 1},
+        "batch": {"weight": 1, "max_in_flight": 10},
+    })
+
+
+def test_weighted_round_robin(redis_client, sent, clock):
+    scheduler = make_scheduler(redis_client, max_dispatched=0)
+    for job_id in ("t1", "t2", "t3"):
+        scheduler.submit("idea_generation", job_id, "telegram", "1")
+    for job_id in ("b1", "b2", "b3"):
+        scheduler.submit("idea_generation", job_id, "batch", "u1")
+    assert sent == []
+    assert scheduler.pending("idea_generation") == 6
+
+    scheduler.max_dispatched = 6
+    assert scheduler.dispatch() == 6
+
+    # Two turns for the weight-2 tenant, then one for the other
+    assert sent == ["t1", "t2", "b1", "t3", "b2", "b3"]
+    assert scheduler.pending("idea_generation") == 0
+    assert redis_client.llen(fair_queue.RING_KEY) == 0
+
+
+def test_dispatch_stops_at_max_dispatched(redis_client, sent, clock):
+    scheduler = make_scheduler(redis_client, max_dispatched=2)
+    for job_id in ("b1", "b2", "b3"):
+        scheduler.submit("idea_generation", job_id, "batch", "u1")
+
+    assert sent == ["b1", "b2"]
+    scheduler.complete("idea_generation", "b1")
+    assert sent == ["b1", "b2", "b3"]
+
+
+def test_tenant_at_cap_passes_its_turn(redis_client, sent, clock):
+    scheduler = make_scheduler(redis_client)
+    scheduler.submit("prompt_generation", "a1", "web", "alice")
+    scheduler.submit("prompt_generation", "a2", "web", "alice")
+    scheduler.submit("prompt_generation", "b1", "web", "bob")
+
+    assert sent == ["a1", "b1"]
+    tenants = {t["tenant"]: t for t in scheduler.stats()["tenants"]}
+    assert tenants["web:alice"] == {"tenant": "web:alice", "waiting": 1, "in_flight": 1}
+
+    scheduler.complete("prompt_generation", "a1")
+    assert sent == ["a1", "b1", "a2"]
+
+
+def test_failed_send_requeues_at_front(redis_client, sent, clock, monkeypatch):
+    scheduler = make_scheduler(redis_client)
+
+    def unavailable(name, args, headers=None):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setattr(fair_queue.celery_app, "send_task", unavailable)
+    scheduler.submit("idea_generation", "t1", "telegram", "1")
+    stats = scheduler.stats()
+    assert stats["in_flight"] == 0
+    assert stats["tenants"] == [{"tenant": "telegram:1", "waiting": 1, "in_flight": 0}]
+    assert scheduler.pending("idea_generation") == 1
+
+    monkeypatch.setattr(fair_queue.celery_app, "send_task",
+                        lambda name, args, headers=None: sent.append(args[0]))
+    scheduler.submit("idea_generation", "t2", "telegram", "1")
+    assert sent == ["t1", "t2"]
+
+
+def test_expired_lease_fails_job_and_frees_slot(redis_client, sent, clock, job_manager, monkeypatch):
+    monkeypatch.setattr(fair_queue, "redis_job_manager", job_manager)
+    scheduler = make_scheduler(redis_client, max_dispatched=1, lease_seconds=60)
+    expired = []
+    scheduler.on_lease_expired("idea_generation", lambda job_id, job: expired.append(job_id))
+
+    lost = job_manager.create_job("idea-1", "idea", "k1")
+    waiting = job_manager.create_job("idea-2", "idea", "k2")
+    scheduler.submit("idea_generation", lost, "telegram", "1")
+    scheduler.submit("idea_generation", waiting, "telegram", "2")
+    assert sent == [lost]
+
+    clock.now += 61
+    scheduler.dispatch()
+
+    assert expired == [lost]
+    assert job_manager.get_job(lost)["status"] == "failed"
+    assert sent == [lost, waiting]
+    # A late completion of the lost job does not free the new job's slot
+    scheduler.complete("idea_generation", lost)
+    assert scheduler.stats()["in_flight"] == 1
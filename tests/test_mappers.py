@@ -0,0 +1,29 @@
+import pytest
+
+from services.database.mappers import build_patch
+
+
+def test_build_patch_groups_fields_and_lists_by_section():
+    patch = build_patch(
+        {"title": "Dog walking", "ideal_customer_profile": "Busy owners"},
+        {"key_features": [" Booking ", "", "  "], "pain_points": ["No time"]},
+    )
+
+    assert patch == {
+        "idea": {"title": "Dog walking", "key_features": ["Booking"]},
+        "icp": {"ideal_customer_profile": "Busy owners", "pain_points": ["No time"]},
+    }
+
+
+def test_build_patch_empty_input():
+    assert build_patch({}, {}) == {}
+
+
+def test_build_patch_rejects_unknown_field():
+    with pytest.raises(ValueError, match="not allowed"):
+        build_patch({"id": "1"}, {})
+
+
+def test_build_patch_rejects_unknown_list():
+    with pytest.raises(ValueError, match="not allowed"):
+        build_patch({}, {"competitors": ["x"]})
@@ -0,0 +1,81 @@
+import io
+import struct
+
+from services.voice.ogg import (
+    FLAG_BOS, FLAG_CONTINUED, FLAG_EOS, OPUS_SAMPLE_RATE, OggOpusSplit, _PAGE_HEADER, ogg_crc,
+    read_pages)
+
+PRE_SKIP = 312
+SERIAL = 0x1234
+
+
+def make_page(payload: bytes, granule: int, sequence: int, flags: int = 0) -> bytes:
+    header = _PAGE_HEADER.pack(b"OggS", 0, flags, granule, SERIAL, sequence, 0, 1)
+    page = bytearray(header + bytes([len(payload)]) + payload)
+    struct.pack_into("<I", page, 22, ogg_crc(page))
+    return bytes(page)
+
+
+def make_stream(granules):
+    opus_head = b"OpusHead" + bytes([1, 1]) + struct.pack("<HIhB", PRE_SKIP, 48000, 0, 0)
+    pages = [
+        make_page(opus_head, 0, 0, FLAG_BOS),
+        make_page(b"OpusTags" + bytes(8), 0, 1),
+    ]
+    previous = 0
+    for i, granule in enumerate(granules):
+        # A page that ends no packet is followed by a continuation
+        flags = FLAG_CONTINUED if previous == -1 else 0
+        flags |= FLAG_EOS if i == len(granules) - 1 else 0
+        pages.append(make_page(bytes([i]) * 50, granule, i + 2, flags))
+        previous = granule
+    return b"".join(pages)
+
+
+def parse(data: bytes):
+    f = io.BytesIO(data)
+    result = []
+    for page in read_pages(f):
+        raw = bytearray(data[page.offset:page.offset + page.length])
+        sequence, crc = struct.unpack_from("<II", raw, 18)
+        struct.pack_into("<I", raw, 22, 0)
+        result.append((page, sequence, crc == ogg_crc(raw), raw[_PAGE_HEADER.size + 1]))
+    return result
+
+
+def test_segments_rebase_granules_and_rewrite_crc():
+    granules = [PRE_SKIP + OPUS_SAMPLE_RATE * (i + 1) for i in range(10)]
+    granules[3] = -1
+    split = OggOpusSplit.open(io.BytesIO(make_stream(granules)))
+    assert split.pre_skip == PRE_SKIP
+    assert split.duration == 10.0
+
+    segments = split.plan(segment_seconds=3, overlap_seconds=1)
+    assert len(segments) > 2
+    # Page 4 continues a packet from page 3, so no segment starts there
+    assert all(start != 4 for start, _ in segments)
+
+    for index, (start, end) in enumerate(segments):
+        pages = parse(split.segment_bytes(index))
+        assert [sequence for _, sequence, _, _ in pages] == list(range(len(pages)))
+        assert all(crc_ok for _, _, crc_ok, _ in pages)
+        assert [bool(page.flags & FLAG_EOS) for page, _, _, _ in pages] == \
+            [False] * (len(pages) - 1) + [True]
+        assert pages[0][0].flags & FLAG_BOS
+
+        audio = pages[2:]
+        # Payload bytes identify the source page
+        assert [payload for _, _, _, payload in audio] == list(range(start, end))
+
+        # The first segment keeps its granules; later ones restart at
+        # pre_skip so a fresh decoder drops the same leading samples
+        previous = max([0] + [g for g in granules[:start] if g != -1])
+        shift = previous - PRE_SKIP if previous else 0
+        expected = [g if g == -1 else g - shift for g in granules[start:end]]
+        assert [page.granule for page, _, _, _ in audio] == expected
+        if start:
+            assert audio[0][0].granule in (-1, PRE_SKIP + OPUS_SAMPLE_RATE)
+
+        segment = OggOpusSplit.open(io.BytesIO(split.segment_bytes(index)))
+        assert segment is not None
+        assert segment.pre_skip == PRE_SKIP
@@ -0,0 +1,35 @@
+import pytest
+
+from services.database.pagination import decode_cursor, encode_cursor, keyset_filter
+
+
+def test_cursor_round_trip_is_url_safe():
+    row = {"created_at": "2024-05-01T10:00:00.123456+00:00", "id": 42}
+    cursor = encode_cursor(row)
+
+    assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+    assert decode_cursor(cursor) == ("2024-05-01T10:00:00.123456+00:00", "42")
+
+
+@pytest.mark.parametrize("cursor", ["not-a-cursor!", "", "e30"])
+def test_decode_cursor_rejects_garbage(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+
+def test_keyset_filter_breaks_ties_on_id():
+    cursor = encode_cursor({"created_at": "2024-05-01T10:00:00+00:00", "id": "abc"})
+
+    assert keyset_filter(cursor) == (
+        'created_at.lt."2024-05-01T10:00:00+00:00",'
+        'and(created_at.eq."2024-05-01T10:00:00+00:00",id.lt."abc")'
+    )
+
+
+def test_keyset_filter_strips_quotes_from_values():
+    cursor = encode_cursor({"created_at": 'x"),id.gt.("', "id": '1"'})
+
+    assert keyset_filter(cursor) == (
+        'created_at.lt."x),id.gt.(",'
+        'and(created_at.eq."x),id.gt.(",id.lt."1")'
+    )
@@ -0,0 +1,61 @@
+import json
+
+from services.redis_jobs import BATCH_PENDING_INDEX_KEY, job_channel
+
+
+def test_create_job_is_idempotent_per_key(job_manager, redis_client):
+    first = job_manager.create_job("idea-1", "lovable", "key-1", {"user_id": "u1"})
+    second = job_manager.create_job("idea-1", "lovable", "key-1", {"user_id": "u2"})
+    other = job_manager.create_job("idea-1", "lovable", "key-2")
+
+    assert first == second
+    assert other != first
+    job = job_manager.get_job(first)
+    assert job["status"] == "queued"
+    assert job["progress"] == 0.0
+    assert job["user_id"] == "u1"
+    assert redis_client.ttl(f"prompt_job:{first}") == job_manager.job_ttl
+    assert job_manager.get_dedupe_job_id("idea-1", "lovable", "key-1") == first
+
+
+def test_update_job_publishes_new_state(job_manager, redis_client):
+    job_id = job_manager.create_job("idea-1", "lovable", "key-1")
+    pubsub = redis_client.pubsub()
+    pubsub.subscribe(job_channel(job_id))
+    pubsub.get_message(timeout=1)
+
+    assert job_manager.update_job(job_id, status="running", progress=0.5, stage="script")
+
+    message = pubsub.get_message(ignore_subscribe_messages=True, timeout=1)
+    published = json.loads(message["data"])
+    assert published["status"] == "running"
+    assert published["progress"] == "0.5"
+    assert published["stage"] == "script"
+    assert job_manager.get_job(job_id)["stage"] == "script"
+    pubsub.close()
+
+
+def test_update_job_does_not_recreate_expired_job(job_manager, redis_client):
+    assert not job_manager.update_job("missing", status="failed", error="lost")
+    assert not redis_client.exists("prompt_job:missing")
+
+
+def test_batch_pending_children_are_counted_until_dispatched(job_manager, redis_client):
+    children = job_manager.create_batch_children("batch-1", "u1", ["a", "b", "c"])
+
+    assert job_manager.get_batch_children("batch-1") == children
+    assert job_manager.count_batch_pending() == 3
+
+    assert job_manager.pop_batch_pending("batch-1", 2) == children[:2]
+    assert job_manager.count_batch_pending() == 1
+
+    assert job_manager.pop_batch_pending("batch-1", 2) == children[2:]
+    assert job_manager.count_batch_pending() == 0
+    assert redis_client.zcard(BATCH_PENDING_INDEX_KEY) == 0
+
+
+def test_claim_once(job_manager):
+    assert job_manager.claim_once("telegram_update:1", 60)
+    assert not job_manager.claim_once("telegram_update:1", 60)
+    job_manager.release_claim("telegram_update:1")
+    assert job_manager.claim_once("telegram_update:1", 60)
@@ -0,0 +1,33 @@
+from services.voice.segmented_transcriber import stitch_transcripts
+
+
+def test_stitch_drops_shared_words_at_seam():
+    parts = [
+        "we are building an app for dog owners in the city so they can "
+        "find walkers nearby and pay them directly through",
+        "directly through the app. Most of the walkers in the city are students",
+    ]
+
+    assert stitch_transcripts(parts) == (
+        "we are building an app for dog owners in the city so they can "
+        "find walkers nearby and pay them directly through the app. "
+        "Most of the walkers in the city are students"
+    )
+
+
+def test_stitch_concatenates_without_anchored_overlap():
+    parts = [
+        "owners in the city so they can find walkers nearby",
+        "Most of the walkers in the city are students",
+    ]
+
+    assert stitch_transcripts(parts) == " ".join(parts)
+
+
+def test_stitch_tolerates_word_cut_at_seam():
+    parts = [
+        "pay them directly through the ap",
+        "directly through the app today",
+    ]
+
+    assert stitch_transcripts(parts) == "pay them directly through the app today"